@@ -11,9 +11,11 @@ from .sub_agents.greeter_agent import greeter_agent
 from .agents.retriever_agent import retriever_agent
 from .agents.pass_generator_agent import pass_generator_agent
 from .agents.receipt_processor_agent import receipt_processor_agent
+from .agents.spending_agent import spending_agent
 import vertexai
 from vertexai import agent_engines
 from dotenv import load_dotenv
+from .agents.models import shared_model
 
 load_dotenv(dotenv_path=".env")
 
@@ -31,7 +33,7 @@ vertexai.init(project=PROJECT_ID, location=location,staging_bucket=BUCKET_NAME,a
 
 financial_coordinator = Agent(
     name="financial_coordinator",
-    model=MODEL,
+    model=shared_model(MODEL),
     description=(
         "give appropriate response depending on the user's prompt"
     ),
@@ -43,6 +45,7 @@ financial_coordinator = Agent(
         AgentTool(agent=receipt_processor_agent),
         #AgentTool(agent=corpus_uploader_agent),
         AgentTool(agent=retriever_agent),
+        AgentTool(agent=spending_agent),
         AgentTool(agent=pass_generator_agent),
     ],
     #sub_agents=[greeter_agent,extractor_agent,retriever_agent],
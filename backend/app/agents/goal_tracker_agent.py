@@ -1,4 +1,5 @@
-from google.adk.agent import Agent
+from google.adk import Agent
+from app.agents.models import shared_model
 
 GOAL_TRACKER_AGENT_PROMPT = """
 You are an expert financial analyst AI. Your task is to analyze the provided JSON data, which represents a user's spending within a specific budget category (e.g., groceries).
@@ -35,4 +36,10 @@ Your goal is to identify ONLY the single most important and actionable insight f
 * **Your Output:** `None`
 """
 
-
+goal_tracker_agent = Agent(
+    model=shared_model('gemini-2.5-flash'),
+    name='goal_tracker_agent',
+    description="Turns a budget milestone and the latest purchase into a one-line push notification insight.",
+    instruction=GOAL_TRACKER_AGENT_PROMPT,
+    output_key="goal_tracker_agent_output",
+)
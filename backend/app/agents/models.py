@@ -0,0 +1,25 @@
+"""
+Shared ADK model instances for the agents.
+
+An agent configured with a model name resolves it through ADK's LLM registry,
+which builds a new `Gemini` (and with it a new genai client) on every call.
+Agents that use the same model share one instance from `shared_model()`
+instead, so its client is built once per process and can be pre-warmed at
+startup.
+"""
+
+import threading
+from typing import Dict
+from google.adk.models import Gemini
+
+_models: Dict[str, Gemini] = {}
+_models_lock = threading.Lock()
+
+
+def shared_model(name: str) -> Gemini:
+    """Return the process-wide `Gemini` model for `name`, creating it on first use."""
+    with _models_lock:
+        model = _models.get(name)
+        if model is None:
+            model = _models[name] = Gemini(model=name)
+        return model
@@ -1,5 +1,6 @@
 from google.adk import Agent
 from app.wallet_service.wallet_service import generate_wallet_pass_link
+from app.agents.models import shared_model
 
 PASS_GENERATOR_AGENT_PROMPT = """
 You are a Google Wallet Pass Generator Agent. Your job is to generate a Google Wallet Pass for a given receipt.
@@ -33,7 +34,7 @@ Do not modify the input data. Call the tool directly with the provided data.
 """
 
 pass_generator_agent = Agent(
-    model='gemini-2.5-pro',
+    model=shared_model('gemini-2.5-pro'),
     name='pass_generator_agent',
     description="Creates a Google Wallet Pass for a given receipt, and returns the pass_url string.",
     instruction=PASS_GENERATOR_AGENT_PROMPT,
@@ -1,9 +1,9 @@
 from google.adk import Agent
 from app.wallet_service.wallet_service import generate_wallet_pass_link
-from app.rag_test.prepare_corpus_and_data import upload_user_documents_to_corpus
+from app.rag_test.ingestion_queue import ingestion_queue
+from app.functions.receipt_ledger import record_receipts
 from typing import Optional
-import json,os
-import tempfile
+from app.agents.models import shared_model
 
 # Define the combined instruction prompt
 # RECEIPT_PROCESSOR_PROMPT = """
@@ -73,6 +73,7 @@ JSON Schema:
 Rules:
 - If multiple images are provided, create an array of JSON objects.
 - If a value cannot be found for a field, use null.
+- If the input contains a "Cached extraction for image N" block, use that JSON for image N as-is instead of re-extracting it.
 - Do not respond directly to the user with the JSON. Your final output must come from the tool calls.
 
 Final Output Instruction:
@@ -81,19 +82,14 @@ After both tool calls are complete, your final answer to the user must be ONLY t
 
 # Yash solution
 def upload_extracted_text_to_corpus(text: str, filename: Optional[str] = None):
-    # Save the extracted text to a temporary file
-    with tempfile.TemporaryDirectory() as temp_dir:
-        if not filename:
-            filename = "extracted_data.txt"
-        file_path = os.path.join(temp_dir, filename)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(text)
-        uploaded = upload_user_documents_to_corpus([file_path])
-    return {"uploaded": uploaded}
+    # Queued for batched ingestion; the corpus upload no longer blocks the reply
+    document_id = ingestion_queue.enqueue(text, filename or "extracted_data.txt")
+    record_receipts(text, source="agent")
+    return {"queued": document_id}
 
 # The single, consolidated agent
 receipt_processor_agent = Agent(
-    model='gemini-2.5-pro',
+    model=shared_model('gemini-2.5-pro'),
     name='receipt_processor_agent',
     description="Extracts data from a receipt, generates a wallet pass, and archives the text.",
     instruction=RECEIPT_PROCESSOR_PROMPT,
@@ -1,8 +1,7 @@
-import os
 from google.adk.agents import Agent
-from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
-from vertexai.preview import rag
 from dotenv import load_dotenv
+from app.rag_test.retrieval_backend import build_retrieval_tool
+from app.agents.models import shared_model
 
 load_dotenv(dotenv_path="app/.env")
 
@@ -29,22 +28,10 @@ Citations:
 If you are unsure or the information is not available, say so clearly.
 """
 
-ask_vertex_retrieval = VertexAiRagRetrieval(
-    name='retrieve_rag_documentation',
-    description=(
-        'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus.'
-    ),
-    rag_resources=[
-        rag.RagResource(
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
-    ],
-    similarity_top_k=10,
-    vector_distance_threshold=0.6,
-)
+ask_vertex_retrieval = build_retrieval_tool()
 
 retriever_agent = Agent(
-    model='gemini-2.5-pro',
+    model=shared_model('gemini-2.5-pro'),
     name='retriever_agent',
     description="Answers user questions by retrieving information from their uploaded documents.",
     instruction=RETRIEVER_AGENT_PROMPT,
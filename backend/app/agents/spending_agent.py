@@ -0,0 +1,49 @@
+from datetime import date
+from google.adk import Agent
+from app.functions.receipt_ledger import ledger_user, receipt_ledger
+from app.agents.models import shared_model
+
+SPENDING_AGENT_PROMPT = """
+You are a Spending Analyst Agent. You answer questions about how much the user spent, using the structured receipt ledger.
+
+Instructions:
+- Call the `query_spending` tool to compute totals, receipt counts and breakdowns. Never add up amounts yourself.
+- Pass dates as YYYY-MM-DD. Turn relative periods ("last month", "in March") into a start_date and end_date; call the `today` tool first if you need the current date.
+- Pass an empty string for any filter that does not apply.
+- Use `merchant` to filter by store name and `item` to filter by purchased item (e.g. "milk").
+- Use `group_by` ("merchant", "month", "day" or "item") when the user asks for a breakdown.
+- Report the numbers returned by the tool as-is, with the period and filters you used.
+- If the tool finds no receipts, say that no matching receipts were recorded.
+"""
+
+
+def today() -> str:
+    """Returns today's date as YYYY-MM-DD."""
+    return date.today().isoformat()
+
+
+def query_spending(start_date: str, end_date: str, merchant: str, item: str, group_by: str) -> dict:
+    """Totals the user's recorded receipts, optionally filtered by purchase date range (YYYY-MM-DD, inclusive), merchant name or item description, and grouped by "merchant", "month", "day" or "item". Use empty strings for unused arguments."""
+    if receipt_ledger is None:
+        return {"error": "The receipt ledger is disabled."}
+    try:
+        return receipt_ledger.spending(
+            ledger_user.get(),
+            start_date=start_date or None,
+            end_date=end_date or None,
+            merchant=merchant or None,
+            item=item or None,
+            group_by=group_by or None,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+spending_agent = Agent(
+    model=shared_model('gemini-2.5-flash'),
+    name='spending_agent',
+    description="Answers questions about the user's spending totals and breakdowns from their recorded receipts.",
+    instruction=SPENDING_AGENT_PROMPT,
+    output_key="spending_agent_output",
+    tools=[today, query_spending],
+)
@@ -1,11 +1,25 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
 from typing import List, Optional
 #from ..dependencies import get_current_user  # Assuming this is in app/dependencies.py
 from ..agent import root_agent  # Import your main agent from app/agent.py
-from google.adk.sessions import InMemorySessionService
+from ..functions.extraction_cache import lookup_receipt
+from ..functions.image_preprocessor import preprocess_images_async
+from ..functions.genai_client import warm_client
+from ..functions.metrics import LatencyTracker, register_metrics
+from ..functions.receipt_ledger import ledger_user
+from ..functions.session_store import session_service
 from google.adk.runners import Runner
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types
 from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from ..functions.sse import SSE_HEADERS, format_sse
 
 # --- Pydantic Models for Request/Response ---
 class ChatResponse(BaseModel):
@@ -17,25 +31,88 @@ class ChatResponse(BaseModel):
 router = APIRouter()
 APP_NAME = "FinancialInsights"
 
-# Create a single, in-memory session service instance for the entire application.
-session_service = InMemorySessionService()
-
 APP_NAME = "Rasheed"
-DEMO_USER_ID = "123456789012"
-DEMO_SESSION_ID = "123456"
+# Used when a client does not identify its user
+ANONYMOUS_USER_ID = "anonymous"
+WARM_ON_STARTUP = os.getenv("CHAT_WARM_ON_STARTUP", "1") == "1"
+
+# Per-request timings: session lookup + runner acquisition, input preparation
+# (transcription, image preprocessing), and the agent run itself
+chat_setup_latency = LatencyTracker()
+chat_input_latency = LatencyTracker()
+chat_execution_latency = LatencyTracker()
+register_metrics("chat", lambda: {
+    "setup": chat_setup_latency.snapshot(),
+    "input": chat_input_latency.snapshot(),
+    "execution": chat_execution_latency.snapshot(),
+})
+
+_runner: Optional[Runner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> Runner:
+    """
+    Return the process-wide ADK Runner, building it on first use.
+
+    The runner holds no per-request state (sessions live in the session
+    service), so one instance serves every concurrent request.
+    """
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = Runner(
+                    app_name=APP_NAME,
+                    agent=root_agent,
+                    session_service=session_service,
+                )
+    return _runner
 
 
+def _iter_agents(agent):
+    """Yield an agent and every agent reachable through sub_agents or AgentTools."""
+    yield agent
+    for sub_agent in getattr(agent, "sub_agents", None) or []:
+        yield from _iter_agents(sub_agent)
+    for tool in getattr(agent, "tools", None) or []:
+        if isinstance(tool, AgentTool):
+            yield from _iter_agents(tool.agent)
+
+
+def warm_agent_runtime() -> None:
+    """
+    Build the runner and each agent's model client ahead of the first request.
+
+    Agents share `Gemini` instances from `shared_model()`, whose clients are
+    created lazily on first use; otherwise that cost lands on whichever user
+    request reaches the model first.
+    """
+    get_runner()
+    warm_client()
+    for agent in _iter_agents(root_agent):
+        try:
+            # canonical_model is the shared instance; api_client is a cached property on it
+            getattr(getattr(agent, "canonical_model", None), "api_client", None)
+        except Exception as e:
+            print(f"Could not pre-warm model client for {agent.name}: {e}")
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(
     #decoded_token: dict = Depends(get_current_user),
     query: Optional[str] = Form(""),
-    #session_id: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None),
+    session_id: Optional[str] = Form(None),
     images: Optional[List[UploadFile]] = File(None),
     audio_files: Optional[List[UploadFile]] = File(None),
+    stream: bool = Form(False),
 ):
     """
     Handles a stateful, multimodal chat conversation with the root_agent.
+
+    Each (user_id, session_id) pair has its own history. Omit `session_id` to
+    start a new conversation and send back the returned one to continue it.
     """
     #user_id = str(decoded_token.get("uid"))
     #active_session_id = session_id or user_id  # Use provided session_id or default to user_id
@@ -55,26 +132,29 @@ async def chat_with_agent(
     # except Exception as e:
     #     raise HTTPException(status_code=500, detail=f"Session management error: {e}")
 
+    user_id = user_id or ANONYMOUS_USER_ID
+    session_id = session_id or uuid.uuid4().hex
+    # Receipts recorded and spending queried during this request belong to this user
+    ledger_user.set(user_id)
+    setup_start = time.perf_counter()
     try:
         current_session = await session_service.get_session(
-            app_name=APP_NAME, user_id=DEMO_USER_ID, session_id=DEMO_SESSION_ID
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
         )
         if not current_session:
             current_session = await session_service.create_session(
-                app_name=APP_NAME, user_id=DEMO_USER_ID, session_id=DEMO_SESSION_ID
+                app_name=APP_NAME, user_id=user_id, session_id=session_id
             )
-            print(f"Created new demo session: {DEMO_SESSION_ID}")
+            print(f"Created new session: {session_id}")
         else:
-            print(f"Resumed demo session: {DEMO_SESSION_ID}")
+            print(f"Resumed session: {session_id}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Session management error: {e}")
 
-    # 2. --- Initialize the ADK Runner ---
-    runner = Runner(
-        app_name=APP_NAME,
-        agent=root_agent,
-        session_service=session_service,
-    )
+    # 2. --- Get the shared ADK Runner ---
+    runner = get_runner()
+    chat_setup_latency.record(time.perf_counter() - setup_start)
+    input_start = time.perf_counter()
 
     # 3. --- Construct the Multimodal Message ---
     # message_parts = [types.Part.from_text(text=query)]
@@ -89,15 +169,13 @@ async def chat_with_agent(
     
     # Process audio files first if present
     if audio_files:
-        from ..functions.audio_processor import transcribe_audio
-        audio_transcripts = []
+        from ..functions.streaming_audio import transcribe_upload
         for audio_file in audio_files:
             if not audio_file.content_type.startswith('audio/'):
                 raise HTTPException(status_code=400, detail="Audio file must be an audio file")
-            
-            audio_bytes = await audio_file.read()
-            transcript = transcribe_audio(audio_bytes, filename=audio_file.filename)
-            audio_transcripts.append(transcript)
+        
+        # Transcribe every voice note concurrently; gather keeps upload order
+        audio_transcripts = await asyncio.gather(*(transcribe_upload(audio_file) for audio_file in audio_files))
         
         # Combine audio transcripts with the query
         if audio_transcripts:
@@ -114,22 +192,39 @@ async def chat_with_agent(
 
     message_parts = [types.Part.from_text(text=final_query)]
     if images:
-        for image in images:
+        for index, image in enumerate(images, start=1):
             image_bytes = await image.read()
-            message_parts.append(types.Part.from_bytes(data=image_bytes, mime_type=image.content_type))
+            ((prepared_bytes, mime_type),) = await preprocess_images_async([image_bytes])
+            message_parts.append(types.Part.from_bytes(data=prepared_bytes, mime_type=mime_type))
+            # Let the receipt agent reuse an earlier extraction of the same photo
+            cached_extraction = lookup_receipt(image_bytes)
+            if cached_extraction is not None:
+                message_parts.append(types.Part.from_text(
+                    text=f"Cached extraction for image {index}:\n{cached_extraction}"
+                ))
             
     if not final_query and not images and not audio_files:
         raise HTTPException(status_code=400, detail="Please provide a query, image, or audio file.")
 
     user_message = types.Content(role="user", parts=message_parts)
+    chat_input_latency.record(time.perf_counter() - input_start)
 
     print(user_message)
+
+    if stream:
+        return StreamingResponse(
+            stream_agent_events(runner, user_message, user_id, session_id),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS,
+        )
+
     # 4. --- Run the Agent and Get Response ---
     final_response = "Sorry, I encountered an issue. Please try again."
+    execution_start = time.perf_counter()
     try:
         events = runner.run_async(
-            user_id=DEMO_USER_ID,
-            session_id=DEMO_SESSION_ID,
+            user_id=user_id,
+            session_id=session_id,
             new_message=user_message,
         )
 
@@ -138,9 +233,54 @@ async def chat_with_agent(
                 final_response = event.content.parts[0].text
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Agent execution error: {e}")
+    finally:
+        chat_execution_latency.record(time.perf_counter() - execution_start)
 
     return ChatResponse(
         status="success",
         response_text=final_response,
-        session_id=DEMO_SESSION_ID
-    )
\ No newline at end of file
+        session_id=session_id
+    )
+
+
+async def stream_agent_events(runner: Runner, user_message: types.Content, user_id: str, session_id: str):
+    """
+    Run the agent in SSE streaming mode and relay its text as Server-Sent Events.
+
+    Emits `delta` events with partial text as the model produces it, then one
+    `final` event carrying the same payload as the non-streaming ChatResponse.
+    """
+    final_response = "Sorry, I encountered an issue. Please try again."
+    ledger_user.set(user_id)
+    execution_start = time.perf_counter()
+    try:
+        events = runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=user_message,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        )
+
+        async for event in events:
+            if not (event.content and event.content.parts):
+                continue
+            text = "".join(part.text for part in event.content.parts if part.text)
+            if event.partial:
+                if text:
+                    yield format_sse({"text": text}, event="delta")
+            elif event.is_final_response() and text:
+                final_response = text
+    except Exception as e:
+        yield format_sse({"detail": f"Agent execution error: {e}"}, event="error")
+        return
+    finally:
+        chat_execution_latency.record(time.perf_counter() - execution_start)
+
+    yield format_sse(
+        ChatResponse(
+            status="success",
+            response_text=final_response,
+            session_id=session_id,
+        ).model_dump(),
+        event="final",
+    )
@@ -5,17 +5,43 @@ Uses Google Cloud Speech-to-Text API for transcription.
 
 import os
 import io
-import tempfile
+import asyncio
+import functools
 import mimetypes
 import subprocess
+import wave
 from typing import Optional
 from google.cloud import speech
 from pydub import AudioSegment
-import ffmpeg
+from .audio_sniffer import AudioFormatInfo, sniff_audio_format
+from .ffmpeg_pipe import convert_with_ffmpeg_pipe
+from .speech_client import get_speech_client
+from .long_audio import LONG_AUDIO_THRESHOLD_SECONDS, transcribe_long_audio
+from .metrics import Counters, register_metrics
+from .receipt_ledger import record_receipts
+from .receipt_schema import Receipt
+from .transcript_cache import make_key as make_transcript_key, transcript_cache, transcript_inflight
 
+# Encodings synchronous recognition accepts as-is (MP3 is beta-only, so it is transcoded)
+NATIVE_ENCODINGS = {"LINEAR16", "MULAW", "FLAC", "OGG_OPUS", "WEBM_OPUS", "AMR", "AMR_WB"}
+# Inline audio limit for synchronous recognition, with headroom for the request envelope
+MAX_SYNC_AUDIO_BYTES = 10 * 1024 * 1024 - 64 * 1024
+# Lowest bitrate assumed when a compressed header has no duration (speech Opus ~16 kbps)
+MIN_COMPRESSED_BITRATE = 16000
+
+audio_conversion_counters = Counters("requests", "passthrough", "transcoded", "streamed", "passthrough_failures")
+
+def audio_conversion_stats() -> dict:
+    stats = audio_conversion_counters.snapshot()
+    stats["passthrough_share"] = round(stats["passthrough"] / stats["requests"], 3) if stats["requests"] else None
+    return stats
+
+register_metrics("audio_passthrough", audio_conversion_stats)
+
+@functools.lru_cache(maxsize=1)
 def check_ffmpeg_available() -> bool:
     """
-    Check if FFmpeg is available on the system.
+    Check if FFmpeg is available on the system (probed once per process).
     
     Returns:
         bool: True if FFmpeg is available, False otherwise
@@ -29,7 +55,7 @@ def check_ffmpeg_available() -> bool:
 
 def detect_audio_format(audio_bytes: bytes, filename: str = "") -> str:
     """
-    Detect audio format from file extension or content.
+    Detect audio format from the file header, falling back to the extension.
     
     Args:
         audio_bytes: Raw audio bytes
@@ -38,7 +64,12 @@ def detect_audio_format(audio_bytes: bytes, filename: str = "") -> str:
     Returns:
         str: Detected audio format
     """
-    # Try to detect from filename first
+    # Magic bytes are authoritative; browsers and phones often mislabel uploads
+    sniffed = sniff_audio_format(audio_bytes)
+    if sniffed is not None:
+        return sniffed.format
+    
+    # Try to detect from filename next
     if filename:
         ext = os.path.splitext(filename)[1].lower()
         if ext in ['.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac', '.webm']:
@@ -68,7 +99,7 @@ def detect_audio_format(audio_bytes: bytes, filename: str = "") -> str:
 
 def detect_audio_encoding(audio_bytes: bytes, filename: str = "") -> str:
     """
-    Detect the audio encoding from the file content or extension.
+    Detect the audio encoding from the file header or extension.
     
     Args:
         audio_bytes: Raw audio bytes
@@ -77,7 +108,12 @@ def detect_audio_encoding(audio_bytes: bytes, filename: str = "") -> str:
     Returns:
         str: Detected encoding (LINEAR16, FLAC, MULAW, etc.)
     """
-    # Try to detect from filename first
+    sniffed = sniff_audio_format(audio_bytes)
+    if sniffed is not None:
+        # Containers the recognizer cannot read directly are converted to LINEAR16 WAV
+        return sniffed.encoding or 'LINEAR16'
+    
+    # Try to detect from filename
     if filename:
         ext = os.path.splitext(filename)[1].lower()
         if ext == '.wav':
@@ -105,7 +141,19 @@ def convert_audio_format(audio_bytes: bytes, input_format: str = "mp3") -> bytes
     Returns:
         bytes: Converted audio in WAV format
     """
-    # First try using pydub (doesn't require external FFmpeg)
+    is_wav = input_format.lower() == "wav"
+    
+    # Non-WAV input: pipe it through ffmpeg in memory (pydub would spill to temp files)
+    if not is_wav and check_ffmpeg_available():
+        try:
+            print(f"Attempting piped ffmpeg conversion for {input_format}...")
+            converted_audio = convert_with_ffmpeg_pipe(audio_bytes)
+            print("✅ FFmpeg conversion successful")
+            return converted_audio
+        except Exception as e:
+            print(f"FFmpeg conversion failed: {e}")
+    
+    # WAV is decoded by pydub in memory without FFmpeg
     try:
         print(f"Attempting pydub conversion for {input_format}...")
         audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format=input_format)
@@ -119,74 +167,235 @@ def convert_audio_format(audio_bytes: bytes, input_format: str = "mp3") -> bytes
     except Exception as e:
         print(f"Pydub conversion failed: {e}")
         
-        # Fallback: try using ffmpeg if available
-        if check_ffmpeg_available():
+        # Fallback for WAV variants pydub cannot read (e.g. compressed codecs)
+        if is_wav and check_ffmpeg_available():
             try:
-                print("Attempting ffmpeg conversion...")
-                # Create temporary files for conversion
-                with tempfile.NamedTemporaryFile(suffix=f".{input_format}", delete=False) as temp_input:
-                    temp_input.write(audio_bytes)
-                    temp_input_path = temp_input.name
-                
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_output:
-                    temp_output_path = temp_output.name
-                
-                # Convert using ffmpeg
-                (
-                    ffmpeg
-                    .input(temp_input_path)
-                    .output(temp_output_path, 
-                           acodec='pcm_s16le',  # 16-bit PCM
-                           ac=1,                # Mono channel
-                           ar=16000)            # 16kHz sample rate
-                    .overwrite_output()
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
-                
-                # Read the converted audio
-                with open(temp_output_path, 'rb') as f:
-                    converted_audio = f.read()
-                
-                # Clean up temporary files
-                os.unlink(temp_input_path)
-                os.unlink(temp_output_path)
-                
+                print("Attempting piped ffmpeg conversion...")
+                converted_audio = convert_with_ffmpeg_pipe(audio_bytes)
                 print("✅ FFmpeg conversion successful")
                 return converted_audio
-                
             except Exception as e2:
                 print(f"FFmpeg conversion also failed: {e2}")
-        else:
+        elif not check_ffmpeg_available():
             print("FFmpeg not available, skipping ffmpeg conversion")
         
         # Last resort: try to use the original audio if it's already WAV
-        if input_format.lower() == "wav":
+        if is_wav:
             print("Using original WAV audio as fallback")
             return audio_bytes
         elif input_format.lower() == "webm":
-            # For WebM files, try to convert to a simpler format
-            try:
-                print("Attempting WebM to WAV conversion with pydub...")
-                # Try to load as WebM and export as WAV
-                audio = AudioSegment.from_file(io.BytesIO(audio_bytes), format="webm")
-                audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-                
-                output = io.BytesIO()
-                audio.export(output, format="wav")
-                print("✅ WebM to WAV conversion successful")
-                return output.getvalue()
-            except Exception as webm_error:
-                print(f"WebM conversion failed: {webm_error}")
-                # If all else fails, try to use the original audio
-                print("Using original WebM audio as last resort")
-                return audio_bytes
+            # If all else fails, try to use the original audio
+            print("Using original WebM audio as last resort")
+            return audio_bytes
         else:
             raise Exception(f"Audio conversion failed for format {input_format}. Please install FFmpeg or ensure audio is in a supported format.")
 
+def build_recognition_config(encoding: str, language_code: str = "en-US",
+                             sample_rate_hertz: Optional[int] = None,
+                             audio_channel_count: Optional[int] = None) -> speech.RecognitionConfig:
+    """
+    Build the Speech-to-Text recognition config for a given encoding.
+    
+    Args:
+        encoding: Encoding name (LINEAR16, FLAC, MP3, WEBM_OPUS)
+        language_code: Language code for transcription
+        sample_rate_hertz: Sample rate, required for headerless LINEAR16 audio
+        audio_channel_count: Channel count, required for multi-channel audio
+    
+    Returns:
+        speech.RecognitionConfig: Config for the recognizer
+    """
+    audio_encoding = getattr(
+        speech.RecognitionConfig.AudioEncoding,
+        encoding,
+        speech.RecognitionConfig.AudioEncoding.LINEAR16,
+    )
+    config = speech.RecognitionConfig(
+        encoding=audio_encoding,
+        language_code=language_code,
+        enable_automatic_punctuation=True,
+        enable_word_time_offsets=False,
+        enable_word_confidence=True,
+        model="latest_long",
+    )
+    if sample_rate_hertz:
+        config.sample_rate_hertz = sample_rate_hertz
+    if audio_channel_count and audio_channel_count > 1:
+        config.audio_channel_count = audio_channel_count
+    return config
+
+def convert_with_fallbacks(audio_bytes: bytes, detected_format: str) -> bytes:
+    """
+    Convert audio using the detected format, falling back to other decoders
+    only when the header could not be identified.
+    
+    Args:
+        audio_bytes: Raw audio bytes
+        detected_format: Format detected for the upload
+    
+    Returns:
+        bytes: Converted audio in WAV format
+    """
+    try:
+        return convert_audio_format(audio_bytes, detected_format)
+    except Exception as e:
+        if sniff_audio_format(audio_bytes) is not None:
+            # The header identified the container; other decoders cannot do better
+            raise e
+        print(f"Failed to convert {detected_format}, trying fallback formats...")
+        # Try fallback formats
+        for fallback_format in ["wav", "mp3", "webm"]:
+            if fallback_format != detected_format:
+                try:
+                    converted_audio = convert_audio_format(audio_bytes, fallback_format)
+                    print(f"Successfully converted using {fallback_format}")
+                    return converted_audio
+                except:
+                    continue
+        raise e
+
+def recognize(audio_content: bytes, config: speech.RecognitionConfig) -> str:
+    """
+    Run synchronous recognition and join the top alternatives.
+    
+    Args:
+        audio_content: Audio bytes in the encoding described by `config`
+        config: Recognition config
+    
+    Returns:
+        str: Transcribed text
+    """
+    client = get_speech_client()
+    response = client.recognize(config=config, audio=speech.RecognitionAudio(content=audio_content))
+    
+    # Extract the transcribed text
+    transcript = ""
+    for result in response.results:
+        if result.alternatives:
+            transcript += result.alternatives[0].transcript + " "
+    
+    return transcript.strip()
+
+def recognize_pcm(pcm: bytes, language_code: str = "en-US") -> str:
+    """
+    Recognize headerless 16 kHz mono 16-bit PCM.
+    
+    Args:
+        pcm: Raw PCM samples
+        language_code: Language code for transcription
+    
+    Returns:
+        str: Transcribed text
+    """
+    return recognize(pcm, build_recognition_config("LINEAR16", language_code, sample_rate_hertz=16000))
+
+def extract_pcm(wav_bytes: bytes) -> Optional[bytes]:
+    """
+    Return the PCM payload of a 16 kHz mono 16-bit WAV, or None for anything else.
+    
+    Args:
+        wav_bytes: Converted audio
+    
+    Returns:
+        Optional[bytes]: Raw PCM samples
+    """
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+            if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (16000, 1, 2):
+                return None
+            return wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+def native_audio_format(audio_bytes: bytes) -> Optional[AudioFormatInfo]:
+    """
+    Return the sniffed format if the upload can go to the recognizer untouched.
+    
+    Audio qualifies when its encoding is accepted natively, it fits inline and
+    it is short enough for synchronous recognition.
+    
+    Args:
+        audio_bytes: Raw audio bytes
+    
+    Returns:
+        Optional[AudioFormatInfo]: Header details, or None if it must be transcoded
+    """
+    info = sniff_audio_format(audio_bytes)
+    if info is None or info.encoding not in NATIVE_ENCODINGS:
+        return None
+    if len(audio_bytes) > MAX_SYNC_AUDIO_BYTES:
+        return None
+    duration = info.duration
+    if duration is None:
+        duration = len(audio_bytes) * 8 / MIN_COMPRESSED_BITRATE
+    if duration > LONG_AUDIO_THRESHOLD_SECONDS:
+        return None
+    return info
+
+def recognize_native(audio_bytes: bytes, info: AudioFormatInfo, language_code: str = "en-US") -> Optional[str]:
+    """
+    Recognize the original upload with a config matching its header.
+    
+    Args:
+        audio_bytes: Raw audio bytes
+        info: Result of `native_audio_format()`
+        language_code: Language code for transcription
+    
+    Returns:
+        Optional[str]: Transcribed text, or None if the recognizer rejected the audio
+    """
+    config = build_recognition_config(info.encoding, language_code, info.sample_rate, info.channels)
+    try:
+        transcript = recognize(audio_bytes, config)
+    except Exception as e:
+        print(f"Pass-through recognition of {info.format}/{info.encoding} failed, transcoding: {e}")
+        audio_conversion_counters.incr("passthrough_failures")
+        return None
+    audio_conversion_counters.incr("passthrough")
+    return transcript
+
+def recognize_converted(converted_audio: bytes, encoding: str, language_code: str = "en-US") -> str:
+    """
+    Recognize converted audio, switching to long-audio mode for long clips.
+    
+    Args:
+        converted_audio: Output of the conversion step
+        encoding: Encoding used for short clips
+        language_code: Language code for transcription
+    
+    Returns:
+        str: Transcribed text
+    """
+    pcm = extract_pcm(converted_audio)
+    if pcm is None:
+        return recognize(converted_audio, build_recognition_config(encoding, language_code))
+    
+    # Same recording re-encoded differently still normalizes to the same PCM
+    key = make_transcript_key(pcm, language_code, kind="pcm")
+    cached = transcript_cache.get(key)
+    if cached is not None:
+        print("Transcript cache hit (PCM)")
+        return cached
+    
+    if len(pcm) / 32000 > LONG_AUDIO_THRESHOLD_SECONDS:
+        transcript = transcribe_long_audio(pcm, language_code)
+    else:
+        transcript = recognize(converted_audio, build_recognition_config(encoding, language_code))
+    return cache_transcript(key, transcript)
+
+def cache_transcript(key: str, transcript: str) -> str:
+    """Store a non-empty transcript under `key` and return it."""
+    if transcript:
+        transcript_cache.set(key, transcript)
+    return transcript
+
 def transcribe_audio(audio_bytes: bytes, language_code: str = "en-US", filename: str = "") -> str:
     """
     Transcribe audio to text using Google Cloud Speech-to-Text.
     
+    Identical uploads are answered from the transcript cache, and concurrent
+    ones share a single recognition.
+    
     Args:
         audio_bytes: Audio file bytes
         language_code: Language code for transcription (default: en-US)
@@ -196,90 +405,115 @@ def transcribe_audio(audio_bytes: bytes, language_code: str = "en-US", filename:
         str: Transcribed text
     """
     try:
-        # Initialize the Speech client
-        client = speech.SpeechClient()
-        
-        # Detect audio format and convert to proper format
-        detected_format = detect_audio_format(audio_bytes, filename)
-        print(f"Detected audio format: {detected_format}")
-        
-        try:
-            converted_audio = convert_audio_format(audio_bytes, detected_format)
-        except Exception as e:
-            print(f"Failed to convert {detected_format}, trying fallback formats...")
-            # Try fallback formats
-            for fallback_format in ["wav", "mp3", "webm"]:
-                if fallback_format != detected_format:
-                    try:
-                        converted_audio = convert_audio_format(audio_bytes, fallback_format)
-                        print(f"Successfully converted using {fallback_format}")
-                        break
-                    except:
-                        continue
-            else:
-                raise e
-        
-        # Create the audio object
-        audio = speech.RecognitionAudio(content=converted_audio)
+        key = make_transcript_key(audio_bytes, language_code)
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            print("Transcript cache hit")
+            return cached
+        return transcript_inflight.do(
+            key,
+            lambda: cache_transcript(key, _transcribe_uncached(audio_bytes, language_code, filename)),
+        )
         
-        # Detect encoding and configure recognition accordingly
-        detected_encoding = detect_audio_encoding(audio_bytes, filename)
-        print(f"Using encoding: {detected_encoding}")
-        
-        # Configure the recognition based on detected encoding
-        if detected_encoding == 'WEBM_OPUS':
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.WEBM_OPUS,
-                language_code=language_code,
-                enable_automatic_punctuation=True,
-                enable_word_time_offsets=False,
-                enable_word_confidence=True,
-                model="latest_long",
-            )
-        elif detected_encoding == 'FLAC':
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.FLAC,
-                language_code=language_code,
-                enable_automatic_punctuation=True,
-                enable_word_time_offsets=False,
-                enable_word_confidence=True,
-                model="latest_long",
-            )
-        elif detected_encoding == 'MP3':
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.MP3,
-                language_code=language_code,
-                enable_automatic_punctuation=True,
-                enable_word_time_offsets=False,
-                enable_word_confidence=True,
-                model="latest_long",
-            )
-        else:
-            # Default to LINEAR16
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                language_code=language_code,
-                enable_automatic_punctuation=True,
-                enable_word_time_offsets=False,
-                enable_word_confidence=True,
-                model="latest_long",
-            )
-        
-        # Perform the transcription
-        response = client.recognize(config=config, audio=audio)
+    except Exception as e:
+        print(f"Error transcribing audio: {e}")
+        raise e
+
+def _transcribe_uncached(audio_bytes: bytes, language_code: str, filename: str) -> str:
+    audio_conversion_counters.incr("requests")
+    # Recognizer-native uploads skip decoding and resampling entirely
+    info = native_audio_format(audio_bytes)
+    if info is not None:
+        print(f"Passing {info.format}/{info.encoding} audio through without conversion")
+        transcript = recognize_native(audio_bytes, info, language_code)
+        if transcript is not None:
+            return transcript
+    
+    # Detect audio format and convert to proper format
+    audio_conversion_counters.incr("transcoded")
+    detected_format = detect_audio_format(audio_bytes, filename)
+    print(f"Detected audio format: {detected_format}")
+    converted_audio = convert_with_fallbacks(audio_bytes, detected_format)
+    
+    # Configure recognition for what the converter actually produced
+    detected_encoding = detect_audio_encoding(converted_audio, filename)
+    print(f"Using encoding: {detected_encoding}")
+    
+    # Perform the transcription
+    return recognize_converted(converted_audio, detected_encoding, language_code)
+
+async def transcribe_audio_async(audio_bytes: bytes, language_code: str = "en-US", filename: str = "") -> str:
+    """
+    Async variant of `transcribe_audio()` that keeps the event loop free.
+    
+    Conversion runs in the audio worker pool and recognition in a thread.
+    
+    Args:
+        audio_bytes: Audio file bytes
+        language_code: Language code for transcription (default: en-US)
+        filename: Optional filename for format detection
+    
+    Returns:
+        str: Transcribed text
+    """
+    try:
+        key = make_transcript_key(audio_bytes, language_code)
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            print("Transcript cache hit")
+            return cached
         
-        # Extract the transcribed text
-        transcript = ""
-        for result in response.results:
-            if result.alternatives:
-                transcript += result.alternatives[0].transcript + " "
+        async def transcribe_and_cache() -> str:
+            transcript = await _transcribe_uncached_async(audio_bytes, language_code, filename)
+            return cache_transcript(key, transcript)
         
-        return transcript.strip()
+        return await transcript_inflight.do_async(key, transcribe_and_cache)
         
     except Exception as e:
         print(f"Error transcribing audio: {e}")
         raise e
 
+async def _transcribe_uncached_async(audio_bytes: bytes, language_code: str, filename: str) -> str:
+    from .audio_workers import audio_conversion_pool
+    
+    audio_conversion_counters.incr("requests")
+    info = native_audio_format(audio_bytes)
+    if info is not None:
+        print(f"Passing {info.format}/{info.encoding} audio through without conversion")
+        transcript = await asyncio.to_thread(recognize_native, audio_bytes, info, language_code)
+        if transcript is not None:
+            return transcript
+    
+    audio_conversion_counters.incr("transcoded")
+    detected_format = detect_audio_format(audio_bytes, filename)
+    print(f"Detected audio format: {detected_format}")
+    converted_audio = await audio_conversion_pool.run(convert_with_fallbacks, audio_bytes, detected_format)
+    
+    detected_encoding = detect_audio_encoding(converted_audio, filename)
+    print(f"Using encoding: {detected_encoding}")
+    
+    return await asyncio.to_thread(recognize_converted, converted_audio, detected_encoding, language_code)
+
+def build_audio_receipt_prompt(transcript: str) -> str:
+    """
+    Build the Gemini prompt that turns a receipt transcript into receipt JSON.
+    
+    The output shape is enforced by the `Receipt` response schema.
+    
+    Args:
+        transcript: Transcribed receipt description
+    
+    Returns:
+        str: Prompt text
+    """
+    return f"""
+        You are an expert financial assistant. The user has provided audio describing a receipt.
+        Extract the receipt information from the following transcript.
+        Use YYYY-MM-DD for the purchase date. If any information is not available, use null.
+        
+        Transcript: {transcript}
+        """
+
 def process_audio_receipt(audio_bytes: bytes, language_code: str = "en-US", filename: str = "") -> str:
     """
     Process audio receipt and extract receipt information.
@@ -301,34 +535,50 @@ def process_audio_receipt(audio_bytes: bytes, language_code: str = "en-US", file
         # Step 2: Process the transcript through Gemini for receipt extraction
         from .gemini import generate
         
-        prompt = f"""
-        You are an expert financial assistant. The user has provided audio describing a receipt.
-        Please extract the receipt information from the following transcript and format it as JSON:
-        
-        Transcript: {transcript}
-        
-        Please extract and return the following information in JSON format:
-        {{
-            "merchant_name": "store name",
-            "purchase_date": "YYYY-MM-DD",
-            "total_amount": 0.00,
-            "tax_amount": 0.00,
-            "items": [
-                {{
-                    "description": "item name",
-                    "quantity": 1,
-                    "price": 0.00
-                }}
-            ]
-        }}
+        # Generate structured receipt data
+        response = generate(build_audio_receipt_prompt(transcript), response_schema=Receipt)
+        record_receipts(response, source="audio")
+        return response
         
-        If any information is not available, use null for that field.
-        """
+    except Exception as e:
+        print(f"Error processing audio receipt: {e}")
+        raise e
+
+async def process_audio_receipt_async(audio_bytes: bytes, language_code: str = "en-US", filename: str = "") -> str:
+    """
+    Async variant of `process_audio_receipt()`.
+    
+    Args:
+        audio_bytes: Audio file bytes containing receipt information
+        language_code: Language code for transcription
+        filename: Optional filename for format detection
+    
+    Returns:
+        str: Extracted receipt information in text format
+    """
+    try:
+        print("Converting audio to text...")
+        transcript = await transcribe_audio_async(audio_bytes, language_code, filename)
+        print(f"Transcription: {transcript}")
         
-        # Generate structured receipt data
-        response = generate(prompt)
+        response = await receipt_from_transcript_async(transcript)
+        await asyncio.to_thread(record_receipts, response, "audio")
         return response
         
     except Exception as e:
         print(f"Error processing audio receipt: {e}")
-        raise e 
\ No newline at end of file
+        raise e
+
+async def receipt_from_transcript_async(transcript: str) -> str:
+    """
+    Extract receipt information from an already transcribed receipt description.
+    
+    Args:
+        transcript: Transcribed receipt description
+    
+    Returns:
+        str: Extracted receipt information in text format
+    """
+    from .gemini import generate_async
+    
+    return await generate_async(build_audio_receipt_prompt(transcript), response_schema=Receipt)
@@ -0,0 +1,152 @@
+"""
+Audio-to-receipt extraction engines.
+
+`two_stage` transcribes with Speech-to-Text and then asks Gemini to turn the
+transcript into receipt JSON. `fused` sends the audio itself to Gemini as a
+multimodal part with the receipt schema as structured output, so the receipt
+comes back in a single round trip. Results of the fused engine share the
+content-addressed extraction cache. Configured through environment variables:
+
+    AUDIO_RECEIPT_ENGINE         default engine when a request does not pick one (default two_stage)
+    FUSED_AUDIO_MAX_BYTES        larger uploads fall back to two_stage (default 18 MiB, under
+                                 Gemini's inline request limit)
+"""
+
+import asyncio
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from google.genai import types
+from .audio_processor import receipt_from_transcript_async
+from .audio_sniffer import sniff_audio_format
+from .extraction_cache import extraction_cache, make_key
+from .gemini import MODEL, build_config
+from .genai_client import get_async_client
+from .receipt_ledger import record_receipts
+from .receipt_schema import Receipt
+from .streaming_audio import transcribe_upload
+
+load_dotenv(dotenv_path=".env")
+
+ENGINES = ("two_stage", "fused")
+DEFAULT_ENGINE = os.getenv("AUDIO_RECEIPT_ENGINE", "two_stage")
+FUSED_MAX_BYTES = int(os.getenv("FUSED_AUDIO_MAX_BYTES", str(18 * 1024 * 1024)))
+
+AUDIO_RECEIPT_PROMPT = """
+    You are an expert financial assistant. The attached audio is the user describing a receipt.
+    Listen to it and extract the receipt information.
+    Use YYYY-MM-DD for the purchase date. If a value is not mentioned, use null.
+    """
+
+_AUDIO_MIME_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mp3",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "webm": "audio/webm",
+    "m4a": "audio/mp4",
+    "aac": "audio/aac",
+}
+
+
+def audio_mime_type(audio_bytes: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Pick the MIME type Gemini should decode the audio with.
+
+    Args:
+        audio_bytes: Raw audio bytes.
+        content_type: MIME type declared by the client, used if the header is unknown.
+
+    Returns:
+        str: Audio MIME type.
+    """
+    info = sniff_audio_format(audio_bytes)
+    if info is not None and info.format in _AUDIO_MIME_TYPES:
+        return _AUDIO_MIME_TYPES[info.format]
+    if content_type and content_type.startswith("audio/"):
+        return content_type
+    return "audio/mp3"
+
+
+def resolve_engine(engine: Optional[str], audio_size: int) -> str:
+    """
+    Validate the requested engine and apply the size fallback.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of: {', '.join(ENGINES)}")
+    if engine == "fused" and audio_size > FUSED_MAX_BYTES:
+        print(f"Audio is {audio_size} bytes, too large to inline; using two_stage")
+        return "two_stage"
+    return engine
+
+
+async def extract_receipt_from_audio_async(audio_bytes: bytes, content_type: Optional[str] = None) -> str:
+    """
+    Extract receipt JSON from audio with a single Gemini call.
+
+    Args:
+        audio_bytes: Audio file bytes describing a receipt.
+        content_type: MIME type declared by the client.
+
+    Returns:
+        str: Receipt JSON text matching `Receipt`.
+    """
+    cache_key = make_key([audio_bytes], AUDIO_RECEIPT_PROMPT, MODEL)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_async_client()
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=AUDIO_RECEIPT_PROMPT),
+                types.Part.from_bytes(data=audio_bytes, mime_type=audio_mime_type(audio_bytes, content_type)),
+            ],
+        )
+    ]
+    response = await client.models.generate_content(
+        model=MODEL,
+        contents=contents,
+        config=build_config(response_schema=Receipt),
+    )
+    text = response.text or ""
+    if text:
+        extraction_cache.set(cache_key, text)
+    return text
+
+
+async def process_audio_upload(audio_file: UploadFile, language_code: str = "en-US",
+                               engine: Optional[str] = None) -> dict:
+    """
+    Turn an uploaded audio receipt into receipt JSON with the chosen engine.
+
+    Args:
+        audio_file: Multipart upload.
+        language_code: Language code for transcription (two_stage only).
+        engine: "two_stage" or "fused"; defaults to AUDIO_RECEIPT_ENGINE.
+
+    Returns:
+        dict: engine used, transcript (None for fused) and the model's receipt text.
+    """
+    size = await asyncio.to_thread(audio_file.file.seek, 0, os.SEEK_END)
+    await asyncio.to_thread(audio_file.file.seek, 0)
+    engine = resolve_engine(engine, size)
+
+    if engine == "fused":
+        audio_bytes = await audio_file.read()
+        receipt = await extract_receipt_from_audio_async(audio_bytes, audio_file.content_type)
+        await asyncio.to_thread(record_receipts, receipt, "audio")
+        return {"engine": engine, "transcript": None, "receipt_data": receipt}
+
+    transcript = await transcribe_upload(audio_file, language_code)
+    print(f"Transcription: {transcript}")
+    receipt = await receipt_from_transcript_async(transcript)
+    await asyncio.to_thread(record_receipts, receipt, "audio")
+    return {"engine": engine, "transcript": transcript, "receipt_data": receipt}
@@ -0,0 +1,129 @@
+"""
+Audio container/codec detection from magic bytes.
+
+Only the first few kilobytes of the upload are inspected, through a
+memoryview, so detection costs microseconds regardless of file size and does
+not depend on the (often wrong) filename extension.
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+HEADER_BYTES = 4096
+
+# Sample rates the Speech API accepts for OGG_OPUS
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+class AudioFormatInfo(NamedTuple):
+    """What the header says about an audio upload."""
+    format: str                      # decoder name: wav, mp3, flac, ogg, webm, m4a, aac, amr
+    encoding: Optional[str] = None   # Speech API encoding if natively supported, else None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    duration: Optional[float] = None  # seconds, when the header records it
+
+
+def sniff_audio_format(audio_bytes: bytes) -> Optional[AudioFormatInfo]:
+    """
+    Detect the audio container and codec from the file header.
+
+    Args:
+        audio_bytes: Raw audio bytes (only the header is read).
+
+    Returns:
+        AudioFormatInfo, or None if the format is not recognised.
+    """
+    header = memoryview(audio_bytes)[:HEADER_BYTES]
+    if len(header) < 12:
+        return None
+    magic = header[:4].tobytes()
+
+    if magic == b"RIFF" and header[8:12].tobytes() == b"WAVE":
+        return _sniff_wav(header)
+    if magic == b"fLaC":
+        return _sniff_flac(header)
+    if magic == b"OggS":
+        return _sniff_ogg(header)
+    if magic == b"\x1a\x45\xdf\xa3":
+        # Matroska/WebM: the codec ID string sits in the track header near the start
+        if audio_bytes.find(b"A_OPUS", 0, HEADER_BYTES) != -1:
+            # Opus always decodes at 48 kHz
+            return AudioFormatInfo("webm", "WEBM_OPUS", 48000)
+        return AudioFormatInfo("webm")
+    if header[4:8].tobytes() == b"ftyp":
+        return AudioFormatInfo("m4a")
+    if header[:9].tobytes() == b"#!AMR-WB\n":
+        return AudioFormatInfo("amr", "AMR_WB", 16000, 1)
+    if header[:6].tobytes() == b"#!AMR\n":
+        return AudioFormatInfo("amr", "AMR", 8000, 1)
+    if header[:3].tobytes() == b"ID3":
+        return AudioFormatInfo("mp3", "MP3")
+    if header[0] == 0xFF and (header[1] & 0xE0) == 0xE0:
+        layer = (header[1] >> 1) & 0x3
+        if layer == 0:
+            return AudioFormatInfo("aac")  # ADTS
+        if layer == 1:
+            return AudioFormatInfo("mp3", "MP3")
+    return None
+
+
+def _sniff_wav(header: memoryview) -> AudioFormatInfo:
+    # Walk the RIFF chunks for "fmt " and the size of "data"
+    fmt = None
+    data_size = None
+    offset = 12
+    while offset + 8 <= len(header) and (fmt is None or data_size is None):
+        chunk_id = header[offset:offset + 4].tobytes()
+        (chunk_size,) = struct.unpack_from("<I", header, offset + 4)
+        if chunk_id == b"fmt " and offset + 24 <= len(header):
+            format_tag, channels, sample_rate, byte_rate = struct.unpack_from("<HHII", header, offset + 8)
+            (bits,) = struct.unpack_from("<H", header, offset + 22)
+            if format_tag == 0xFFFE and offset + 34 <= len(header):
+                # WAVE_FORMAT_EXTENSIBLE: the real tag leads the sub-format GUID
+                (format_tag,) = struct.unpack_from("<H", header, offset + 32)
+            fmt = (format_tag, channels, sample_rate, byte_rate, bits)
+        elif chunk_id == b"data":
+            data_size = chunk_size
+        offset += 8 + chunk_size + (chunk_size & 1)
+    if fmt is None:
+        return AudioFormatInfo("wav")
+
+    format_tag, channels, sample_rate, byte_rate, bits = fmt
+    encoding = None
+    if format_tag == 1 and bits == 16:
+        encoding = "LINEAR16"
+    elif format_tag == 7 and bits == 8:
+        encoding = "MULAW"
+    # Streaming writers leave the size at 0 or 0xFFFFFFFF
+    duration = None
+    if data_size and data_size != 0xFFFFFFFF and byte_rate:
+        duration = data_size / byte_rate
+    return AudioFormatInfo("wav", encoding, sample_rate, channels, duration)
+
+
+def _sniff_flac(header: memoryview) -> AudioFormatInfo:
+    # STREAMINFO is always the first metadata block: rate is 20 bits at byte 18,
+    # followed by channels, bits per sample and a 36-bit total sample count
+    if len(header) < 26:
+        return AudioFormatInfo("flac", "FLAC")
+    b18, b19, b20, b21 = header[18], header[19], header[20], header[21]
+    sample_rate = (b18 << 12) | (b19 << 4) | (b20 >> 4)
+    channels = ((b20 >> 1) & 0x7) + 1
+    total_samples = ((b21 & 0x0F) << 32) | struct.unpack_from(">I", header, 22)[0]
+    duration = total_samples / sample_rate if total_samples and sample_rate else None
+    return AudioFormatInfo("flac", "FLAC", sample_rate, channels, duration)
+
+
+def _sniff_ogg(header: memoryview) -> AudioFormatInfo:
+    # The first page carries the codec identification packet after the segment table
+    if len(header) < 28:
+        return AudioFormatInfo("ogg")
+    packet = 27 + header[26]
+    ident = header[packet:packet + 8].tobytes()
+    if ident == b"OpusHead" and packet + 16 <= len(header):
+        channels = header[packet + 9]
+        (input_rate,) = struct.unpack_from("<I", header, packet + 12)
+        sample_rate = input_rate if input_rate in _OPUS_SAMPLE_RATES else 48000
+        return AudioFormatInfo("ogg", "OGG_OPUS", sample_rate, channels)
+    return AudioFormatInfo("ogg")
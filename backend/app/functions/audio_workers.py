@@ -0,0 +1,95 @@
+"""
+Process pool for CPU-heavy audio decoding and resampling.
+
+pydub/ffmpeg conversion can take seconds for long voice memos; running it in
+the request coroutine freezes every other request on the worker. Jobs are
+submitted to a process pool with a per-job timeout, and queue depth and job
+latency are reported under /metrics. Configured through environment variables:
+
+    AUDIO_WORKERS                     pool size (default 2)
+    AUDIO_CONVERSION_TIMEOUT_SECONDS  per-job timeout (default 120)
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from dotenv import load_dotenv
+from .metrics import LatencyTracker, register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+AUDIO_WORKERS = int(os.getenv("AUDIO_WORKERS", "2"))
+CONVERSION_TIMEOUT_SECONDS = float(os.getenv("AUDIO_CONVERSION_TIMEOUT_SECONDS", "120"))
+
+
+class AudioConversionPool:
+    """
+    Runs audio conversion jobs in worker processes.
+
+    Args:
+        max_workers: Number of worker processes.
+        timeout: Default per-job timeout in seconds (0 disables it).
+    """
+
+    def __init__(self, max_workers: int = AUDIO_WORKERS, timeout: float = CONVERSION_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.timeouts = 0
+        self.latency = LatencyTracker()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run `fn(*args)` in the pool and await its result.
+
+        Args:
+            fn: Module-level (picklable) function to execute.
+            *args: Arguments passed to `fn`.
+            timeout: Per-job timeout in seconds; defaults to the pool timeout.
+
+        Raises:
+            TimeoutError: If the job does not finish in time.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), fn, *args)
+        self.in_flight += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await asyncio.wait_for(future, timeout=timeout or None)
+            ok = True
+            return result
+        except asyncio.TimeoutError:
+            # The worker finishes the abandoned job on its own; the caller stops waiting
+            self.timeouts += 1
+            raise TimeoutError(f"Audio conversion timed out after {timeout:.0f}s")
+        finally:
+            self.in_flight -= 1
+            self.latency.record(time.perf_counter() - start, ok=ok)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.max_workers),
+            "timeouts": self.timeouts,
+            "jobs": self.latency.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+audio_conversion_pool = AudioConversionPool()
+register_metrics("audio_conversion", audio_conversion_pool.stats)
@@ -0,0 +1,160 @@
+"""
+Bulk receipt extraction with bounded parallel fan-out.
+
+Images are split into micro-batches that are extracted concurrently (bounded by
+a semaphore and the shared Gemini limiter). A micro-batch that keeps failing is
+retried image by image, so one unreadable receipt does not sink the rest.
+Results are yielded per receipt as soon as their batch finishes. Defaults come
+from environment variables:
+
+    EXTRACT_BATCH_SIZE         images per model call (default 4)
+    EXTRACT_BATCH_CONCURRENCY  micro-batches in flight per request (default 8)
+    EXTRACT_BATCH_MAX_RETRIES  retries per micro-batch / item (default 2)
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, List, Optional
+from dotenv import load_dotenv
+from .concurrency import gemini_limiter
+from .extraction_cache import extraction_cache, make_key
+from .extractor import EXTRACTION_PROMPT, MODEL, extract_async, parse_extraction
+from .metrics import LatencyTracker, register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+BATCH_SIZE = int(os.getenv("EXTRACT_BATCH_SIZE", "4"))
+BATCH_CONCURRENCY = int(os.getenv("EXTRACT_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_RETRIES = int(os.getenv("EXTRACT_BATCH_MAX_RETRIES", "2"))
+RETRY_BACKOFF_SECONDS = 0.5
+
+batch_item_latency = LatencyTracker()
+register_metrics("extract_batch", batch_item_latency.snapshot)
+
+
+def _item_result(index: int, filename: Optional[str], started: float, attempts: int,
+                 receipt=None, error: Optional[str] = None) -> dict:
+    latency = time.perf_counter() - started
+    batch_item_latency.record(latency, ok=error is None)
+    result = {
+        "index": index,
+        "filename": filename,
+        "status": "ok" if error is None else "error",
+        "latency_ms": round(latency * 1000, 1),
+        "attempts": attempts,
+    }
+    if error is None:
+        result["receipt"] = receipt
+    else:
+        result["error"] = error
+    return result
+
+
+async def _extract_receipts(image_bytes_list: List[bytes]) -> list:
+    """Run one model call for a micro-batch and return one receipt per image."""
+    async with gemini_limiter.slot():
+        response = await extract_async(image_bytes_list)
+    parsed = parse_extraction(response)
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    if not isinstance(parsed, list) or len(parsed) != len(image_bytes_list):
+        raise ValueError(f"expected {len(image_bytes_list)} receipt(s) from the model, got: {str(parsed)[:200]}")
+    if len(image_bytes_list) > 1:
+        # Seed the per-image cache so later single uploads of these photos hit it
+        for img_bytes, receipt in zip(image_bytes_list, parsed):
+            extraction_cache.set(make_key([img_bytes], EXTRACTION_PROMPT, MODEL), json.dumps(receipt))
+    return parsed
+
+
+async def _with_retries(image_bytes_list: List[bytes], max_retries: int):
+    """Return (receipts, attempts, error) for a micro-batch after up to `max_retries` retries."""
+    error = None
+    for attempt in range(max_retries + 1):
+        if attempt:
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        try:
+            return await _extract_receipts(image_bytes_list), attempt + 1, None
+        except Exception as e:
+            error = str(getattr(e, "detail", e))
+            print(f"Batch extraction attempt {attempt + 1} failed: {error}")
+    return None, max_retries + 1, error
+
+
+async def _process_batch(indices: List[int], image_bytes_list: List[bytes],
+                         filenames: List[Optional[str]], max_retries: int) -> List[dict]:
+    started = time.perf_counter()
+    results = []
+    pending = []
+
+    for i in indices:
+        cached = extraction_cache.get(make_key([image_bytes_list[i]], EXTRACTION_PROMPT, MODEL))
+        if cached is not None:
+            results.append(_item_result(i, filenames[i], started, 0, receipt=parse_extraction(cached)))
+        else:
+            pending.append(i)
+    if not pending:
+        return results
+
+    receipts, attempts, error = await _with_retries([image_bytes_list[i] for i in pending], max_retries)
+    if receipts is not None:
+        results.extend(
+            _item_result(i, filenames[i], started, attempts, receipt=receipt)
+            for i, receipt in zip(pending, receipts)
+        )
+        return results
+
+    if len(pending) == 1:
+        results.append(_item_result(pending[0], filenames[pending[0]], started, attempts, error=error))
+        return results
+
+    # Isolate the failure: retry each image of the batch on its own
+    for i in pending:
+        receipts, item_attempts, item_error = await _with_retries([image_bytes_list[i]], max_retries)
+        results.append(_item_result(
+            i, filenames[i], started, attempts + item_attempts,
+            receipt=receipts[0] if receipts else None, error=item_error,
+        ))
+    return results
+
+
+async def extract_batch(
+    image_bytes_list: List[bytes],
+    filenames: Optional[List[Optional[str]]] = None,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = BATCH_CONCURRENCY,
+    max_retries: int = BATCH_MAX_RETRIES,
+) -> AsyncIterator[dict]:
+    """
+    Extract many receipts concurrently, yielding one result dict per image.
+
+    Args:
+        image_bytes_list: Raw receipt images.
+        filenames: Optional filenames echoed back in each result.
+        batch_size: Images sent per model call.
+        concurrency: Maximum micro-batches in flight.
+        max_retries: Retries per micro-batch, and per image when a batch is split.
+
+    Yields:
+        dict: `{"index", "filename", "status", "receipt" | "error", "latency_ms", "attempts"}`
+        in completion order.
+    """
+    filenames = filenames or [None] * len(image_bytes_list)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(indices: List[int]) -> List[dict]:
+        async with semaphore:
+            return await _process_batch(indices, image_bytes_list, filenames, max_retries)
+
+    tasks = [
+        asyncio.create_task(run(list(range(start, min(start + batch_size, len(image_bytes_list))))))
+        for start in range(0, len(image_bytes_list), batch_size)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for result in await next_done:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
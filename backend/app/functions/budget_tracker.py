@@ -0,0 +1,364 @@
+"""
+Incremental budget aggregates and milestone detection for the goal tracker.
+
+Every receipt newly recorded in the receipt ledger is folded into per-user
+running totals (per category and month) and per-item unit-price statistics,
+in time proportional to the receipt's own items. After each receipt, the
+categories it touched are checked against the user's monthly goals, and a
+50%/90% milestone fires exactly once per goal and month, when spending first
+crosses it. Only a firing milestone leads to a model call: the goal tracker
+prompt then gets the goal, the receipt's items and price comparisons, and
+returns a push-notification headline (or "None"), which is kept in a short
+per-user insight feed.
+
+Goals and fired milestones live in SQLite; running totals are rebuilt from
+the ledger the first time a user is seen after a restart. Configured through
+environment variables:
+
+    BUDGET_TRACKER_DB     SQLite file for goals and fired milestones (default budget_tracker.db)
+    BUDGET_MILESTONES     comma-separated fractions of a goal (default 0.5,0.9)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from .metrics import Counters, LatencyTracker, register_metrics
+from .receipt_ledger import ReceiptLedger, receipt_ledger
+
+load_dotenv(dotenv_path=".env")
+
+BUDGET_DB = os.getenv("BUDGET_TRACKER_DB", "budget_tracker.db")
+MILESTONES = tuple(sorted(float(value) for value in os.getenv("BUDGET_MILESTONES", "0.5,0.9").split(",")))
+# An item is flagged when its unit price is this much above its running average
+PRICE_INCREASE = 0.2
+# ... and has been bought at least this many times before
+PRICE_HISTORY_MIN = 3
+INSIGHTS_PER_USER = 20
+OTHER_CATEGORY = "other"
+
+# Keyword → category, matched against item descriptions first, then the merchant name
+CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "groceries": ("grocer", "supermarket", "market", "mart", "milk", "bread", "egg", "rice", "flour", "fruit",
+                  "vegetable", "apple", "banana", "tomato", "onion", "potato", "chicken", "cheese", "butter",
+                  "yogurt", "avocado", "snack", "cereal"),
+    "dining": ("restaurant", "cafe", "coffee", "latte", "espresso", "starbucks", "pizza", "burger", "mcdonald",
+               "kfc", "subway", "diner", "bistro"),
+    "transport": ("fuel", "petrol", "diesel", "gasoline", "uber", "lyft", "taxi", "parking", "toll",
+                  "chevron", "metro"),
+    "household": ("soap", "detergent", "tissue", "towel", "cleaner", "battery", "batteries", "bulb", "ikea"),
+    "health": ("pharmacy", "medicine", "vitamin", "clinic", "cvs", "walgreens"),
+    "entertainment": ("cinema", "movie", "netflix", "spotify", "concert", "game", "theatre", "theater"),
+}
+
+Insight = Callable[[dict], Optional[str]]
+
+
+def _key(text: Optional[str]) -> str:
+    return " ".join(text.lower().split()) if text else ""
+
+
+def categorize(description: Optional[str], merchant: Optional[str] = None) -> str:
+    """Category of an item (or, failing that, of its merchant) by keyword."""
+    for text in (_key(description), _key(merchant)):
+        if not text:
+            continue
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            if any(keyword in text for keyword in keywords):
+                return category
+    return OTHER_CATEGORY
+
+
+def purchase_month(purchase_date: Optional[str]) -> str:
+    """YYYY-MM of a YYYY-MM-DD purchase date; the current month if it is missing or malformed."""
+    try:
+        return datetime.strptime(purchase_date or "", "%Y-%m-%d").strftime("%Y-%m")
+    except ValueError:
+        return time.strftime("%Y-%m")
+
+
+class PriceStats:
+    """Running unit-price statistics for one item."""
+
+    __slots__ = ("count", "total", "min_price", "min_merchant", "last_price")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min_price = float("inf")
+        self.min_merchant: Optional[str] = None
+        self.last_price: Optional[float] = None
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, price: float, merchant: Optional[str]) -> None:
+        self.count += 1
+        self.total += price
+        self.last_price = price
+        if price < self.min_price:
+            self.min_price = price
+            self.min_merchant = merchant
+
+
+class UserBudget:
+    """In-memory running aggregates for one user."""
+
+    def __init__(self):
+        # (category, "YYYY-MM") -> amount
+        self.spending: Dict[Tuple[str, str], float] = defaultdict(float)
+        self.prices: Dict[str, PriceStats] = {}
+        # Ledger receipts already folded in, so a receipt is never counted twice
+        self.receipt_ids: Set[str] = set()
+        self.insights: Deque[dict] = deque(maxlen=INSIGHTS_PER_USER)
+
+
+class BudgetTracker:
+    """
+    Maintains budget aggregates from ledger receipts and fires milestone insights.
+
+    Args:
+        db_path: SQLite file for goals and fired milestones.
+        ledger: Ledger used to rebuild a user's aggregates after a restart.
+        milestones: Fractions of a goal that trigger an insight.
+        insight: Called with the goal tracker payload when a milestone fires;
+            returns a headline or None. Defaults to a Gemini call.
+        background: Run `insight` on a worker thread instead of inline.
+    """
+
+    def __init__(self, db_path: str = BUDGET_DB, ledger: Optional[ReceiptLedger] = receipt_ledger,
+                 milestones: Tuple[float, ...] = MILESTONES, insight: Optional[Insight] = None,
+                 background: bool = True):
+        self.ledger = ledger
+        self.milestones = milestones
+        self.insight = insight or generate_goal_insight
+        self._lock = threading.RLock()
+        self._users: Dict[str, UserBudget] = {}
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="budget-insight") if background else None
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._goals: Dict[str, Dict[str, dict]] = defaultdict(dict)
+        self._fired: Set[Tuple[str, str, str, float]] = set()
+        self.counters = Counters("receipts", "duplicates", "milestones_fired", "insight_calls", "insights")
+        self.ingest_latency = LatencyTracker()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database and load goals and fired milestones on first use (with self._lock held)."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS budget_goals ("
+                "user_id TEXT NOT NULL, category TEXT NOT NULL, goal_name TEXT, goal_amount REAL NOT NULL, "
+                "PRIMARY KEY (user_id, category))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS budget_milestones ("
+                "user_id TEXT NOT NULL, category TEXT NOT NULL, month TEXT NOT NULL, milestone REAL NOT NULL, "
+                "fired_at REAL NOT NULL, PRIMARY KEY (user_id, category, month, milestone))"
+            )
+            for user_id, category, goal_name, goal_amount in conn.execute(
+                "SELECT user_id, category, goal_name, goal_amount FROM budget_goals"
+            ):
+                self._goals[user_id][category] = {"goalName": goal_name, "goalAmount": goal_amount}
+            self._fired.update(conn.execute("SELECT user_id, category, month, milestone FROM budget_milestones"))
+            self._conn = conn
+        return self._conn
+
+    def set_goal(self, user_id: str, category: str, goal_amount: float, goal_name: Optional[str] = None) -> dict:
+        """Create or replace a user's monthly goal for `category`."""
+        if goal_amount <= 0:
+            raise ValueError("goal_amount must be positive")
+        category = _key(category) or OTHER_CATEGORY
+        if category not in CATEGORY_KEYWORDS and category != OTHER_CATEGORY:
+            raise ValueError(f"category must be one of: {', '.join([*CATEGORY_KEYWORDS, OTHER_CATEGORY])}")
+        goal_name = goal_name or f"Monthly {category.title()} Budget"
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO budget_goals (user_id, category, goal_name, goal_amount) VALUES (?, ?, ?, ?)",
+                (user_id, category, goal_name, goal_amount),
+            )
+            self._goals[user_id][category] = {"goalName": goal_name, "goalAmount": goal_amount}
+        return self.goal_status(user_id, category)
+
+    def goal_status(self, user_id: str, category: str, month: Optional[str] = None) -> dict:
+        """A goal with the user's spending against it for `month` (default: current month)."""
+        month = month or time.strftime("%Y-%m")
+        with self._lock:
+            self._db()
+            goal = self._goals[user_id][category]
+            spending = self._user(user_id).spending.get((category, month), 0.0)
+            return {
+                "category": category,
+                "month": month,
+                **goal,
+                "currentSpending": round(spending, 2),
+                "milestonesReached": [m for m in self.milestones if (user_id, category, month, m) in self._fired],
+            }
+
+    def goals(self, user_id: str, month: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            self._db()
+            return [self.goal_status(user_id, category, month) for category in self._goals.get(user_id, {})]
+
+    def insights(self, user_id: str) -> List[dict]:
+        with self._lock:
+            return list(self._user(user_id).insights)
+
+    def _user(self, user_id: str, skip_receipt: Optional[str] = None) -> UserBudget:
+        budget = self._users.get(user_id)
+        if budget is None:
+            budget = self._users[user_id] = UserBudget()
+            # Rebuild aggregates from the ledger; milestones already fired stay in SQLite
+            if self.ledger is not None:
+                for receipt_id, receipt in self.ledger.iter_receipts(user_id):
+                    if receipt_id != skip_receipt:
+                        self._apply(budget, receipt)
+                        budget.receipt_ids.add(receipt_id)
+        return budget
+
+    def _apply(self, budget: UserBudget, receipt: Dict[str, Any]) -> Tuple[Dict[str, float], List[dict]]:
+        """Fold one receipt into the aggregates; return per-category amounts and price observations."""
+        month = purchase_month(receipt.get("purchase_date"))
+        merchant = receipt.get("merchant_name")
+        amounts: Dict[str, float] = defaultdict(float)
+        observations = []
+        for item in receipt.get("items") or []:
+            price = item.get("price")
+            if price is None:
+                continue
+            amounts[categorize(item.get("description"), merchant)] += price
+            name = _key(item.get("description"))
+            if name:
+                unit_price = price / item["quantity"] if item.get("quantity") else price
+                stats = budget.prices.setdefault(name, PriceStats())
+                observations.append({
+                    "description": item.get("description"),
+                    "unitPrice": round(unit_price, 2),
+                    "previousAverage": round(stats.average, 2) if stats.count else None,
+                    "previousPurchases": stats.count,
+                    "aboveUsualPrice": stats.count >= PRICE_HISTORY_MIN
+                                       and unit_price > stats.average * (1 + PRICE_INCREASE),
+                    "cheapestSeen": None if stats.min_price == float("inf") else round(stats.min_price, 2),
+                    "cheapestAt": stats.min_merchant,
+                })
+                stats.add(unit_price, merchant)
+        if not amounts and receipt.get("total_amount") is not None:
+            amounts[categorize(None, merchant)] += receipt["total_amount"]
+        for category, amount in amounts.items():
+            budget.spending[(category, month)] += amount
+        return amounts, observations
+
+    def ingest(self, user_id: str, receipt: Dict[str, Any], receipt_id: Optional[str] = None) -> List[dict]:
+        """
+        Fold a receipt into the user's aggregates and return the milestones it crossed.
+
+        Each returned event is the payload handed to the goal tracker prompt.
+        """
+        start = time.perf_counter()
+        events = []
+        with self._lock:
+            conn = self._db()
+            budget = self._user(user_id, skip_receipt=receipt_id)
+            if receipt_id is not None and receipt_id in budget.receipt_ids:
+                # The ledger commits before calling listeners; a rebuild in between already counted it
+                self.counters.incr("duplicates")
+                return events
+            if receipt_id is not None:
+                budget.receipt_ids.add(receipt_id)
+            month = purchase_month(receipt.get("purchase_date"))
+            amounts, observations = self._apply(budget, receipt)
+            goals = self._goals.get(user_id, {})
+            for category, amount in amounts.items():
+                goal = goals.get(category)
+                if goal is None:
+                    continue
+                current = budget.spending[(category, month)]
+                previous = current - amount
+                crossed = [
+                    m for m in self.milestones
+                    if previous < m * goal["goalAmount"] <= current and (user_id, category, month, m) not in self._fired
+                ]
+                if not crossed:
+                    continue
+                for milestone in crossed:
+                    self._fired.add((user_id, category, month, milestone))
+                    conn.execute(
+                        "INSERT OR IGNORE INTO budget_milestones (user_id, category, month, milestone, fired_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (user_id, category, month, milestone, time.time()),
+                    )
+                self.counters.incr("milestones_fired", len(crossed))
+                events.append({
+                    "goal": {
+                        **goal,
+                        "category": category,
+                        "month": month,
+                        "currentSpending": round(current, 2),
+                        "milestoneCrossed": max(crossed),
+                    },
+                    "items": receipt.get("items") or [],
+                    "priceHistory": [
+                        observation for observation in observations
+                        if categorize(observation["description"], receipt.get("merchant_name")) == category
+                    ],
+                })
+        self.counters.incr("receipts")
+        self.ingest_latency.record(time.perf_counter() - start)
+        return events
+
+    def on_receipt(self, user_id: str, receipt_id: str, receipt: Dict[str, Any]) -> None:
+        """Receipt ledger listener: update aggregates and request insights for fired milestones."""
+        for event in self.ingest(user_id, receipt, receipt_id):
+            if self._executor is not None:
+                self._executor.submit(self._notify, user_id, event)
+            else:
+                self._notify(user_id, event)
+
+    def _notify(self, user_id: str, event: dict) -> None:
+        self.counters.incr("insight_calls")
+        try:
+            headline = self.insight(event)
+        except Exception as e:
+            print(f"Goal insight failed for {user_id}: {e}")
+            return
+        if headline and headline.strip() != "None":
+            self.counters.incr("insights")
+            with self._lock:
+                self._user(user_id).insights.append({
+                    "headline": headline.strip(),
+                    "category": event["goal"]["category"],
+                    "month": event["goal"]["month"],
+                    "milestone": event["goal"]["milestoneCrossed"],
+                    "created_at": time.time(),
+                })
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = len(self._users)
+        return {**self.counters.snapshot(), "users": users, "ingest": self.ingest_latency.snapshot()}
+
+
+def generate_goal_insight(event: dict) -> Optional[str]:
+    """Ask the model for a goal tracker headline about a fired milestone."""
+    from app.agents.goal_tracker_agent import GOAL_TRACKER_AGENT_PROMPT
+    from .gemini import generate
+
+    return generate(f"{GOAL_TRACKER_AGENT_PROMPT}\n\n**Input Data:**\n{json.dumps(event, default=str)}")
+
+
+budget_tracker = BudgetTracker()
+if receipt_ledger is not None:
+    receipt_ledger.add_listener(budget_tracker.on_receipt)
+register_metrics("budget_tracker", budget_tracker.stats)
@@ -0,0 +1,98 @@
+"""
+Concurrency limiting with backpressure for the model-backed endpoints.
+
+A request waits at most `queue_timeout` seconds for a free slot; after that it
+is rejected with 429 and a Retry-After header instead of piling up behind the
+model. Configured through environment variables:
+
+    GEMINI_MAX_CONCURRENCY        concurrent model calls (default 32)
+    GEMINI_QUEUE_TIMEOUT_SECONDS  max wait for a slot (default 2)
+    GEMINI_RETRY_AFTER_SECONDS    Retry-After value on 429 (default 1)
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException
+from dotenv import load_dotenv
+from .metrics import register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+
+class ConcurrencyLimiter:
+    """
+    Async semaphore that rejects callers once the wait for a slot gets too long.
+
+    Args:
+        max_concurrency: Number of requests allowed to run at once.
+        queue_timeout: Seconds a request may wait for a slot (0 = reject immediately).
+        retry_after: Seconds advertised to rejected clients.
+    """
+
+    def __init__(self, max_concurrency: int, queue_timeout: float = 2.0, retry_after: int = 1):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    async def acquire(self) -> None:
+        """Wait for a slot, or raise 429 when the wait would exceed `queue_timeout`."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self._semaphore.locked() and self.queue_timeout <= 0:
+            self._reject()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout or None)
+        except asyncio.TimeoutError:
+            self._reject()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        """Give back a slot taken with `acquire()`."""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block, or raise 429 when saturated."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Server is busy, please retry shortly.",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+gemini_limiter = ConcurrencyLimiter(
+    max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "32")),
+    queue_timeout=float(os.getenv("GEMINI_QUEUE_TIMEOUT_SECONDS", "2")),
+    retry_after=int(os.getenv("GEMINI_RETRY_AFTER_SECONDS", "1")),
+)
+register_metrics("gemini_limiter", gemini_limiter.stats)
@@ -0,0 +1,68 @@
+"""
+Content-addressed cache for receipt extraction results.
+
+Entries are keyed on the SHA-256 of the image bytes plus the prompt and model
+version, so re-uploading the same receipt photo skips the Gemini call.
+Configured through environment variables:
+
+    EXTRACTION_CACHE_MAX_ENTRIES   in-memory entries (default 1024)
+    EXTRACTION_CACHE_MAX_BYTES     in-memory value bytes (default 32 MiB)
+    EXTRACTION_CACHE_TTL_SECONDS   entry lifetime (default 7 days, 0 = forever)
+    EXTRACTION_CACHE_DB            optional SQLite file for the on-disk tier
+"""
+
+import hashlib
+import os
+from typing import List, Optional
+from dotenv import load_dotenv
+from .cache import LRUCache, SQLiteCacheStore, TieredCache
+from .metrics import register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "1024"))
+MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+TTL_SECONDS = float(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_DB = os.getenv("EXTRACTION_CACHE_DB", "")
+
+
+def make_key(image_bytes_list: List[bytes], prompt: str, model: str) -> str:
+    """
+    Build the cache key for an extraction request.
+
+    Args:
+        image_bytes_list: Raw image bytes, in upload order.
+        prompt: Prompt sent alongside the images.
+        model: Model name/version used for the extraction.
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(hashlib.sha256(prompt.encode("utf-8")).digest())
+    for img_bytes in image_bytes_list:
+        digest.update(hashlib.sha256(img_bytes).digest())
+    return digest.hexdigest()
+
+
+extraction_cache = TieredCache(
+    LRUCache(max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, ttl=TTL_SECONDS),
+    SQLiteCacheStore(CACHE_DB, table="extractions", ttl=TTL_SECONDS) if CACHE_DB else None,
+)
+register_metrics("extraction_cache", extraction_cache.stats)
+
+
+def lookup_receipt(image_bytes: bytes) -> Optional[str]:
+    """
+    Return a cached extraction for a single receipt image, if any.
+
+    Args:
+        image_bytes: Raw image bytes as uploaded.
+
+    Returns:
+        The cached model output for that image, or None on a miss.
+    """
+    from .extractor import EXTRACTION_PROMPT, MODEL
+
+    return extraction_cache.get(make_key([image_bytes], EXTRACTION_PROMPT, MODEL))
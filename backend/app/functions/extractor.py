@@ -1,92 +1,120 @@
-from google import genai
-from google.genai import types
+from .genai_client import get_client, get_async_client
+from .gemini import build_contents, build_config
+from .image_preprocessor import preprocess_images, preprocess_images_async
+from .extraction_cache import extraction_cache, make_key
+from .json_stream import parse_receipts
+from .receipt_ledger import record_receipts
+from .receipt_schema import Receipt
+import asyncio
 import base64
 from typing import List, Optional
-import json
 import os
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=".env")
 PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
+MODEL = "gemini-2.5-flash-lite"
+
+EXTRACTION_PROMPT = """
+    You are an expert financial assistant specializing in receipt analysis.
+    Analyze the given receipt image and extract the merchant name, purchase date
+    (YYYY-MM-DD), total amount, tax amount and line items.
+    If multiple images are uploaded, return one receipt per image, in upload order.
+    If a value is not found, use null.
+    """
+
+def receipt_schema_for(image_count: int):
+    """Structured-output schema: one receipt, or a list with one receipt per image."""
+    return list[Receipt] if image_count > 1 else Receipt
+
+def parse_extraction(response: str):
+    """
+    Parse the model's extraction output into JSON.
+
+    Uses the tolerant stream parser, which ignores code fences and repairs
+    truncated output, then normalizes receipts through the shared model.
+    Returns the parsed object/array, or the stripped string if no JSON is found.
+    """
+    try:
+        return parse_receipts(response)
+    except ValueError:
+        return response.strip()
+
+def is_complete_extraction(response: str, image_count: int) -> bool:
+    """True if the output parses to exactly one receipt per image (only these are cached)."""
+    try:
+        parsed = parse_receipts(response)
+    except ValueError:
+        return False
+    if isinstance(parsed, dict):
+        parsed = [parsed]
+    return isinstance(parsed, list) and len(parsed) == max(image_count, 1)
 
 def extract(image_bytes_list: Optional[List[bytes]] = None) -> str:
     """
-    Generate a response from the Gemini model given a user prompt and optional images.
+    Extract structured receipt data from one or more receipt images.
     Args:
-        user_prompt (str): The user's input prompt.
         image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
     Returns:
-        str: The generated response from the Gemini model.
+        str: The raw JSON text generated by the Gemini model.
     """
 
-    client = genai.Client(
-        vertexai=True,
-        project=PROJECT_ID,
-        location="global",
-    )
-    user_prompt="""
-    You are an expert financial assistant specializing in receipt analysis.
-    Analyze the given receipt image and extract the following information.
-    Return the output ONLY as a valid JSON object with the specified schema.
-    If multiple images are uploaded, please return an array of json data
-    If a value is not found, use null.
+    cache_key = make_key(image_bytes_list or [], EXTRACTION_PROMPT, MODEL)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        record_receipts(cached, source="image")
+        return cached
 
+    client = get_client()
+    # Cache keys use the original bytes, so preprocessing only runs on a miss
+    prepared_images = [img for img, _ in preprocess_images(image_bytes_list or [])]
 
-    JSON Schema:
-    {
-    "merchant_name": "string",
-    "purchase_date": "YYYY-MM-DD",
-    "total_amount": "float",
-    "tax_amount": "float",
-    "items": [
-        {
-        "description": "string",
-        "quantity": "integer",
-        "price": "float"
-        }
-    ]
-    }
-    If multiple images are uploaded, please return an array of json data
-    If a value is not found, use null.
+    chunks = []
+    for chunk in client.models.generate_content_stream(
+        model=MODEL,
+        contents=build_contents(EXTRACTION_PROMPT, prepared_images),
+        config=build_config(response_schema=receipt_schema_for(len(prepared_images))),
+    ):
+        if chunk.text:
+            chunks.append(chunk.text)
+    response = "".join(chunks)
 
+    if is_complete_extraction(response, len(image_bytes_list or [])):
+        extraction_cache.set(cache_key, response)
+    if response.strip():
+        record_receipts(response, source="image")
+    return response
+
+async def extract_async(image_bytes_list: Optional[List[bytes]] = None) -> str:
+    """
+    Async variant of `extract()` built on the genai async client.
+    Args:
+        image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
+    Returns:
+        str: The raw JSON text generated by the Gemini model.
     """
 
-    model = "gemini-2.5-flash-lite"
-    parts = [types.Part.from_text(text=user_prompt)]
-    if image_bytes_list:
-        for img_bytes in image_bytes_list:
-            parts.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
-
-    contents = [
-        types.Content(
-            role="user",
-            parts=parts
-        )
-    ]
-
-    generate_content_config = types.GenerateContentConfig(
-        temperature=1,
-        top_p=0.95,
-        max_output_tokens=65535,
-        safety_settings=[
-            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
-            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
-            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
-            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
-        ],
-        thinking_config=types.ThinkingConfig(thinking_budget=0),
-    )
-
-    response = ""
-    for chunk in client.models.generate_content_stream(
-        model=model,
-        contents=contents,
-        config=generate_content_config,
+    cache_key = make_key(image_bytes_list or [], EXTRACTION_PROMPT, MODEL)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        await asyncio.to_thread(record_receipts, cached, "image")
+        return cached
+
+    client = get_async_client()
+    prepared_images = [img for img, _ in await preprocess_images_async(image_bytes_list or [])]
+
+    chunks = []
+    async for chunk in await client.models.generate_content_stream(
+        model=MODEL,
+        contents=build_contents(EXTRACTION_PROMPT, prepared_images),
+        config=build_config(response_schema=receipt_schema_for(len(prepared_images))),
     ):
-        response += chunk.text
+        if chunk.text:
+            chunks.append(chunk.text)
+    response = "".join(chunks)
 
-    #json_string = response.text.strip().replace("json", "").replace("", "")
-        
-    #print("Successfully extracted data.")
-    #return json.loads(json_string)
-    return response
\ No newline at end of file
+    if is_complete_extraction(response, len(image_bytes_list or [])):
+        extraction_cache.set(cache_key, response)
+    if response.strip():
+        await asyncio.to_thread(record_receipts, response, "image")
+    return response
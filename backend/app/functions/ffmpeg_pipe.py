@@ -0,0 +1,135 @@
+"""
+In-memory ffmpeg decoding through stdin/stdout pipes.
+
+Audio is fed to ffmpeg's stdin from a writer thread and 16 kHz mono 16-bit
+PCM is read back from stdout in fixed-size chunks, so nothing touches disk.
+Only `iter_pcm_ffmpeg` keeps memory bounded by the chunk size;
+`convert_with_ffmpeg_pipe` returns the whole decoded WAV, so its output grows
+with the recording (about 115 MB per hour at 16 kHz). Large uploads are
+streamed through the generator instead (see streaming_audio).
+"""
+
+import struct
+import subprocess
+import threading
+from typing import Iterable, Iterator
+
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2
+CHUNK_BYTES = 64 * 1024
+
+
+def iter_pcm_ffmpeg(chunks: Iterable[bytes], sample_rate: int = PCM_SAMPLE_RATE,
+                    chunk_size: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Decode an audio byte stream with ffmpeg, yielding raw PCM chunks.
+
+    Args:
+        chunks: Encoded audio, in order (any container/codec ffmpeg can probe
+            from a pipe; MP4/M4A files with a trailing moov atom cannot be).
+        sample_rate: Output sample rate.
+        chunk_size: Maximum size of each yielded PCM chunk.
+
+    Yields:
+        bytes: Little-endian signed 16-bit mono PCM.
+
+    Raises:
+        RuntimeError: If ffmpeg exits with an error.
+    """
+    process = subprocess.Popen(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+            "-i", "pipe:0",
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate),
+            "pipe:1",
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0,
+    )
+    feed_errors = []
+    stderr_tail = bytearray()
+
+    def feed():
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            # ffmpeg stopped reading; its exit status tells us why
+            pass
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    def drain_stderr():
+        for line in process.stderr:
+            stderr_tail.extend(line)
+            del stderr_tail[:-4096]
+
+    writer = threading.Thread(target=feed, daemon=True)
+    reader = threading.Thread(target=drain_stderr, daemon=True)
+    writer.start()
+    reader.start()
+    try:
+        while True:
+            data = process.stdout.read(chunk_size)
+            if not data:
+                break
+            yield data
+        process.wait()
+        writer.join()
+        reader.join()
+        if feed_errors:
+            raise feed_errors[0]
+        if process.returncode != 0:
+            message = stderr_tail.decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"ffmpeg exited with status {process.returncode}: {message}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def wav_header(data_size: int, sample_rate: int = PCM_SAMPLE_RATE, channels: int = 1,
+               sample_width: int = PCM_SAMPLE_WIDTH) -> bytes:
+    """Build a 44-byte PCM WAV header for `data_size` bytes of audio."""
+    byte_rate = sample_rate * channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8,
+        b"data", data_size,
+    )
+
+
+def convert_with_ffmpeg_pipe(audio_bytes: bytes, sample_rate: int = PCM_SAMPLE_RATE) -> bytes:
+    """
+    Convert an in-memory audio file to 16-bit mono PCM WAV without temp files.
+
+    The decoded PCM is accumulated in memory (32 KB per second of audio at
+    16 kHz), so this is meant for clips below the streaming threshold; use
+    `iter_pcm_ffmpeg` for bounded memory.
+
+    Args:
+        audio_bytes: Encoded audio.
+        sample_rate: Output sample rate.
+
+    Returns:
+        bytes: WAV file bytes.
+    """
+    view = memoryview(audio_bytes)
+    pcm = bytearray()
+    for data in iter_pcm_ffmpeg(
+        (view[i:i + CHUNK_BYTES] for i in range(0, len(view), CHUNK_BYTES)),
+        sample_rate=sample_rate,
+    ):
+        pcm += data
+    if not pcm:
+        raise RuntimeError("ffmpeg produced no audio")
+    return wav_header(len(pcm), sample_rate) + pcm
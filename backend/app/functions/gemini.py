@@ -1,43 +1,38 @@
-from google import genai
 from google.genai import types
+from .genai_client import get_client, get_async_client
+from .image_preprocessor import preprocess_images, preprocess_images_async, sniff_image_mime
 import base64
-from typing import List, Optional
+from typing import Any, AsyncIterator, Iterator, List, Optional
 import os
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path=".env")
 PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
+MODEL = "gemini-2.5-flash-lite"
 
-def generate(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None) -> str:
-    """
-    Generate a response from the Gemini model given a user prompt and optional images.
-    Args:
-        user_prompt (str): The user's input prompt.
-        image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
-    Returns:
-        str: The generated response from the Gemini model.
-    """
-
-    client = genai.Client(
-        vertexai=True,
-        project=PROJECT_ID,
-        location="global",
-    )
-
-    model = "gemini-2.5-flash-lite"
+def build_contents(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None) -> List[types.Content]:
+    """Wrap a text prompt and optional images into a single user turn."""
     parts = [types.Part.from_text(text=user_prompt)]
     if image_bytes_list:
         for img_bytes in image_bytes_list:
-            parts.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
+            mime_type = sniff_image_mime(img_bytes) or "image/jpeg"
+            parts.append(types.Part.from_bytes(data=img_bytes, mime_type=mime_type))
 
-    contents = [
+    return [
         types.Content(
             role="user",
             parts=parts
         )
     ]
 
-    generate_content_config = types.GenerateContentConfig(
+def build_config(response_schema: Optional[Any] = None) -> types.GenerateContentConfig:
+    """
+    Generation config shared by the Gemini helpers.
+
+    Args:
+        response_schema: Optional Pydantic model (or schema) for structured JSON output.
+    """
+    config = types.GenerateContentConfig(
         temperature=1,
         top_p=0.95,
         max_output_tokens=65535,
@@ -49,12 +44,82 @@ def generate(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None) -
         ],
         thinking_config=types.ThinkingConfig(thinking_budget=0),
     )
+    if response_schema is not None:
+        config.response_mime_type = "application/json"
+        config.response_schema = response_schema
+    return config
+
+def generate_stream(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None,
+                    response_schema: Optional[Any] = None) -> Iterator[str]:
+    """
+    Stream the Gemini response text chunk by chunk.
+    Args:
+        user_prompt (str): The user's input prompt.
+        image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
+        response_schema (optional): Pydantic model for structured JSON output.
+    Yields:
+        str: Text chunks as they arrive from the model.
+    """
+
+    client = get_client()
+    if image_bytes_list:
+        image_bytes_list = [img for img, _ in preprocess_images(image_bytes_list)]
 
-    response = ""
     for chunk in client.models.generate_content_stream(
-        model=model,
-        contents=contents,
-        config=generate_content_config,
+        model=MODEL,
+        contents=build_contents(user_prompt, image_bytes_list),
+        config=build_config(response_schema),
     ):
-        response += chunk.text
-    return response
\ No newline at end of file
+        if chunk.text:
+            yield chunk.text
+
+async def generate_stream_async(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None,
+                                response_schema: Optional[Any] = None) -> AsyncIterator[str]:
+    """
+    Async variant of `generate_stream()` built on the genai async client.
+    Args:
+        user_prompt (str): The user's input prompt.
+        image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
+        response_schema (optional): Pydantic model for structured JSON output.
+    Yields:
+        str: Text chunks as they arrive from the model.
+    """
+
+    client = get_async_client()
+    if image_bytes_list:
+        image_bytes_list = [img for img, _ in await preprocess_images_async(image_bytes_list)]
+
+    async for chunk in await client.models.generate_content_stream(
+        model=MODEL,
+        contents=build_contents(user_prompt, image_bytes_list),
+        config=build_config(response_schema),
+    ):
+        if chunk.text:
+            yield chunk.text
+
+def generate(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None,
+             response_schema: Optional[Any] = None) -> str:
+    """
+    Generate a response from the Gemini model given a user prompt and optional images.
+    Args:
+        user_prompt (str): The user's input prompt.
+        image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
+        response_schema (optional): Pydantic model for structured JSON output.
+    Returns:
+        str: The generated response from the Gemini model.
+    """
+    return "".join(generate_stream(user_prompt, image_bytes_list, response_schema))
+
+async def generate_async(user_prompt: str, image_bytes_list: Optional[List[bytes]] = None,
+                         response_schema: Optional[Any] = None) -> str:
+    """
+    Async variant of `generate()` built on the genai async client.
+
+    Args:
+        user_prompt (str): The user's input prompt.
+        image_bytes_list (List[bytes], optional): List of image bytes to send to Gemini.
+        response_schema (optional): Pydantic model for structured JSON output.
+    Returns:
+        str: The generated response from the Gemini model.
+    """
+    return "".join([text async for text in generate_stream_async(user_prompt, image_bytes_list, response_schema)])
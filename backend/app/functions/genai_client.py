@@ -0,0 +1,88 @@
+"""
+Process-wide Gemini client shared by every caller.
+
+Building a `genai.Client` runs credential discovery and opens a new HTTP
+connection pool, so the client is created lazily once per process and reused
+by `generate()`, `extract()` and the audio pipeline. The factory can be
+swapped (e.g. for a local fake transport in benchmarks) with
+`set_client_factory()`.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Optional
+from google import genai
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=".env")
+PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
+LOCATION = os.getenv("GEMINI_LOCATION", "global")
+
+_client: Optional[Any] = None
+_client_lock = threading.Lock()
+
+
+def _default_client_factory() -> Any:
+    """Build the real Vertex AI backed Gemini client."""
+    return genai.Client(
+        vertexai=True,
+        project=PROJECT_ID,
+        location=LOCATION,
+    )
+
+
+_client_factory: Callable[[], Any] = _default_client_factory
+
+
+def get_client() -> Any:
+    """
+    Return the shared Gemini client, creating it on first use.
+
+    Returns:
+        The process-wide `genai.Client` (or whatever the configured factory builds).
+    """
+    global _client
+    client = _client
+    if client is not None:
+        return client
+    with _client_lock:
+        if _client is None:
+            _client = _client_factory()
+        return _client
+
+
+def get_async_client() -> Any:
+    """
+    Return the async surface (`client.aio`) of the shared Gemini client.
+
+    The async client shares credentials and configuration with the sync one,
+    so both paths reuse the same process-wide instance.
+    """
+    return get_client().aio
+
+
+def set_client_factory(factory: Optional[Callable[[], Any]] = None) -> None:
+    """
+    Replace the factory used to build the shared client and drop the current one.
+
+    Args:
+        factory: Zero-argument callable returning a client object exposing
+            `models.generate_content_stream` (and `aio.models...` for async
+            callers). Pass None to restore the real Vertex AI client.
+    """
+    global _client_factory
+    with _client_lock:
+        _client_factory = factory or _default_client_factory
+    reset_client()
+
+
+def reset_client() -> None:
+    """Drop the cached client so the next call builds a fresh one."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def warm_client() -> None:
+    """Eagerly build the shared client (e.g. from an application startup hook)."""
+    get_client()
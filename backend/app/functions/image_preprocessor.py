@@ -0,0 +1,154 @@
+"""
+Receipt image preprocessing before upload to Gemini.
+
+Phone photos arrive as multi-megabyte JPEG/PNG/HEIC files. Receipts only need
+legible text, so images are downscaled, converted to grayscale, re-encoded and
+stripped of EXIF before being sent to the model. Decoding is CPU heavy, so the
+async entry point runs in a process pool. Configured through environment
+variables:
+
+    IMAGE_PREPROCESS          enable preprocessing (default 1)
+    IMAGE_MAX_DIMENSION       longest side in pixels after downscaling (default 1600)
+    IMAGE_OUTPUT_FORMAT       JPEG or WEBP (default JPEG)
+    IMAGE_QUALITY             encoder quality 1-95 (default 80)
+    IMAGE_GRAYSCALE           convert to grayscale (default 1)
+    IMAGE_PREPROCESS_WORKERS  process pool size (default 2)
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
+
+try:
+    # HEIC/HEIF support is optional; without it such uploads are sent unchanged
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
+
+load_dotenv(dotenv_path=".env")
+
+PREPROCESS_ENABLED = os.getenv("IMAGE_PREPROCESS", "1") == "1"
+MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1600"))
+OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "JPEG").upper()
+QUALITY = int(os.getenv("IMAGE_QUALITY", "80"))
+GRAYSCALE = os.getenv("IMAGE_GRAYSCALE", "1") == "1"
+WORKERS = int(os.getenv("IMAGE_PREPROCESS_WORKERS", "2"))
+
+_OUTPUT_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def sniff_image_mime(data: bytes) -> Optional[str]:
+    """
+    Detect the image MIME type from its magic bytes.
+
+    Args:
+        data: Image bytes (only the first few bytes are inspected).
+
+    Returns:
+        The MIME type, or None if the format is not recognised.
+    """
+    header = memoryview(data)[:16].tobytes()
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if header[4:8] == b"ftyp" and header[8:12] in (b"heic", b"heix", b"hevc", b"mif1", b"msf1"):
+        return "image/heic"
+    if header[:4] in (b"II*\x00", b"MM\x00*"):
+        return "image/tiff"
+    if header[:2] == b"BM":
+        return "image/bmp"
+    return None
+
+
+def preprocess_image(
+    image_bytes: bytes,
+    max_dimension: int = MAX_DIMENSION,
+    output_format: str = OUTPUT_FORMAT,
+    quality: int = QUALITY,
+    grayscale: bool = GRAYSCALE,
+) -> Tuple[bytes, str]:
+    """
+    Downscale, optionally grayscale and re-encode one image, dropping its metadata.
+
+    Args:
+        image_bytes: Raw uploaded image.
+        max_dimension: Longest side after downscaling; smaller images are not upscaled.
+        output_format: "JPEG" or "WEBP".
+        quality: Encoder quality.
+        grayscale: Convert to 8-bit grayscale.
+
+    Returns:
+        Tuple of (image bytes, MIME type). If the image cannot be decoded the
+        original bytes are returned with their sniffed MIME type.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img.draft("L" if grayscale else "RGB", (max_dimension, max_dimension))
+            # Apply the EXIF orientation before the metadata is dropped
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+                # Transparent pixels usually hide black RGB, which would swallow dark text
+                rgba = img.convert("RGBA")
+                img = Image.alpha_composite(Image.new("RGBA", rgba.size, (255, 255, 255, 255)), rgba)
+            img = img.convert("L" if grayscale else "RGB")
+
+            output = io.BytesIO()
+            img.save(output, format=output_format, quality=quality, optimize=True)
+            return output.getvalue(), _OUTPUT_MIME_TYPES[output_format]
+    except Exception as e:
+        print(f"Image preprocessing skipped: {e}")
+        return image_bytes, sniff_image_mime(image_bytes) or "image/jpeg"
+
+
+def preprocess_images(image_bytes_list: List[bytes]) -> List[Tuple[bytes, str]]:
+    """Preprocess images in the calling thread (for sync callers)."""
+    if not PREPROCESS_ENABLED:
+        return [(img, sniff_image_mime(img) or "image/jpeg") for img in image_bytes_list]
+    return [preprocess_image(img) for img in image_bytes_list]
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=WORKERS)
+    return _executor
+
+
+async def preprocess_images_async(image_bytes_list: List[bytes]) -> List[Tuple[bytes, str]]:
+    """
+    Preprocess images in the process pool without blocking the event loop.
+
+    Args:
+        image_bytes_list: Raw uploaded images.
+
+    Returns:
+        List of (image bytes, MIME type) in input order.
+    """
+    if not PREPROCESS_ENABLED or not image_bytes_list:
+        return preprocess_images(image_bytes_list) if image_bytes_list else []
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    return list(await asyncio.gather(*(
+        loop.run_in_executor(executor, preprocess_image, img) for img in image_bytes_list
+    )))
+
+
+def shutdown_executor() -> None:
+    """Stop the preprocessing pool (e.g. from an application shutdown hook)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
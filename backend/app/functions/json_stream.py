@@ -0,0 +1,160 @@
+"""
+Tolerant, incremental parser for JSON produced by the model.
+
+The parser scans chunks as they arrive and tracks nesting and string state,
+so it knows the moment the top-level value is complete without re-parsing
+the buffer. Anything before the first `{`/`[` or after the closing bracket,
+such as markdown code fences or commentary, is ignored, and output that was
+cut off mid-value is repaired by closing open strings and brackets.
+"""
+
+import json
+from typing import Any, Iterable, List, Optional, Union
+from pydantic import ValidationError
+from .receipt_schema import Receipt
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONStreamParser:
+    """
+    Incrementally locate and parse the first JSON object or array in a text stream.
+
+    Call `feed()` with each chunk; it returns the parsed value once the
+    top-level value closes. `result()` returns the value, repairing
+    truncated output if the stream ended early.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._done = False
+        self._value: Any = None
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> Optional[Any]:
+        """Consume a chunk; return the parsed value once it is complete, else None."""
+        if self._done or not chunk:
+            return self._value if self._done else None
+
+        start = 0
+        if not self._started:
+            positions = [i for i in (chunk.find("{"), chunk.find("[")) if i != -1]
+            if not positions:
+                return None
+            start = min(positions)
+            self._started = True
+
+        for i in range(start, len(chunk)):
+            char = chunk[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(_CLOSERS[char])
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    self._parts.append(chunk[start:i + 1])
+                    self._done = True
+                    self._value = json.loads("".join(self._parts))
+                    return self._value
+        self._parts.append(chunk[start:])
+        return None
+
+    def result(self) -> Any:
+        """
+        Return the parsed value, repairing output that ended mid-value.
+
+        Raises:
+            ValueError: If no JSON value could be recovered.
+        """
+        if self._done:
+            return self._value
+        if not self._started:
+            raise ValueError("no JSON object or array in model output")
+
+        text = "".join(self._parts)
+        # Close what is open; failing that, drop a dangling separator or the last partial member
+        candidates = [text, text.rstrip().rstrip(",:")]
+        if "," in text:
+            candidates.append(text[:text.rfind(",")])
+        for candidate in candidates:
+            try:
+                return json.loads(_close(candidate))
+            except json.JSONDecodeError:
+                continue
+        raise ValueError("model output is not valid JSON")
+
+
+def _close(text: str) -> str:
+    """Append the quote and brackets needed to close a truncated JSON prefix."""
+    stack = []
+    in_string = escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]" and stack:
+            stack.pop()
+    return text + ('"' if in_string else "") + "".join(reversed(stack))
+
+
+def parse_model_json(text: Union[str, Iterable[str]]) -> Any:
+    """
+    Parse model output (a string or an iterable of chunks) into JSON.
+
+    Raises:
+        ValueError: If no JSON value could be recovered.
+    """
+    parser = JSONStreamParser()
+    for chunk in [text] if isinstance(text, str) else text:
+        if parser.feed(chunk) is not None:
+            break
+    return parser.result()
+
+
+def normalize_receipts(value: Any) -> Any:
+    """
+    Coerce parsed receipt JSON (one object or a list) through the `Receipt` model.
+
+    Values that do not validate are returned unchanged.
+    """
+    if isinstance(value, list):
+        return [normalize_receipts(item) for item in value]
+    if isinstance(value, dict):
+        try:
+            return Receipt.model_validate(value).model_dump()
+        except ValidationError:
+            return value
+    return value
+
+
+def parse_receipts(text: str) -> Any:
+    """
+    Parse and normalize receipt JSON returned by the model.
+
+    Raises:
+        ValueError: If no JSON value could be recovered.
+    """
+    return normalize_receipts(parse_model_json(text))
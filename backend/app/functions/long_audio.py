@@ -0,0 +1,125 @@
+"""
+Long-audio transcription by splitting at silences and recognizing in parallel.
+
+Synchronous recognition only accepts about a minute of audio. Longer 16 kHz
+mono PCM is cut at silence boundaries found by a simple energy-based voice
+activity detector, the segments are recognized concurrently on a bounded
+thread pool, and the transcripts are stitched back in order. Configured
+through environment variables:
+
+    LONG_AUDIO_THRESHOLD_SECONDS   clips longer than this use long mode (default 55)
+    LONG_AUDIO_MAX_SEGMENT_SECONDS longest segment sent to the recognizer (default 50)
+    LONG_AUDIO_CONCURRENCY         segments recognized at once (default 4)
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=".env")
+
+LONG_AUDIO_THRESHOLD_SECONDS = float(os.getenv("LONG_AUDIO_THRESHOLD_SECONDS", "55"))
+MAX_SEGMENT_SECONDS = float(os.getenv("LONG_AUDIO_MAX_SEGMENT_SECONDS", "50"))
+LONG_AUDIO_CONCURRENCY = int(os.getenv("LONG_AUDIO_CONCURRENCY", "4"))
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+MIN_SEGMENT_SECONDS = 10
+MIN_SILENCE_MS = 240
+
+# (pcm_bytes, language_code) -> transcript, for 16 kHz mono LINEAR16 PCM
+Recognizer = Callable[[bytes, str], str]
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def find_segments(pcm: bytes, sample_rate: int = SAMPLE_RATE,
+                  max_segment_seconds: float = MAX_SEGMENT_SECONDS) -> List[Tuple[int, int]]:
+    """
+    Split 16-bit mono PCM into segments that end in silence where possible.
+
+    Each segment is cut at the last sufficiently long pause before
+    `max_segment_seconds`; if there is none, at the quietest frame.
+
+    Args:
+        pcm: Little-endian signed 16-bit mono PCM.
+        sample_rate: Sample rate of `pcm`.
+        max_segment_seconds: Upper bound on segment length.
+
+    Returns:
+        List of (start_byte, end_byte) ranges covering the whole input.
+    """
+    samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+    frame_len = sample_rate * FRAME_MS // 1000
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return [(0, len(pcm))] if pcm else []
+
+    frames = samples[:n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len)
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    # Treat anything near the quietest fifth of the clip as silence
+    threshold = max(float(np.percentile(energy, 20)) * 2.0, 100.0)
+    silent = energy < threshold
+
+    # Midpoints of silent runs long enough to count as a pause
+    min_run = max(1, MIN_SILENCE_MS // FRAME_MS)
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    long_runs = (run_ends - run_starts) >= min_run
+    pause_frames = ((run_starts + run_ends) // 2)[long_runs]
+
+    max_frames = max(2, int(max_segment_seconds * 1000 // FRAME_MS))
+    # Keep the search window [lo, hi) non-empty even for very short max segments
+    min_frames = min(max_frames // 2, int(MIN_SEGMENT_SECONDS * 1000 // FRAME_MS))
+    cuts = []
+    start = 0
+    while n_frames - start > max_frames:
+        lo, hi = start + min_frames, start + max_frames
+        candidates = pause_frames[(pause_frames > lo) & (pause_frames <= hi)]
+        if len(candidates):
+            cut = int(candidates[-1])
+        else:
+            cut = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(cut)
+        start = cut
+
+    bounds = [0] + [cut * frame_len * 2 for cut in cuts] + [len(pcm)]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i + 1] > bounds[i]]
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=LONG_AUDIO_CONCURRENCY, thread_name_prefix="long-audio")
+    return _executor
+
+
+def transcribe_long_audio(pcm: bytes, language_code: str = "en-US",
+                          recognizer: Optional[Recognizer] = None,
+                          max_segment_seconds: float = MAX_SEGMENT_SECONDS) -> str:
+    """
+    Transcribe PCM of any length by recognizing silence-delimited segments concurrently.
+
+    Args:
+        pcm: 16 kHz mono little-endian 16-bit PCM (no WAV header).
+        language_code: Language code for transcription.
+        recognizer: Callable transcribing one PCM segment; defaults to Speech-to-Text.
+        max_segment_seconds: Upper bound on segment length.
+
+    Returns:
+        str: Segment transcripts joined in order.
+    """
+    if recognizer is None:
+        from .audio_processor import recognize_pcm as recognizer
+
+    segments = find_segments(pcm, max_segment_seconds=max_segment_seconds)
+    print(f"Long audio: {len(pcm) / (SAMPLE_RATE * 2):.1f}s split into {len(segments)} segments")
+    futures = [
+        _get_executor().submit(recognizer, pcm[start:end], language_code)
+        for start, end in segments
+    ]
+    transcripts = [future.result() for future in futures]
+    return " ".join(text.strip() for text in transcripts if text and text.strip())
@@ -0,0 +1,98 @@
+"""
+Minimal in-process metrics registry.
+
+Components register a zero-argument provider returning a dict of counters;
+`GET /metrics` returns a snapshot of every registered provider.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+_providers: Dict[str, Callable[[], dict]] = {}
+_lock = threading.Lock()
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Register (or replace) a metrics provider.
+
+    Args:
+        name: Section name in the metrics snapshot.
+        provider: Zero-argument callable returning a JSON-serialisable dict.
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, dict]:
+    """Return a snapshot of every registered provider."""
+    with _lock:
+        providers = dict(_providers)
+    snapshot = {}
+    for name, provider in providers.items():
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+class LatencyTracker:
+    """
+    Rolling latency/throughput window for a stream of completed operations.
+
+    Args:
+        window: Number of most recent samples kept for percentiles and rate.
+    """
+
+    def __init__(self, window: int = 10_000):
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool = True) -> None:
+        """Record one completed operation that took `latency` seconds."""
+        with self._lock:
+            self._samples.append((time.time(), latency))
+            self.total += 1
+            if not ok:
+                self.failures += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return {"total": self.total, "failures": self.failures}
+        latencies = sorted(latency for _, latency in samples)
+        span = samples[-1][0] - samples[0][0]
+        return {
+            "total": self.total,
+            "failures": self.failures,
+            "per_sec": round(len(samples) / span, 2) if span > 0 else None,
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        }
+
+
+class Counters:
+    """Thread-safe named counters."""
+
+    def __init__(self, *names: str):
+        self._counts: Dict[str, int] = {name: 0 for name in names}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
@@ -0,0 +1,282 @@
+"""
+Structured ledger of every extracted receipt, for spending analytics.
+
+Receipts from image extraction, the audio pipeline and the receipt agent are
+written to SQLite tables indexed on (user, date) and (user, merchant), so
+questions like "how much did I spend at Starbucks in March" are answered by
+one indexed aggregate query instead of a corpus search plus arithmetic in
+the model. Each receipt's id is a hash of its user and normalized content,
+so re-recording a receipt (e.g. a cached re-extraction) is a no-op. Item
+prices are stored as printed, i.e. as line amounts. The user a receipt is
+filed under comes from `ledger_user`, which request handlers set per request.
+Configured through environment variables:
+
+    RECEIPT_LEDGER_DB   SQLite file (default receipt_ledger.db; empty disables the ledger)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from .json_stream import parse_receipts
+from .metrics import Counters, LatencyTracker, register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+LEDGER_DB = os.getenv("RECEIPT_LEDGER_DB", "receipt_ledger.db")
+ANONYMOUS_USER_ID = "anonymous"
+GROUP_BY = ("merchant", "month", "day", "item")
+MAX_GROUPS = 50
+
+# Owner of receipts recorded in the current request/task
+ledger_user: ContextVar[str] = ContextVar("ledger_user", default=ANONYMOUS_USER_ID)
+
+# Called as listener(user_id, receipt_id, receipt) for each newly recorded receipt
+Listener = Callable[[str, str, Dict[str, Any]], None]
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS receipts ("
+    "id TEXT PRIMARY KEY, user_id TEXT NOT NULL, merchant TEXT, merchant_key TEXT, "
+    "purchase_date TEXT, total_amount REAL, tax_amount REAL, source TEXT, created_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS receipt_items ("
+    "receipt_id TEXT NOT NULL, line INTEGER NOT NULL, description TEXT, description_key TEXT, "
+    "quantity INTEGER, price REAL, PRIMARY KEY (receipt_id, line))",
+    "CREATE INDEX IF NOT EXISTS receipts_user_date ON receipts(user_id, purchase_date)",
+    "CREATE INDEX IF NOT EXISTS receipts_user_merchant ON receipts(user_id, merchant_key)",
+)
+
+
+def _key(text: Optional[str]) -> Optional[str]:
+    return " ".join(text.lower().split()) if text else None
+
+
+def _as_receipts(receipts: Any) -> List[Dict[str, Any]]:
+    if isinstance(receipts, str):
+        try:
+            receipts = parse_receipts(receipts)
+        except ValueError:
+            return []
+    if isinstance(receipts, dict):
+        receipts = [receipts]
+    if not isinstance(receipts, list):
+        return []
+    return [
+        receipt for receipt in receipts
+        if isinstance(receipt, dict) and (receipt.get("merchant_name") or receipt.get("total_amount") is not None)
+    ]
+
+
+class ReceiptLedger:
+    """
+    SQLite-backed receipt ledger.
+
+    Args:
+        path: SQLite database file.
+    """
+
+    def __init__(self, path: str = LEDGER_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.counters = Counters("recorded", "duplicates")
+        self.query_latency = LatencyTracker()
+        self._listeners: List[Listener] = []
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use (with self._lock held), so importing the module creates no files
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def add_listener(self, listener: Listener) -> None:
+        """Call `listener` after each newly recorded receipt is committed."""
+        self._listeners.append(listener)
+
+    def record(self, receipts: Any, source: str = "", user_id: Optional[str] = None) -> int:
+        """
+        Add receipts (model JSON text, a receipt dict or a list of them) to the ledger.
+
+        Returns:
+            Number of receipts that were not already recorded.
+        """
+        user_id = user_id or ledger_user.get()
+        now = time.time()
+        added: List[Tuple[str, Dict[str, Any]]] = []
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                for receipt in _as_receipts(receipts):
+                    receipt_id = hashlib.sha256(
+                        f"{user_id}\n{json.dumps(receipt, sort_keys=True, default=str)}".encode("utf-8")
+                    ).hexdigest()[:32]
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO receipts (id, user_id, merchant, merchant_key, purchase_date, "
+                        "total_amount, tax_amount, source, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (receipt_id, user_id, receipt.get("merchant_name"), _key(receipt.get("merchant_name")),
+                         receipt.get("purchase_date"), receipt.get("total_amount"), receipt.get("tax_amount"),
+                         source, now),
+                    )
+                    if not cursor.rowcount:
+                        self.counters.incr("duplicates")
+                        continue
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO receipt_items (receipt_id, line, description, description_key, "
+                        "quantity, price) VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (receipt_id, line, item.get("description"), _key(item.get("description")),
+                             item.get("quantity"), item.get("price"))
+                            for line, item in enumerate(receipt.get("items") or [])
+                            if isinstance(item, dict)
+                        ],
+                    )
+                    added.append((receipt_id, receipt))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.counters.incr("recorded", len(added))
+        for receipt_id, receipt in added:
+            for listener in self._listeners:
+                try:
+                    listener(user_id, receipt_id, receipt)
+                except Exception as e:
+                    print(f"Receipt ledger listener failed: {e}")
+        return len(added)
+
+    def iter_receipts(self, user_id: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (receipt_id, receipt) for a user's receipts in purchase-date order."""
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT id, merchant, purchase_date, total_amount, tax_amount FROM receipts "
+                "WHERE user_id = ? ORDER BY purchase_date, created_at", (user_id,)
+            ).fetchall()
+            items: Dict[str, List[Dict[str, Any]]] = {}
+            for receipt_id, description, quantity, price in conn.execute(
+                "SELECT i.receipt_id, i.description, i.quantity, i.price FROM receipt_items i "
+                "JOIN receipts r ON r.id = i.receipt_id WHERE r.user_id = ? ORDER BY i.receipt_id, i.line",
+                (user_id,),
+            ):
+                items.setdefault(receipt_id, []).append(
+                    {"description": description, "quantity": quantity, "price": price}
+                )
+        for receipt_id, merchant, purchase_date, total_amount, tax_amount in rows:
+            yield receipt_id, {
+                "merchant_name": merchant,
+                "purchase_date": purchase_date,
+                "total_amount": total_amount,
+                "tax_amount": tax_amount,
+                "items": items.get(receipt_id, []),
+            }
+
+    def spending(self, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 merchant: Optional[str] = None, item: Optional[str] = None,
+                 group_by: Optional[str] = None) -> dict:
+        """
+        Aggregate a user's spending.
+
+        Args:
+            user_id: Whose receipts to aggregate.
+            start_date: First purchase date included (YYYY-MM-DD).
+            end_date: Last purchase date included (YYYY-MM-DD).
+            merchant: Case-insensitive substring of the merchant name.
+            item: Case-insensitive substring of item descriptions; totals then
+                sum the matching item lines instead of receipt totals.
+            group_by: One of "merchant", "month", "day" or "item".
+
+        Raises:
+            ValueError: If `group_by` is not supported.
+        """
+        if group_by and group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY)}")
+        start = time.perf_counter()
+
+        conditions = ["r.user_id = ?"]
+        params: List[Any] = [user_id]
+        if start_date:
+            conditions.append("r.purchase_date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("r.purchase_date <= ?")
+            params.append(end_date)
+        if merchant:
+            conditions.append("r.merchant_key LIKE ?")
+            params.append(f"%{_key(merchant)}%")
+
+        by_item = bool(item) or group_by == "item"
+        if by_item:
+            source = "receipts r JOIN receipt_items i ON i.receipt_id = r.id"
+            amount = "i.price"
+            if item:
+                conditions.append("i.description_key LIKE ?")
+                params.append(f"%{_key(item)}%")
+        else:
+            source = "receipts r"
+            amount = "r.total_amount"
+        where = " AND ".join(conditions)
+        # (label, grouping) per group_by; names group case- and spacing-insensitively
+        group_expression = {
+            "merchant": ("MIN(r.merchant)", "r.merchant_key"),
+            "month": ("substr(r.purchase_date, 1, 7)", "substr(r.purchase_date, 1, 7)"),
+            "day": ("r.purchase_date", "r.purchase_date"),
+            "item": ("MIN(i.description)", "i.description_key"),
+        }.get(group_by or "")
+
+        with self._lock:
+            conn = self._connection()
+            total, receipts = conn.execute(
+                f"SELECT COALESCE(SUM({amount}), 0), COUNT(DISTINCT r.id) FROM {source} WHERE {where}", params
+            ).fetchone()
+            groups: List[Tuple] = []
+            if group_expression:
+                label, grouping = group_expression
+                groups = conn.execute(
+                    f"SELECT {label}, SUM({amount}) AS total, COUNT(DISTINCT r.id) "
+                    f"FROM {source} WHERE {where} GROUP BY {grouping} ORDER BY total DESC LIMIT {MAX_GROUPS}",
+                    params,
+                ).fetchall()
+        self.query_latency.record(time.perf_counter() - start)
+
+        result = {"total": round(total, 2), "receipts": receipts}
+        if group_expression:
+            result["groups"] = [
+                {"key": key, "total": round(group_total or 0, 2), "receipts": count}
+                for key, group_total, count in groups
+            ]
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            (rows,) = self._connection().execute("SELECT COUNT(*) FROM receipts").fetchone()
+        return {**self.counters.snapshot(), "receipts": rows, "queries": self.query_latency.snapshot()}
+
+
+receipt_ledger: Optional[ReceiptLedger] = ReceiptLedger(LEDGER_DB) if LEDGER_DB else None
+if receipt_ledger is not None:
+    register_metrics("receipt_ledger", receipt_ledger.stats)
+
+
+def record_receipts(receipts: Any, source: str) -> int:
+    """
+    Record extracted receipts in the ledger, never failing the caller.
+
+    Returns:
+        Number of receipts added (0 if the ledger is disabled or the input has none).
+    """
+    if receipt_ledger is None:
+        return 0
+    try:
+        return receipt_ledger.record(receipts, source=source)
+    except Exception as e:
+        print(f"Failed to record receipts in the ledger: {e}")
+        return 0
@@ -0,0 +1,23 @@
+"""
+Receipt data model shared by the Gemini structured-output calls.
+
+Passed as `response_schema` so the model returns JSON matching the receipt
+shape the wallet service and the agents already consume.
+"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class ReceiptItem(BaseModel):
+    description: Optional[str] = None
+    quantity: Optional[int] = None
+    price: Optional[float] = None
+
+
+class Receipt(BaseModel):
+    merchant_name: Optional[str] = None
+    purchase_date: Optional[str] = Field(None, description="YYYY-MM-DD")
+    total_amount: Optional[float] = None
+    tax_amount: Optional[float] = None
+    items: List[ReceiptItem] = Field(default_factory=list)
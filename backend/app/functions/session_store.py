@@ -0,0 +1,158 @@
+"""
+Per-user chat session storage for the ADK runner.
+
+`BoundedSessionService` wraps an ADK session service (in-memory, or SQLite
+through `DatabaseSessionService`) and keeps each turn's cost flat: the runner
+only loads the most recent events of a session, in-memory histories are
+trimmed to that window, and sessions idle for longer than the TTL are deleted.
+Configured through environment variables:
+
+    CHAT_SESSION_BACKEND       "memory" or "sqlite" (default memory)
+    CHAT_SESSION_DB            SQLite file for the sqlite backend (default chat_sessions.db)
+    CHAT_HISTORY_EVENTS        events loaded into each turn (default 40)
+    CHAT_SESSION_TTL_SECONDS   idle time before a session is evicted (default 1 day, 0 = never)
+"""
+
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from .metrics import register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")
+SESSION_DB = os.getenv("CHAT_SESSION_DB", "chat_sessions.db")
+HISTORY_EVENTS = int(os.getenv("CHAT_HISTORY_EVENTS", "40"))
+SESSION_TTL_SECONDS = float(os.getenv("CHAT_SESSION_TTL_SECONDS", str(24 * 3600)))
+SWEEP_INTERVAL_SECONDS = 60
+
+SessionKey = Tuple[str, str, str]
+
+
+class BoundedSessionService(BaseSessionService):
+    """
+    Session service decorator adding a history window and idle-session eviction.
+
+    Args:
+        inner: Session service that actually stores sessions.
+        history_events: Most recent events handed to the runner per turn.
+        ttl: Seconds of inactivity after which a session is deleted (0 disables).
+    """
+
+    def __init__(self, inner: BaseSessionService, history_events: int = HISTORY_EVENTS,
+                 ttl: float = SESSION_TTL_SECONDS):
+        self.inner = inner
+        self.history_events = history_events
+        self.ttl = ttl
+        self._last_access: Dict[SessionKey, float] = {}
+        self._last_sweep = time.monotonic()
+        self.evicted = 0
+        self.trimmed_events = 0
+
+    async def create_session(self, *, app_name: str, user_id: str,
+                             state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        await self._maybe_sweep()
+        session = await self.inner.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        self._touch(session)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        await self._maybe_sweep()
+        if config is None and self.history_events:
+            config = GetSessionConfig(num_recent_events=self.history_events)
+        session = await self.inner.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            _drop_orphaned_prefix(session)
+            self._touch(session)
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self.inner.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._last_access.pop((app_name, user_id, session_id), None)
+        await self.inner.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await self.inner.append_event(session=session, event=event)
+        self._trim_stored_history(session)
+        self._touch(session)
+        return event
+
+    def _touch(self, session: Session) -> None:
+        self._last_access[(session.app_name, session.user_id, session.id)] = time.monotonic()
+
+    def _trim_stored_history(self, session: Session) -> None:
+        # SQLite keeps the full log on disk and reads only the window; the
+        # in-memory store would otherwise grow (and be deep-copied) every turn
+        if not isinstance(self.inner, InMemorySessionService) or not self.history_events:
+            return
+        stored = self.inner.sessions.get(session.app_name, {}).get(session.user_id, {}).get(session.id)
+        if stored is not None and len(stored.events) > 2 * self.history_events:
+            excess = len(stored.events) - self.history_events
+            del stored.events[:excess]
+            self.trimmed_events += excess
+
+    async def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if not self.ttl or now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+        expired = [key for key, last in self._last_access.items() if now - last > self.ttl]
+        for app_name, user_id, session_id in expired:
+            try:
+                await self.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+                self.evicted += 1
+            except Exception as e:
+                print(f"Failed to evict session {session_id}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.inner).__name__,
+            "active_sessions": len(self._last_access),
+            "history_events": self.history_events,
+            "evicted": self.evicted,
+            "trimmed_events": self.trimmed_events,
+        }
+
+
+def _drop_orphaned_prefix(session: Session) -> None:
+    """Start the window at a user turn so no tool response is left without its call."""
+    events = session.events
+    for index, event in enumerate(events):
+        if event.author == "user":
+            if index:
+                del events[:index]
+            return
+
+
+def build_session_service(backend: str = SESSION_BACKEND) -> BoundedSessionService:
+    """
+    Build the session service selected by `backend`.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == "memory":
+        inner: BaseSessionService = InMemorySessionService()
+    elif backend == "sqlite":
+        from google.adk.sessions import DatabaseSessionService
+
+        inner = DatabaseSessionService(db_url=f"sqlite:///{SESSION_DB}")
+    else:
+        raise ValueError(f"Unknown CHAT_SESSION_BACKEND '{backend}', expected 'memory' or 'sqlite'")
+    return BoundedSessionService(inner)
+
+
+session_service = build_session_service()
+register_metrics("chat_sessions", session_service.stats)
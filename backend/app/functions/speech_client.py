@@ -0,0 +1,57 @@
+"""
+Process-wide Speech-to-Text client.
+
+`speech.SpeechClient()` opens a gRPC channel and performs TLS setup, so one
+client is created lazily per process and shared by every transcription. The
+factory can be swapped for a fake in benchmarks with `set_speech_client_factory()`.
+Set SPEECH_WARM_ON_STARTUP=1 to build the client from the startup hook.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Optional
+from google.cloud import speech
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=".env")
+WARM_ON_STARTUP = os.getenv("SPEECH_WARM_ON_STARTUP", "0") == "1"
+
+_client: Optional[Any] = None
+_client_lock = threading.Lock()
+_client_factory: Callable[[], Any] = speech.SpeechClient
+
+
+def get_speech_client() -> Any:
+    """
+    Return the shared Speech client, creating it on first use.
+
+    Returns:
+        The process-wide `speech.SpeechClient` (or whatever the configured factory builds).
+    """
+    global _client
+    client = _client
+    if client is not None:
+        return client
+    with _client_lock:
+        if _client is None:
+            _client = _client_factory()
+        return _client
+
+
+def set_speech_client_factory(factory: Optional[Callable[[], Any]] = None) -> None:
+    """
+    Replace the factory used to build the shared client and drop the current one.
+
+    Args:
+        factory: Zero-argument callable returning an object with `recognize()`.
+            Pass None to restore `speech.SpeechClient`.
+    """
+    global _client_factory, _client
+    with _client_lock:
+        _client_factory = factory or speech.SpeechClient
+        _client = None
+
+
+def warm_speech_client() -> None:
+    """Eagerly build the shared client so the first request skips channel setup."""
+    get_speech_client()
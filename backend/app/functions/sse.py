@@ -0,0 +1,30 @@
+"""
+Helpers for Server-Sent Event (text/event-stream) responses.
+"""
+
+import json
+from typing import Any, Optional
+
+# Disable proxy buffering so events reach the browser as soon as they are written
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """
+    Serialise one SSE message.
+
+    Args:
+        data: Payload; non-string values are JSON encoded.
+        event: Optional event name (defaults to the browser's "message").
+
+    Returns:
+        str: The wire-format message, terminated by a blank line.
+    """
+    if not isinstance(data, str):
+        data = json.dumps(data)
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,168 @@
+"""
+Streaming transcription of large audio uploads.
+
+Starlette spools multipart uploads to a temporary file, so large uploads are
+read from it in fixed-size chunks, decoded to 16 kHz PCM by a piped ffmpeg,
+and sent to the recognizer's streaming API as they are produced. Memory per
+request stays bounded by the chunk sizes instead of growing with the length
+of the recording. Configured through environment variables:
+
+    AUDIO_STREAM_THRESHOLD_BYTES  uploads larger than this are streamed (default 8 MiB)
+    AUDIO_STREAM_WINDOW_SECONDS   audio per streaming call before rolling over (default 240)
+"""
+
+import asyncio
+import contextlib
+import os
+from typing import BinaryIO, Iterable, Iterator
+from dotenv import load_dotenv
+from fastapi import UploadFile
+from google.cloud import speech
+from .audio_processor import (
+    audio_conversion_counters,
+    build_recognition_config,
+    cache_transcript,
+    check_ffmpeg_available,
+    transcribe_audio_async,
+)
+from .audio_sniffer import HEADER_BYTES, sniff_audio_format
+from .ffmpeg_pipe import PCM_SAMPLE_RATE, iter_pcm_ffmpeg
+from .speech_client import get_speech_client
+from .transcript_cache import make_key_from_chunks, transcript_cache, transcript_inflight
+
+load_dotenv(dotenv_path=".env")
+
+STREAM_THRESHOLD_BYTES = int(os.getenv("AUDIO_STREAM_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+STREAM_WINDOW_SECONDS = float(os.getenv("AUDIO_STREAM_WINDOW_SECONDS", "240"))
+
+READ_CHUNK_BYTES = 64 * 1024
+# 0.5 s of 16 kHz 16-bit PCM, under the 25 KB per-request streaming limit
+STREAM_CHUNK_BYTES = PCM_SAMPLE_RATE
+
+
+def iter_file_chunks(fileobj: BinaryIO, chunk_size: int = READ_CHUNK_BYTES) -> Iterator[bytes]:
+    """Yield a file's contents from the start in chunks of at most `chunk_size` bytes."""
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def streaming_recognize_pcm(pcm_chunks: Iterable[bytes], language_code: str = "en-US",
+                            window_seconds: float = STREAM_WINDOW_SECONDS) -> str:
+    """
+    Transcribe a stream of 16 kHz mono PCM chunks with streaming recognition.
+
+    A streaming call is limited to about five minutes of audio, so a new call
+    is opened every `window_seconds` until the chunks run out.
+
+    Args:
+        pcm_chunks: Little-endian 16-bit PCM, at most 25 KB per chunk.
+        language_code: Language code for transcription.
+        window_seconds: Audio sent per streaming call.
+
+    Returns:
+        str: Final results of every window, joined in order.
+    """
+    client = get_speech_client()
+    streaming_config = speech.StreamingRecognitionConfig(
+        config=build_recognition_config("LINEAR16", language_code, sample_rate_hertz=PCM_SAMPLE_RATE),
+    )
+    window_bytes = int(window_seconds * PCM_SAMPLE_RATE * 2)
+    chunks = iter(pcm_chunks)
+    transcripts = []
+
+    while True:
+        first = next(chunks, None)
+        if first is None:
+            break
+
+        def requests(first: bytes = first) -> Iterator[speech.StreamingRecognizeRequest]:
+            sent = len(first)
+            yield speech.StreamingRecognizeRequest(audio_content=first)
+            while sent < window_bytes:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                sent += len(chunk)
+                yield speech.StreamingRecognizeRequest(audio_content=chunk)
+
+        for response in client.streaming_recognize(config=streaming_config, requests=requests()):
+            for result in response.results:
+                if result.is_final and result.alternatives:
+                    transcripts.append(result.alternatives[0].transcript.strip())
+
+    return " ".join(text for text in transcripts if text)
+
+
+def transcribe_file_streaming(fileobj: BinaryIO, language_code: str = "en-US") -> str:
+    """
+    Transcribe an audio file without loading it into memory.
+
+    Args:
+        fileobj: Seekable binary file holding the encoded audio.
+        language_code: Language code for transcription.
+
+    Returns:
+        str: Transcribed text
+    """
+    # Hash the upload in chunks so retries still hit the transcript cache
+    key = make_key_from_chunks(iter_file_chunks(fileobj), language_code)
+    cached = transcript_cache.get(key)
+    if cached is not None:
+        print("Transcript cache hit")
+        return cached
+
+    def transcribe() -> str:
+        audio_conversion_counters.incr("requests")
+        audio_conversion_counters.incr("streamed")
+        pcm = iter_pcm_ffmpeg(iter_file_chunks(fileobj), chunk_size=STREAM_CHUNK_BYTES)
+        # Closing the generator stops ffmpeg if recognition fails midway
+        with contextlib.closing(pcm):
+            return cache_transcript(key, streaming_recognize_pcm(pcm, language_code))
+
+    return transcript_inflight.do(key, transcribe)
+
+
+def should_stream(fileobj: BinaryIO) -> bool:
+    """
+    Decide whether an upload is large enough, and pipe-decodable, to stream.
+
+    Streaming decodes through ffmpeg, so without it every upload takes the
+    buffered path (which still handles WAV through pydub). MP4/M4A files often
+    keep their index at the end, which ffmpeg cannot reach when reading from a
+    pipe, so they always take the buffered path too. The file is left rewound.
+    """
+    try:
+        if fileobj.seek(0, os.SEEK_END) <= STREAM_THRESHOLD_BYTES or not check_ffmpeg_available():
+            return False
+        fileobj.seek(0)
+        info = sniff_audio_format(fileobj.read(HEADER_BYTES))
+        return info is None or info.format != "m4a"
+    finally:
+        fileobj.seek(0)
+
+
+async def transcribe_upload(audio_file: UploadFile, language_code: str = "en-US") -> str:
+    """
+    Transcribe an uploaded audio file, streaming it when it is large.
+
+    Args:
+        audio_file: Multipart upload.
+        language_code: Language code for transcription.
+
+    Returns:
+        str: Transcribed text
+    """
+    if await asyncio.to_thread(should_stream, audio_file.file):
+        print(f"Streaming transcription for {audio_file.filename}")
+        try:
+            return await asyncio.to_thread(transcribe_file_streaming, audio_file.file, language_code)
+        except OSError as e:
+            # ffmpeg could not be started; fall back to the buffered path
+            print(f"Streaming transcription failed, using the buffered path: {e}")
+        await audio_file.seek(0)
+    audio_bytes = await audio_file.read()
+    return await transcribe_audio_async(audio_bytes, language_code, audio_file.filename)
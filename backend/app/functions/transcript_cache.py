@@ -0,0 +1,67 @@
+"""
+Cache of Speech-to-Text transcripts.
+
+Transcripts are keyed on the language code plus a SHA-256 of the audio: first
+of the upload bytes as received (so a client retry is answered before any
+decoding), then of the normalized 16 kHz mono PCM (so the same recording in a
+different container still hits). Concurrent identical uploads share one
+recognition call. Configured through environment variables:
+
+    TRANSCRIPT_CACHE_MAX_ENTRIES   in-memory entries (default 2048)
+    TRANSCRIPT_CACHE_TTL_SECONDS   entry lifetime (default 1 day, 0 = forever)
+    TRANSCRIPT_CACHE_DB            optional SQLite file backing the in-memory tier
+"""
+
+import hashlib
+import os
+from typing import Iterable
+from dotenv import load_dotenv
+from .cache import LRUCache, SingleFlight, SQLiteCacheStore, TieredCache
+from .metrics import register_metrics
+
+load_dotenv(dotenv_path=".env")
+
+MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "2048"))
+TTL_SECONDS = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(24 * 3600)))
+CACHE_DB = os.getenv("TRANSCRIPT_CACHE_DB", "")
+
+
+def make_key(audio: bytes, language_code: str, kind: str = "raw") -> str:
+    """
+    Build the cache key for a transcript.
+
+    Args:
+        audio: Upload bytes (`kind="raw"`) or normalized PCM (`kind="pcm"`).
+        language_code: Recognition language.
+        kind: Which representation `audio` is.
+
+    Returns:
+        str: Hex digest identifying the transcript.
+    """
+    return make_key_from_chunks([audio], language_code, kind)
+
+
+def make_key_from_chunks(chunks: Iterable[bytes], language_code: str, kind: str = "raw") -> str:
+    """Same as `make_key()` for audio read in pieces, e.g. from a spooled upload."""
+    digest = hashlib.sha256()
+    digest.update(f"{kind}:{language_code}:".encode("utf-8"))
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+transcript_cache = TieredCache(
+    LRUCache(max_entries=MAX_ENTRIES, ttl=TTL_SECONDS),
+    SQLiteCacheStore(CACHE_DB, table="transcripts", ttl=TTL_SECONDS) if CACHE_DB else None,
+)
+transcript_inflight = SingleFlight()
+
+
+def transcript_cache_stats() -> dict:
+    stats = transcript_cache.stats()
+    stats["deduplicated"] = transcript_inflight.shared
+    stats["in_flight"] = len(transcript_inflight)
+    return stats
+
+
+register_metrics("transcript_cache", transcript_cache_stats)
@@ -1,18 +1,31 @@
-import re, json, requests, os
+import asyncio, json, os
 from fastapi import FastAPI, UploadFile, File, Form
-from typing import List
-from app.functions.gemini import generate
-from app.functions.extractor import extract
-from app.functions.audio_processor import process_audio_receipt, transcribe_audio
-from google.oauth2 import service_account
-from google.auth import transport
+from typing import List, Optional
+from app.functions.gemini import generate_async, generate_stream_async
+from app.functions.sse import SSE_HEADERS, format_sse
+from app.functions.image_preprocessor import shutdown_executor as shutdown_image_executor
+from app.functions.extractor import extract_async, parse_extraction
+from app.functions.json_stream import parse_receipts
+from app.functions.receipt_ledger import ANONYMOUS_USER_ID, ledger_user
+from app.functions.budget_tracker import budget_tracker
+from app.functions.batch_extractor import BATCH_CONCURRENCY, BATCH_MAX_RETRIES, BATCH_SIZE, extract_batch
+from app.functions.concurrency import gemini_limiter
+from app.functions.audio_receipt import ENGINES as AUDIO_RECEIPT_ENGINES, process_audio_upload
+from app.functions.streaming_audio import transcribe_upload
+from app.functions.audio_workers import audio_conversion_pool
+from app.functions.speech_client import WARM_ON_STARTUP as SPEECH_WARM_ON_STARTUP, warm_speech_client
 from fastapi import HTTPException
 from dotenv import load_dotenv
-from app.wallet_service.wallet_service import generate_wallet_pass_link
+from app.wallet_service.wallet_service import create_receipt_pass_jwt, get_save_to_wallet_url
+from app.wallet_service.token_provider import wallet_session, wallet_token_provider
 from pydantic import BaseModel, Field
 from app.rag_test.prepare_corpus_and_data import upload_user_documents_to_corpus
+from app.rag_test.ingestion_queue import ingestion_queue
 from app.api import chat
+from app.functions.metrics import collect_metrics
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 #from app.rag_test.agent import router as rag_test_router
 
 app = FastAPI()
@@ -44,6 +57,20 @@ app.add_middleware(
 
 app.include_router(chat.router, prefix="/api", tags=["Agent"])
 
+@app.on_event("startup")
+async def warm_clients():
+    if SPEECH_WARM_ON_STARTUP:
+        await asyncio.to_thread(warm_speech_client)
+    if chat.WARM_ON_STARTUP:
+        await asyncio.to_thread(chat.warm_agent_runtime)
+
+@app.on_event("shutdown")
+def shutdown_worker_pools():
+    shutdown_image_executor()
+    audio_conversion_pool.shutdown()
+    ingestion_queue.shutdown()
+    budget_tracker.shutdown()
+
 class ReceiptData(BaseModel):
     merchant_name: str
     purchase_date: str
@@ -51,38 +78,106 @@ class ReceiptData(BaseModel):
     tax_amount: float
     items: list
 
+def wallet_save_url(receipt_data: dict) -> str:
+    """Sign a wallet pass for the receipt and return its save URL, or raise 500."""
+    signed_jwt = create_receipt_pass_jwt(receipt_data)
+    if not signed_jwt:
+        raise HTTPException(status_code=500, detail="Failed to generate Google Wallet pass link.")
+    return get_save_to_wallet_url(signed_jwt)
+
 def get_gcp_access_token():
-    """ Gets a short-lived access token for server-to-server calls."""
-    creds = service_account.Credentials.from_service_account_file(
-        SERVICE_ACCOUNT_FILE,
-        scopes=["https://www.googleapis.com/auth/wallet_object.issuer"],
-    )
-    creds.refresh(transport.requests.Request())
-    return creds.token
+    """ Gets a short-lived access token for server-to-server calls (cached until shortly before expiry)."""
+    return wallet_token_provider.get_token()
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the FastAPI backend!"}
 
+@app.get("/metrics")
+def metrics():
+    """Snapshot of in-process counters (caches, queues, latencies)."""
+    return collect_metrics()
+
 @app.post("/gemini")
-def gemini(user_prompt: str = Form(...), images: List[UploadFile] = File(None)):
-    image_bytes_list = [image.file.read() for image in images] if images else []
-    response = generate(user_prompt, image_bytes_list)
-    return {"response": response} 
+async def gemini(
+    user_prompt: str = Form(...),
+    images: List[UploadFile] = File(None),
+    stream: bool = Form(False),
+):
+    image_bytes_list = [await image.read() for image in images] if images else []
+    if not stream:
+        async with gemini_limiter.slot():
+            response = await generate_async(user_prompt, image_bytes_list)
+        return {"response": response} 
+
+    # Take the slot before the response starts so saturation still maps to a 429
+    await gemini_limiter.acquire()
+    released = False
+
+    async def release_slot():
+        # Runs from the generator's finally and as a background task; the latter
+        # covers clients that disconnect before the body starts
+        nonlocal released
+        if not released:
+            released = True
+            gemini_limiter.release()
+
+    async def event_stream():
+        try:
+            async for text in generate_stream_async(user_prompt, image_bytes_list):
+                yield format_sse({"text": text})
+            yield format_sse("[DONE]", event="done")
+        except Exception as e:
+            print(f"Error while streaming Gemini response: {e}")
+            yield format_sse({"detail": str(e)}, event="error")
+        finally:
+            await release_slot()
 
-@app.post("/extract")
-def gemini(images: List[UploadFile] = File(None)):
-    image_bytes_list = [image.file.read() for image in images] if images else []
-    response = extract(image_bytes_list)
-    # Clean up response: remove code block markers and parse JSON
-    # Remove code block markers and any leading/trailing whitespace
-    cleaned = re.sub(r"^```json|^```|```$", "", response.strip(), flags=re.MULTILINE).strip()
-    # Try to parse as JSON
     try:
-        parsed = json.loads(cleaned)
+        return StreamingResponse(
+            event_stream(), media_type="text/event-stream", headers=SSE_HEADERS,
+            background=BackgroundTask(release_slot),
+        )
     except Exception:
-        parsed = cleaned  # fallback: return raw if not valid JSON
-    return parsed 
+        await release_slot()
+        raise
+
+@app.post("/extract")
+async def extract_receipts(images: List[UploadFile] = File(None), user_id: Optional[str] = Form(None)):
+    ledger_user.set(user_id or ANONYMOUS_USER_ID)
+    image_bytes_list = [await image.read() for image in images] if images else []
+    async with gemini_limiter.slot():
+        response = await extract_async(image_bytes_list)
+    # Strip code block markers and parse JSON (falls back to the raw text)
+    return parse_extraction(response)
+
+@app.post("/extract/batch")
+async def extract_receipts_batch(
+    images: List[UploadFile] = File(...),
+    batch_size: int = Form(BATCH_SIZE),
+    concurrency: int = Form(BATCH_CONCURRENCY),
+    max_retries: int = Form(BATCH_MAX_RETRIES),
+):
+    """
+    Bulk receipt extraction streamed back as NDJSON, one line per receipt.
+
+    Images are split into micro-batches of `batch_size`, extracted with at
+    most `concurrency` batches in flight, and retried per item on failure.
+    """
+    image_bytes_list = [await image.read() for image in images]
+    filenames = [image.filename for image in images]
+
+    async def ndjson_lines():
+        async for result in extract_batch(
+            image_bytes_list,
+            filenames,
+            batch_size=max(1, batch_size),
+            concurrency=max(1, concurrency),
+            max_retries=max(0, max_retries),
+        ):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
 @app.post("/setup/create-wallet-class", tags=["setup"])
 async def create_wallet_class():
@@ -90,7 +185,7 @@ async def create_wallet_class():
     A one-time utility endpoint to create a Google Wallet Pass Class..
     """
 
-    token = get_gcp_access_token()
+    token = await wallet_token_provider.get_token_async()
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
@@ -173,7 +268,7 @@ async def create_wallet_class():
     url = "https://walletobjects.googleapis.com/walletobjects/v1/genericClass"
     
     print("Attempting to create a new Wallet Class...")
-    response = requests.post(url, headers=headers, json=class_payload)
+    response = await asyncio.to_thread(wallet_session.post, url, headers=headers, json=class_payload)
     
     if response.status_code == 200:
         print("✅ Class created successfully!")
@@ -192,16 +287,36 @@ async def tool_create_receipt_pass(receipt_data: ReceiptData):
     An agent tool that generates a Google Wallet pass from receipt data.
     """
     # The Pydantic model automatically converts the incoming JSON to a dict
-    receipt_dict = receipt_data.dict()
+    receipt_dict = receipt_data.model_dump()
     
-    save_url = generate_wallet_pass_link(receipt_dict)
-    
-    if not save_url:
-        raise HTTPException(status_code=500, detail="Failed to generate Google Wallet pass link.")
+    save_url = wallet_save_url(receipt_dict)
     
     # The agent will receive this URL and can present it to the user.
     return {"wallet_save_url": save_url}
 
+@app.post("/budget/goals")
+def set_budget_goal(
+    category: str = Form(...),
+    goal_amount: float = Form(...),
+    goal_name: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None)
+):
+    """Create or replace a monthly spending goal for a category (e.g. groceries)."""
+    try:
+        return budget_tracker.set_goal(user_id or ANONYMOUS_USER_ID, category, goal_amount, goal_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/budget/goals")
+def get_budget_goals(user_id: Optional[str] = None, month: Optional[str] = None):
+    """Goals with the spending recorded against them for a month (YYYY-MM, default current)."""
+    return {"goals": budget_tracker.goals(user_id or ANONYMOUS_USER_ID, month)}
+
+@app.get("/budget/insights")
+def get_budget_insights(user_id: Optional[str] = None):
+    """Most recent goal tracker insights, fired when spending crosses a goal milestone."""
+    return {"insights": budget_tracker.insights(user_id or ANONYMOUS_USER_ID)}
+
 @app.post("/rag/upload")
 def rag_upload(files: List[UploadFile] = File(...)):
     uploaded = upload_files_to_rag_corpus(files)
@@ -227,11 +342,8 @@ async def transcribe_audio_endpoint(
         if not audio_file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        # Read audio file
-        audio_bytes = await audio_file.read()
-        
-        # Transcribe audio
-        transcript = transcribe_audio(audio_bytes, language_code, audio_file.filename)
+        # Transcribe audio (large uploads are streamed from the spooled file)
+        transcript = await transcribe_upload(audio_file, language_code)
         
         return {
             "status": "success",
@@ -243,10 +355,16 @@ async def transcribe_audio_endpoint(
         print(f"Error in audio transcription: {e}")
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
+def validate_audio_engine(engine: str) -> None:
+    if engine and engine not in AUDIO_RECEIPT_ENGINES:
+        raise HTTPException(status_code=400, detail=f"engine must be one of: {', '.join(AUDIO_RECEIPT_ENGINES)}")
+
 @app.post("/audio/process-receipt")
 async def process_audio_receipt_endpoint(
     audio_file: UploadFile = File(...),
-    language_code: str = Form("en-US")
+    language_code: str = Form("en-US"),
+    engine: str = Form(None),
+    user_id: Optional[str] = Form(None)
 ):
     """
     Process audio receipt: convert to text and extract receipt information.
@@ -254,25 +372,27 @@ async def process_audio_receipt_endpoint(
     Args:
         audio_file: Audio file containing receipt information
         language_code: Language code for transcription (default: en-US)
+        engine: "two_stage" (Speech-to-Text then Gemini) or "fused" (one Gemini call)
+        user_id: Owner of the receipt in the receipt ledger
     
     Returns:
         dict: Extracted receipt information
     """
+    validate_audio_engine(engine)
+    ledger_user.set(user_id or ANONYMOUS_USER_ID)
     try:
         # Validate file type
         if not audio_file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        # Read audio file
-        audio_bytes = await audio_file.read()
-        
         # Process audio receipt
-        receipt_data = process_audio_receipt(audio_bytes, language_code, audio_file.filename)
+        result = await process_audio_upload(audio_file, language_code, engine)
         
         return {
             "status": "success",
-            "receipt_data": receipt_data,
-            "language_code": language_code
+            "receipt_data": parse_extraction(result["receipt_data"]),
+            "language_code": language_code,
+            "engine": result["engine"]
         }
         
     except Exception as e:
@@ -282,56 +402,54 @@ async def process_audio_receipt_endpoint(
 @app.post("/audio/create-pass-from-audio")
 async def create_pass_from_audio_endpoint(
     audio_file: UploadFile = File(...),
-    language_code: str = Form("en-US")
+    language_code: str = Form("en-US"),
+    engine: str = Form(None),
+    user_id: Optional[str] = Form(None)
 ):
     """
-    Complete pipeline: audio → text → receipt extraction → wallet pass creation.
+    Complete pipeline: audio → receipt extraction → wallet pass creation.
     
     Args:
         audio_file: Audio file containing receipt information
         language_code: Language code for transcription (default: en-US)
+        engine: "two_stage" (Speech-to-Text then Gemini) or "fused" (one Gemini call)
+        user_id: Owner of the receipt in the receipt ledger
     
     Returns:
         dict: Wallet pass URL
     """
+    validate_audio_engine(engine)
+    ledger_user.set(user_id or ANONYMOUS_USER_ID)
     try:
         # Validate file type
         if not audio_file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        # Read audio file
-        audio_bytes = await audio_file.read()
-        
         # Process audio receipt
-        receipt_data_str = process_audio_receipt(audio_bytes, language_code, audio_file.filename)
+        result = await process_audio_upload(audio_file, language_code, engine)
+        receipt_data_str = result["receipt_data"]
         
-        # Parse the JSON response from Gemini
-        import json
+        # Parse the schema-constrained JSON response from Gemini
         try:
-            # Clean up the response (remove markdown formatting if present)
-            cleaned_response = receipt_data_str.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            
-            receipt_data = json.loads(cleaned_response.strip())
-        except json.JSONDecodeError as e:
+            receipt_data = parse_receipts(receipt_data_str)
+        except ValueError as e:
             raise HTTPException(status_code=500, detail=f"Failed to parse receipt data: {str(e)}")
         
         # Create wallet pass
-        save_url = generate_wallet_pass_link(receipt_data)
-        
-        if not save_url:
-            raise HTTPException(status_code=500, detail="Failed to generate Google Wallet pass link.")
+        if not isinstance(receipt_data, dict):
+            raise HTTPException(status_code=500, detail="Expected a single receipt in the audio.")
+        save_url = wallet_save_url(receipt_data)
         
         return {
             "status": "success",
             "wallet_save_url": save_url,
             "receipt_data": receipt_data,
-            "transcript": receipt_data_str
+            "transcript": receipt_data_str,
+            "engine": result["engine"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in audio pass creation: {e}")
         raise HTTPException(status_code=500, detail=f"Audio pass creation failed: {str(e)}")
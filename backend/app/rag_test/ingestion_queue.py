@@ -0,0 +1,311 @@
+"""
+Write-behind queue that ingests extracted receipts into the RAG corpus in batches.
+
+Archiving a receipt used to write a temp file and upload it to the corpus
+before the agent could answer. The queue instead takes the text, returns
+immediately, and a background thread writes pending documents to a JSONL
+shard and ingests the shard with one call once enough documents are pending
+or the oldest has waited long enough. Shards stay in the spool directory
+until they are ingested, so failed flushes are retried with backoff and
+left-over shards are picked up again after a restart. Each process writes to
+its own <host>-<pid> subdirectory and only claims (by rename) shards of
+processes on the same host that are no longer running, so workers sharing a
+spool directory never ingest each other's shards. Shard names are
+derived from their content, so a retried shard is the same object and
+document ids dedupe repeated receipts. Configured through environment variables:
+
+    RAG_INGEST_BATCH_SIZE      documents per shard (default 50)
+    RAG_INGEST_FLUSH_SECONDS   max time a document waits before a flush (default 5)
+    RAG_INGEST_MAX_RETRIES     attempts per flush before the shard is parked (default 3)
+    RAG_INGEST_SPOOL_DIR       where shards are written, one subdirectory per process (default <tmp>/rag_ingest)
+    RAG_STAGING_BUCKET         GCS bucket for rag.import_files (default: upload_file)
+"""
+
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from app.functions.metrics import Counters, LatencyTracker, register_metrics
+from .retrieval_backend import ingest_shard
+
+load_dotenv(dotenv_path=".env")
+
+BATCH_SIZE = int(os.getenv("RAG_INGEST_BATCH_SIZE", "50"))
+FLUSH_SECONDS = float(os.getenv("RAG_INGEST_FLUSH_SECONDS", "5"))
+MAX_RETRIES = int(os.getenv("RAG_INGEST_MAX_RETRIES", "3"))
+SPOOL_DIR = os.getenv("RAG_INGEST_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "rag_ingest"))
+STAGING_BUCKET = os.getenv("RAG_STAGING_BUCKET")
+RETRY_BACKOFF_SECONDS = 1.0
+# Document ids remembered for deduplication
+SEEN_IDS = 100_000
+
+Uploader = Callable[[str], object]
+
+
+def _default_uploader(shard_path: str) -> object:
+    return ingest_shard(shard_path, staging_bucket=STAGING_BUCKET)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def document_id(text: str) -> str:
+    """Stable id for a document, so re-archiving the same receipt is a no-op."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class IngestionQueue:
+    """
+    Batches documents into JSONL shards and ingests them on a background thread.
+
+    Args:
+        uploader: Called with a shard path; must raise on failure.
+        batch_size: Pending documents that trigger a flush.
+        flush_interval: Seconds the oldest pending document may wait.
+        max_retries: Attempts per flush before the shard is parked for later.
+        spool_dir: Directory holding shards until they are ingested.
+    """
+
+    def __init__(self, uploader: Uploader = _default_uploader, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_SECONDS, max_retries: int = MAX_RETRIES,
+                 spool_dir: str = SPOOL_DIR):
+        self.uploader = uploader
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.spool_dir = spool_dir
+        self._shard_dir = os.path.join(spool_dir, f"{socket.gethostname()}-{os.getpid()}")
+        self._pending: List[Dict[str, str]] = []
+        self._oldest: Optional[float] = None
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._parked: List[str] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flushing = 0
+        self.counters = Counters("enqueued", "duplicates", "flushes", "documents_ingested",
+                                 "retries", "failed_flushes")
+        self.flush_latency = LatencyTracker()
+
+    def enqueue(self, text: str, filename: Optional[str] = None) -> str:
+        """Queue `text` for ingestion and return its document id without waiting."""
+        doc_id = document_id(text)
+        with self._condition:
+            if doc_id in self._seen:
+                self.counters.incr("duplicates")
+                return doc_id
+            self._seen[doc_id] = None
+            if len(self._seen) > SEEN_IDS:
+                self._seen.popitem(last=False)
+            self._pending.append({"id": doc_id, "filename": filename or "", "text": text})
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self.counters.incr("enqueued")
+            self._ensure_worker()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return doc_id
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            # Recomputed here in case the queue was created before a fork
+            self._shard_dir = os.path.join(self.spool_dir, f"{socket.gethostname()}-{os.getpid()}")
+            self._parked.extend(path for path in self._claim_leftovers() if path not in self._parked)
+            self._thread = threading.Thread(target=self._run, name="rag-ingest", daemon=True)
+            self._thread.start()
+
+    def _claim_leftovers(self) -> List[str]:
+        """Move shards that earlier, now-dead processes never ingested into this process's directory."""
+        host = socket.gethostname()
+        claimed = []
+        try:
+            entries = sorted(os.listdir(self.spool_dir))
+        except FileNotFoundError:
+            return claimed
+        for entry in entries:
+            path = os.path.join(self.spool_dir, entry)
+            owner_host, _, owner_pid = entry.rpartition("-")
+            if entry.endswith(".jsonl"):
+                # Written directly into the spool directory by an older version
+                sources = [path]
+            elif path == self._shard_dir or (
+                owner_host == host and owner_pid.isdigit() and not _process_alive(int(owner_pid))
+            ):
+                try:
+                    sources = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                               if name.endswith(".jsonl")]
+                except OSError:
+                    continue
+            else:
+                continue
+            for source in sources:
+                target = os.path.join(self._shard_dir, os.path.basename(source))
+                if source != target:
+                    try:
+                        os.makedirs(self._shard_dir, exist_ok=True)
+                        os.rename(source, target)
+                    except OSError:
+                        # Claimed by another process first
+                        continue
+                claimed.append(target)
+            if path != self._shard_dir and os.path.isdir(path):
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    pass
+        return claimed
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping and not self._due():
+                    timeout = None
+                    if self._oldest is not None:
+                        timeout = max(0.0, self._oldest + self.flush_interval - time.monotonic())
+                    elif self._parked:
+                        timeout = self.flush_interval
+                    self._condition.wait(timeout)
+                    if self._parked and not self._pending:
+                        break
+                batch = self._take_batch()
+                if self._stopping and not batch:
+                    # Parked shards stay on disk for the next process
+                    return
+                parked, self._parked = self._parked, []
+                self._flushing += 1
+            try:
+                shards = list(parked)
+                if batch:
+                    # Persist the batch before anything else can fail
+                    try:
+                        shards.append(self._write_shard(batch))
+                    except OSError as e:
+                        print(f"Failed to write ingestion shard, will retry: {e}")
+                        self.counters.incr("failed_flushes")
+                        with self._condition:
+                            self._pending[:0] = batch
+                            self._oldest = time.monotonic()
+                for shard_path in shards:
+                    try:
+                        self._ingest(shard_path)
+                    except Exception as e:
+                        print(f"Failed to ingest {os.path.basename(shard_path)}: {e}")
+                        self._park(shard_path)
+            finally:
+                with self._condition:
+                    self._flushing -= 1
+                    self._condition.notify_all()
+
+    def _due(self) -> bool:
+        if len(self._pending) >= self.batch_size:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+
+    def _take_batch(self) -> List[Dict[str, str]]:
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        self._oldest = time.monotonic() if self._pending else None
+        return batch
+
+    def _write_shard(self, batch: List[Dict[str, str]]) -> str:
+        os.makedirs(self._shard_dir, exist_ok=True)
+        digest = hashlib.sha256("".join(document["id"] for document in batch).encode()).hexdigest()[:16]
+        shard_path = os.path.join(self._shard_dir, f"receipts-{digest}.jsonl")
+        temp_path = f"{shard_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as shard:
+            for document in batch:
+                shard.write(json.dumps(document, ensure_ascii=False) + "\n")
+        os.replace(temp_path, shard_path)
+        return shard_path
+
+    def _ingest(self, shard_path: str) -> None:
+        try:
+            with open(shard_path, encoding="utf-8") as shard:
+                documents = sum(1 for _ in shard)
+        except FileNotFoundError:
+            # Already ingested, or removed from the spool directory
+            return
+        start = time.perf_counter()
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.uploader(shard_path)
+            except Exception as e:
+                print(f"Failed to ingest {os.path.basename(shard_path)} (attempt {attempt}): {e}")
+                if attempt < self.max_retries:
+                    self.counters.incr("retries")
+                    time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                continue
+            try:
+                os.remove(shard_path)
+            except FileNotFoundError:
+                pass
+            self.counters.incr("flushes")
+            self.counters.incr("documents_ingested", documents)
+            self.flush_latency.record(time.perf_counter() - start)
+            return
+        # Keep the shard on disk; it is retried on a later flush or after a restart
+        self.counters.incr("failed_flushes")
+        self.flush_latency.record(time.perf_counter() - start, ok=False)
+        self._park(shard_path)
+
+    def _park(self, shard_path: str) -> None:
+        with self._condition:
+            if shard_path not in self._parked:
+                self._parked.append(shard_path)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ingest everything pending now and wait for it to finish.
+
+        Returns:
+            True if the queue drained within `timeout`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._flushing:
+                if self._pending:
+                    self._oldest = time.monotonic() - self.flush_interval
+                    self._condition.notify_all()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: Optional[float] = 30) -> None:
+        """Flush pending documents and stop the background thread."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._condition:
+            depth = len(self._pending)
+            parked = len(self._parked)
+            oldest = None if self._oldest is None else round(time.monotonic() - self._oldest, 3)
+        return {
+            **self.counters.snapshot(),
+            "queue_depth": depth,
+            "parked_shards": parked,
+            "oldest_pending_seconds": oldest,
+            "flush_latency": self.flush_latency.snapshot(),
+        }
+
+
+ingestion_queue = IngestionQueue()
+register_metrics("rag_ingestion", ingestion_queue.stats)
@@ -1,8 +1,12 @@
 import os
+import threading
+from typing import Any, Optional
+from google.api_core.exceptions import NotFound
 from google.auth import default
 import vertexai
 from vertexai.preview import rag
 from dotenv import load_dotenv, set_key
+from app.functions.metrics import Counters, register_metrics
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path="app/.env")
@@ -19,9 +23,25 @@ ENV_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".
 print(ENV_FILE_PATH);
 
 
+# Vertex AI init and the corpus lookup are resolved once per process; every
+# receipt the agents archive would otherwise repeat credential discovery and
+# page through list_corpora()
+_vertex_initialized = False
+_corpus: Optional[Any] = None
+_corpus_lock = threading.Lock()
+corpus_counters = Counters("lookups", "resolves", "refreshes")
+register_metrics("rag_corpus", corpus_counters.snapshot)
+
+
 def initialize_vertex_ai():
-    credentials, _ = default()
-    vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=credentials)
+    global _vertex_initialized
+    if _vertex_initialized:
+        return
+    with _corpus_lock:
+        if not _vertex_initialized:
+            credentials, _ = default()
+            vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=credentials)
+            _vertex_initialized = True
 
 def create_or_get_corpus():
     embedding_model_config = rag.EmbeddingModelConfig(
@@ -43,26 +63,110 @@ def create_or_get_corpus():
         print(f"Created new corpus with display name '{CORPUS_DISPLAY_NAME}'")
     return corpus
 
+def get_corpus():
+    """
+    Return the process-wide corpus handle, resolving it on first use.
+
+    The corpus name is written to `.env` only when it differs from the
+    RAG_CORPUS value already configured.
+    """
+    global _corpus
+    corpus_counters.incr("lookups")
+    corpus = _corpus
+    if corpus is not None:
+        return corpus
+    initialize_vertex_ai()
+    with _corpus_lock:
+        if _corpus is None:
+            corpus = create_or_get_corpus()
+            corpus_counters.incr("resolves")
+            print("corpus.name", corpus.name)
+            if os.environ.get("RAG_CORPUS") != corpus.name:
+                set_key(ENV_FILE_PATH, "RAG_CORPUS", corpus.name)
+                os.environ["RAG_CORPUS"] = corpus.name
+            _corpus = corpus
+        return _corpus
+
+def invalidate_corpus(stale_name: Optional[str] = None):
+    """
+    Drop the cached corpus so the next `get_corpus()` resolves it again.
+
+    With `stale_name`, the cache is only cleared if it still holds that
+    corpus, so threads that hit the same deleted corpus refresh it once.
+    """
+    global _corpus
+    with _corpus_lock:
+        if _corpus is not None and (stale_name is None or _corpus.name == stale_name):
+            _corpus = None
+            corpus_counters.incr("refreshes")
+
+def reset_corpus_cache():
+    """Forget the Vertex AI init and the corpus handle (e.g. between benchmark runs)."""
+    global _vertex_initialized, _corpus
+    with _corpus_lock:
+        _vertex_initialized = False
+        _corpus = None
+
+def _is_missing_corpus(error):
+    # rag.upload_file reports a missing corpus as a ValueError ("... is not found")
+    return isinstance(error, NotFound) or (isinstance(error, ValueError) and "not found" in str(error).lower())
+
+def _with_corpus(operation):
+    """
+    Run `operation(corpus_name)` against the cached corpus.
+
+    If the corpus was deleted behind our back, it is resolved (or recreated)
+    again and the operation retried once.
+    """
+    corpus = get_corpus()
+    try:
+        return operation(corpus.name)
+    except Exception as e:
+        if not _is_missing_corpus(e):
+            raise
+        print(f"Corpus {corpus.name} not found, refreshing")
+        invalidate_corpus(corpus.name)
+        return operation(get_corpus().name)
+
+def _upload_file(file_path, display_name):
+    return _with_corpus(lambda corpus_name: rag.upload_file(
+        corpus_name=corpus_name,
+        path=file_path,
+        display_name=display_name,
+        description=f"User uploaded file: {display_name}"
+    ))
+
+def import_shard_to_corpus(shard_path, staging_bucket=None):
+    """
+    Ingest one JSONL shard of documents into the corpus in a single call.
+
+    With `staging_bucket`, the shard is copied to GCS and bulk-imported with
+    rag.import_files (re-importing an unchanged object is skipped by the
+    service); otherwise it is sent with one rag.upload_file call.
+    """
+    shard_name = os.path.basename(shard_path)
+    if not staging_bucket:
+        return _upload_file(shard_path, shard_name)
+
+    from google.cloud import storage
+
+    blob = storage.Client(project=PROJECT_ID).bucket(staging_bucket).blob(f"rag_ingest/{shard_name}")
+    blob.upload_from_filename(shard_path)
+    return _with_corpus(lambda corpus_name: rag.import_files(
+        corpus_name,
+        [f"gs://{staging_bucket}/rag_ingest/{shard_name}"],
+    ))
+
 def upload_user_documents_to_corpus(file_paths):
     """
     Uploads one or more user documents (local file paths) to the RAG corpus.
     """
-    initialize_vertex_ai()
-    corpus = create_or_get_corpus()
-    print("Finished creating or getting corpus")
-    print("corpus.name",corpus.name)
-    set_key(ENV_FILE_PATH, "RAG_CORPUS", corpus.name)
     uploaded = []
     for file_path in file_paths:
         display_name = os.path.basename(file_path)
         print(f"Uploading {display_name} to corpus...")
         try:
-            rag_file = rag.upload_file(
-                corpus_name=corpus.name,
-                path=file_path,
-                display_name=display_name,
-                description=f"User uploaded file: {display_name}"
-            )
+            _upload_file(file_path, display_name)
             print(f"Successfully uploaded {display_name} to corpus")
             uploaded.append(display_name)
         except Exception as e:
@@ -73,8 +177,7 @@ def list_user_corpus_files():
     """
     Lists all files in the user's RAG corpus.
     """
-    initialize_vertex_ai()
-    corpus = create_or_get_corpus()
+    corpus = get_corpus()
     files = list(rag.list_files(corpus_name=corpus.name))
     print(f"Total files in corpus: {len(files)}")
     for file in files:
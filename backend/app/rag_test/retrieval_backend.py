@@ -0,0 +1,173 @@
+"""
+Pluggable retrieval backend for the RAG agents.
+
+"vertex" (the default) keeps using the Vertex AI RAG corpus through
+`VertexAiRagRetrieval`. "local" answers from the embedded `VectorIndex`:
+documents are embedded with the shared Gemini client and inserted as the
+ingestion queue flushes them, and queries run against the on-disk index with
+no corpus round trip, which also makes retrieval usable offline once the
+index is built. Both backends expose the same `retrieve_rag_documentation`
+tool to the agents. Configured through environment variables:
+
+    RETRIEVAL_BACKEND     "vertex" or "local" (default vertex)
+    LOCAL_INDEX_DIR       directory of the local index (default local_index)
+    LOCAL_INDEX_NPROBE    IVF lists scanned per query (default 8)
+    EMBEDDING_MODEL       embedding model for the local backend (default text-embedding-004)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+from dotenv import load_dotenv
+from app.functions.genai_client import get_client
+from app.functions.metrics import LatencyTracker, register_metrics
+from .vector_index import VectorIndex
+
+load_dotenv(dotenv_path=".env")
+
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "vertex")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "local_index")
+LOCAL_INDEX_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "8"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-004")
+# Same settings as the Vertex AI retrieval tool
+SIMILARITY_TOP_K = 10
+VECTOR_DISTANCE_THRESHOLD = 0.6
+EMBED_BATCH_SIZE = 100
+
+TOOL_NAME = "retrieve_rag_documentation"
+TOOL_DESCRIPTION = (
+    "Use this tool to retrieve documentation and reference materials for the question from the RAG corpus."
+)
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+query_latency = LatencyTracker()
+
+
+def embed_texts(texts: Sequence[str], task_type: str = "RETRIEVAL_DOCUMENT") -> np.ndarray:
+    """Embed `texts` with the shared Gemini client, batching requests."""
+    from google.genai import types
+
+    client = get_client()
+    vectors = []
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        response = client.models.embed_content(
+            model=EMBEDDING_MODEL,
+            contents=list(texts[start:start + EMBED_BATCH_SIZE]),
+            config=types.EmbedContentConfig(task_type=task_type),
+        )
+        vectors.extend(embedding.values for embedding in response.embeddings)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def get_local_index(dim: Optional[int] = None) -> Optional[VectorIndex]:
+    """
+    Return the process-wide local index, opening it on first use.
+
+    A new index can only be created once the embedding dimension is known,
+    so this returns None when no index exists on disk and `dim` is not given.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if dim is None and not os.path.exists(os.path.join(LOCAL_INDEX_DIR, "index.json")):
+                    return None
+                _index = VectorIndex(LOCAL_INDEX_DIR, dim=dim, nprobe=LOCAL_INDEX_NPROBE)
+    return _index
+
+
+def index_documents(documents: Sequence[Dict[str, Any]]) -> int:
+    """
+    Embed and insert documents (`id`, `text`, optional `filename`) into the local index.
+
+    Documents already in the index are skipped without being re-embedded.
+
+    Returns:
+        Number of documents added.
+    """
+    index = get_local_index()
+    if index is not None:
+        documents = [document for document in documents if document["id"] not in index]
+    if not documents:
+        return 0
+    vectors = embed_texts([document["text"] for document in documents])
+    index = get_local_index(dim=vectors.shape[1])
+    return index.add(
+        [document["id"] for document in documents],
+        [document["text"] for document in documents],
+        vectors,
+        metadata=[{"filename": document.get("filename", "")} for document in documents],
+    )
+
+
+def ingest_shard(shard_path: str, staging_bucket: Optional[str] = None) -> Any:
+    """Ingest a JSONL shard from the ingestion queue into the configured backend."""
+    if RETRIEVAL_BACKEND == "local":
+        with open(shard_path, encoding="utf-8") as shard:
+            return index_documents([json.loads(line) for line in shard if line.strip()])
+
+    from .prepare_corpus_and_data import import_shard_to_corpus
+
+    return import_shard_to_corpus(shard_path, staging_bucket=staging_bucket)
+
+
+def retrieve_rag_documentation(query: str) -> Union[List[str], str]:
+    """Use this tool to retrieve documentation and reference materials for the question from the RAG corpus."""
+    index = get_local_index()
+    if index is None or not len(index):
+        return "No matching result found in the local index."
+    start = time.perf_counter()
+    query_vector = embed_texts([query], task_type="RETRIEVAL_QUERY")[0]
+    hits = index.search(query_vector, k=SIMILARITY_TOP_K, max_distance=VECTOR_DISTANCE_THRESHOLD)
+    query_latency.record(time.perf_counter() - start)
+    if not hits:
+        return "No matching result found in the local index."
+    return [
+        f"Source: {record['metadata']['filename']}\n{record['text']}"
+        if record.get("metadata", {}).get("filename") else record["text"]
+        for _, record in hits
+    ]
+
+
+def build_retrieval_tool(backend: str = RETRIEVAL_BACKEND):
+    """
+    Build the retrieval tool for `backend`.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == "local":
+        return retrieve_rag_documentation
+    if backend != "vertex":
+        raise ValueError(f"Unknown RETRIEVAL_BACKEND '{backend}', expected 'vertex' or 'local'")
+
+    from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
+    from vertexai.preview import rag
+
+    return VertexAiRagRetrieval(
+        name=TOOL_NAME,
+        description=TOOL_DESCRIPTION,
+        rag_resources=[
+            rag.RagResource(
+                rag_corpus=os.environ.get("RAG_CORPUS")
+            )
+        ],
+        similarity_top_k=SIMILARITY_TOP_K,
+        vector_distance_threshold=VECTOR_DISTANCE_THRESHOLD,
+    )
+
+
+def retrieval_stats() -> dict:
+    index = _index
+    return {
+        "backend": RETRIEVAL_BACKEND,
+        "local_index": index.stats() if index is not None else None,
+        "local_queries": query_latency.snapshot(),
+    }
+
+
+register_metrics("retrieval", retrieval_stats)
@@ -0,0 +1,303 @@
+"""
+Embedded vector index used as a local alternative to the Vertex AI RAG corpus.
+
+Vectors are stored L2-normalized in a memory-mapped float32 file, so an index
+larger than RAM is paged in on demand and a restart does not reload it. Once
+enough vectors exist, an IVF (inverted file) index is trained with k-means:
+each vector is assigned to its nearest centroid, and a query scores only the
+vectors in its `nprobe` nearest lists instead of the whole matrix. Inserts
+are incremental (new vectors go to their nearest existing centroid) and the
+centroids are retrained each time the index doubles in size.
+
+On-disk layout of an index directory:
+
+    index.json       dimension and IVF parameters
+    vectors.f32      row-major float32 matrix (capacity grows by doubling)
+    lists.i32        IVF list id of every row (-1 before training)
+    centroids.npy    IVF centroids
+    records.jsonl    one line per row: id, text and metadata
+
+`records.jsonl` is written last and defines how many rows are valid, so a
+crash mid-insert never exposes a half-written vector.
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+# Below this many vectors a brute-force scan is both exact and fast enough
+TRAIN_MIN_VECTORS = 2048
+# k-means runs on a sample of at most this many points per centroid
+TRAIN_SAMPLE_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+
+Hit = Tuple[float, Dict[str, Any]]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def kmeans(points: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on normalized `points`; returns `k` normalized centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(points @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, points)
+        counts = np.bincount(assignments, minlength=k)
+        # Re-seed empty clusters from random points
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = points[rng.choice(len(points), size=int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class VectorIndex:
+    """
+    Persistent cosine-similarity index with an optional IVF accelerator.
+
+    Args:
+        path: Directory holding the index files (created if missing).
+        dim: Embedding dimension; required when creating a new index.
+        nprobe: IVF lists scanned per query.
+        nlist: IVF lists to train; 0 picks about sqrt(n) at training time.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, nprobe: int = 8, nlist: int = 0):
+        self.path = path
+        self.nprobe = nprobe
+        self.requested_nlist = nlist
+        self._lock = threading.RLock()
+        self._records: List[Dict[str, Any]] = []
+        self._ids: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._trained_at = 0
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, "index.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self._trained_at = meta.get("trained_at", 0)
+        elif dim is None:
+            raise ValueError(f"No index at {path}; pass `dim` to create one")
+        else:
+            self.dim = dim
+            self._write_meta()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._ids
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _write_meta(self) -> None:
+        temp_path = self._file("index.json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "trained_at": self._trained_at}, f)
+        os.replace(temp_path, self._file("index.json"))
+
+    def _map(self, capacity: int) -> None:
+        for name, width in (("vectors.f32", self.dim * 4), ("lists.i32", 4)):
+            file_path = self._file(name)
+            size = capacity * width
+            if not os.path.exists(file_path) or os.path.getsize(file_path) < size:
+                with open(file_path, "ab") as f:
+                    f.truncate(size)
+        self._capacity = capacity
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.dim))
+        self._assignments = np.memmap(self._file("lists.i32"), dtype=np.int32, mode="r+", shape=(capacity,))
+
+    def _load(self) -> None:
+        records_path = self._file("records.jsonl")
+        if os.path.exists(records_path):
+            valid_bytes = 0
+            with open(records_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if not line.endswith(b"\n"):
+                        break
+                    valid_bytes += len(line)
+                    self._ids[record["id"]] = len(self._records)
+                    self._records.append(record)
+            if valid_bytes < os.path.getsize(records_path):
+                # Drop the torn final line of an interrupted insert
+                with open(records_path, "r+b") as f:
+                    f.truncate(valid_bytes)
+        vectors_path = self._file("vectors.f32")
+        existing = os.path.getsize(vectors_path) // (self.dim * 4) if os.path.exists(vectors_path) else 0
+        self._map(max(INITIAL_CAPACITY, existing))
+
+        centroids_path = self._file("centroids.npy")
+        if os.path.exists(centroids_path):
+            self._centroids = np.load(centroids_path)
+            self._rebuild_lists()
+
+    def _rebuild_lists(self) -> None:
+        self._lists = [[] for _ in range(len(self._centroids))]
+        assignments = np.asarray(self._assignments[:len(self)])
+        for row, list_id in enumerate(assignments.tolist()):
+            if list_id >= 0:
+                self._lists[list_id].append(row)
+        self._list_arrays = {}
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], vectors: np.ndarray,
+            metadata: Optional[Sequence[Dict[str, Any]]] = None) -> int:
+        """
+        Insert documents, skipping ids that are already indexed.
+
+        Returns:
+            Number of documents actually added.
+        """
+        vectors = _normalize(vectors).reshape(len(ids), -1)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+        with self._lock:
+            keep, seen = [], set()
+            for position, doc_id in enumerate(ids):
+                if doc_id not in self._ids and doc_id not in seen:
+                    keep.append(position)
+                    seen.add(doc_id)
+            if not keep:
+                return 0
+            vectors = vectors[keep]
+            start = len(self)
+            end = start + len(keep)
+            if end > self._capacity:
+                capacity = self._capacity
+                while capacity < end:
+                    capacity *= 2
+                self._vectors.flush()
+                self._assignments.flush()
+                self._map(capacity)
+
+            self._vectors[start:end] = vectors
+            if self.trained:
+                assignments = np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+                for offset, list_id in enumerate(assignments.tolist()):
+                    self._lists[list_id].append(start + offset)
+                    self._list_arrays.pop(list_id, None)
+            else:
+                assignments = np.full(len(keep), -1, dtype=np.int32)
+            self._assignments[start:end] = assignments
+            self._vectors.flush()
+            self._assignments.flush()
+
+            new_records = []
+            for position in keep:
+                record = {"id": ids[position], "text": texts[position]}
+                if metadata is not None:
+                    record["metadata"] = metadata[position]
+                new_records.append(record)
+            with open(self._file("records.jsonl"), "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in new_records))
+            for record in new_records:
+                self._ids[record["id"]] = len(self._records)
+                self._records.append(record)
+
+            if len(self) >= TRAIN_MIN_VECTORS and len(self) >= 2 * self._trained_at:
+                self.train()
+            return len(keep)
+
+    def train(self, nlist: Optional[int] = None) -> None:
+        """(Re)train the IVF centroids on the current vectors and reassign every row."""
+        with self._lock:
+            n = len(self)
+            nlist = nlist or self.requested_nlist or max(1, int(math.sqrt(n)))
+            nlist = min(nlist, n)
+            rng = np.random.default_rng(n)
+            sample_size = min(n, nlist * TRAIN_SAMPLE_PER_LIST)
+            sample = np.asarray(self._vectors[np.sort(rng.choice(n, size=sample_size, replace=False))])
+            centroids = kmeans(sample, nlist, seed=n)
+
+            for start in range(0, n, 65536):
+                block = np.asarray(self._vectors[start:start + 65536][:n - start])
+                self._assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+            self._assignments.flush()
+            np.save(self._file("centroids.npy"), centroids)
+            self._centroids = centroids
+            self._trained_at = n
+            self._write_meta()
+            self._rebuild_lists()
+
+    def _candidates(self, query: np.ndarray, nprobe: int) -> Optional[np.ndarray]:
+        if not self.trained:
+            return None
+        probes = np.argsort(-(self._centroids @ query))[:nprobe]
+        arrays = []
+        for list_id in probes.tolist():
+            array = self._list_arrays.get(list_id)
+            if array is None:
+                array = self._list_arrays[list_id] = np.asarray(self._lists[list_id], dtype=np.int64)
+            arrays.append(array)
+        return np.sort(np.concatenate(arrays)) if arrays else np.empty(0, dtype=np.int64)
+
+    def search(self, query: np.ndarray, k: int = 10, max_distance: Optional[float] = None,
+               nprobe: Optional[int] = None, exact: bool = False) -> List[Hit]:
+        """
+        Return up to `k` (cosine similarity, record) pairs, best first.
+
+        Args:
+            query: Query embedding.
+            k: Number of results.
+            max_distance: Drop results whose cosine distance exceeds this.
+            nprobe: IVF lists to scan (defaults to the index setting).
+            exact: Scan every vector instead of the IVF lists.
+        """
+        query = _normalize(query).reshape(-1)
+        with self._lock:
+            n = len(self)
+            if not n:
+                return []
+            rows = None if exact else self._candidates(query, nprobe or self.nprobe)
+            if rows is None:
+                scores = np.asarray(self._vectors[:n]) @ query
+                rows = np.arange(n)
+            else:
+                scores = np.asarray(self._vectors[rows]) @ query
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top])]
+            hits = []
+            for position in top.tolist():
+                score = float(scores[position])
+                if max_distance is not None and 1 - score > max_distance:
+                    break
+                hits.append((score, self._records[int(rows[position])]))
+            return hits
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "vectors": len(self),
+                "dim": self.dim,
+                "lists": len(self._lists) if self.trained else 0,
+                "nprobe": self.nprobe,
+                "capacity": self._capacity,
+            }
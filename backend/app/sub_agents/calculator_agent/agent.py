@@ -4,11 +4,12 @@ from google.adk import Agent
 from google.adk.tools import google_search
 
 from . import prompt
+from app.agents.models import shared_model
 
 MODEL = "gemini-2.5-pro"
 
 calculator_agent = Agent(
-    model=MODEL,
+    model=shared_model(MODEL),
     name="calculator_agent",
     instruction=prompt.calculator_agent_prompt,
     output_key="calculator_agent_output",
@@ -4,11 +4,12 @@ from google.adk import Agent
 # No need for google_search tool here
 from . import prompt
 from app.agents.router_agent import router_agent
+from app.agents.models import shared_model
 
 MODEL = "gemini-2.5-pro"
 
 extractor_agent = Agent(
-    model=MODEL,
+    model=shared_model(MODEL),
     name="extractor_agent",
     description="Extracts structured data from receipt images and documents.",
     instruction=prompt.EXTRACTOR_AGENT_PROMPT,
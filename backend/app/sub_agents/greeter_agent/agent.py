@@ -4,11 +4,12 @@ from google.adk import Agent
 from google.adk.tools import google_search
 
 from . import prompt
+from app.agents.models import shared_model
 
 MODEL = "gemini-2.5-pro"
 
 greeter_agent = Agent(
-    model=MODEL,
+    model=shared_model(MODEL),
     name="greeter_agent",
     description="Greets the user warmly when they start a conversation or say hello.",
     instruction=prompt.GREETER_AGENT_PROMPT,
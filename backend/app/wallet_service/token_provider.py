@@ -0,0 +1,133 @@
+"""
+Cached OAuth access tokens for the Google Wallet REST API.
+
+`AccessTokenProvider` keeps one credentials object per process, hands out the
+cached token until it is close to expiry, refreshes it in the background once
+it enters the refresh window, and coalesces concurrent refreshes so only one
+OAuth round trip is ever in flight.
+"""
+
+import asyncio
+import datetime
+import threading
+from typing import Any, Callable, Optional
+import requests
+from google.auth.transport.requests import Request
+from google.oauth2 import service_account
+from app.functions.metrics import register_metrics
+from .wallet_service import SERVICE_ACCOUNT_FILE
+
+WALLET_SCOPES = ["https://www.googleapis.com/auth/wallet_object.issuer"]
+
+
+class AccessTokenProvider:
+    """
+    Caches and proactively refreshes an OAuth access token.
+
+    Args:
+        credentials_factory: Zero-argument callable building google-auth credentials.
+        refresh_margin: Seconds before expiry at which a refresh is started.
+        blocking_margin: Seconds before expiry below which callers wait for the refresh.
+    """
+
+    def __init__(self, credentials_factory: Callable[[], Any], refresh_margin: float = 300, blocking_margin: float = 30):
+        self._credentials_factory = credentials_factory
+        self.refresh_margin = refresh_margin
+        self.blocking_margin = blocking_margin
+        self._credentials = None
+        self._refresh_lock = threading.Lock()
+        self._background_lock = threading.Lock()
+        self._background_refresh: Optional[threading.Thread] = None
+        # Reuse one HTTP session for all token requests
+        self._request = Request(session=requests.Session())
+        self.cache_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _seconds_left(self) -> float:
+        creds = self._credentials
+        if creds is None or not creds.token or creds.expiry is None:
+            return 0.0
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (creds.expiry - now).total_seconds()
+
+    def get_token(self) -> str:
+        """
+        Return a valid access token, refreshing only when necessary.
+
+        Returns:
+            str: Bearer token.
+        """
+        seconds_left = self._seconds_left()
+        if seconds_left > self.refresh_margin:
+            self.cache_hits += 1
+            return self._credentials.token
+        if seconds_left > self.blocking_margin:
+            # Still usable: serve it and refresh off the request path
+            self.cache_hits += 1
+            self._start_background_refresh()
+            return self._credentials.token
+        return self._refresh()
+
+    async def get_token_async(self) -> str:
+        """Async wrapper that keeps a blocking refresh off the event loop."""
+        if self._seconds_left() > self.blocking_margin:
+            return self.get_token()
+        return await asyncio.to_thread(self.get_token)
+
+    def _refresh(self) -> str:
+        with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._seconds_left() > self.refresh_margin:
+                return self._credentials.token
+            if self._credentials is None:
+                self._credentials = self._credentials_factory()
+            try:
+                self._credentials.refresh(self._request)
+            except Exception:
+                self.refresh_failures += 1
+                raise
+            self.refreshes += 1
+            return self._credentials.token
+
+    def _start_background_refresh(self) -> None:
+        with self._background_lock:
+            if self._background_refresh is not None and self._background_refresh.is_alive():
+                return
+            self._background_refresh = threading.Thread(target=self._refresh_quietly, daemon=True)
+            self._background_refresh.start()
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self._refresh()
+        except Exception as e:
+            print(f"Background token refresh failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "cache_hits": self.cache_hits,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "seconds_left": round(self._seconds_left(), 1),
+        }
+
+
+wallet_token_provider = AccessTokenProvider(
+    lambda: service_account.Credentials.from_service_account_file(
+        SERVICE_ACCOUNT_FILE,
+        scopes=WALLET_SCOPES,
+    )
+)
+register_metrics("wallet_token", wallet_token_provider.stats)
+
+# Keep-alive HTTP session shared by the Wallet REST calls
+wallet_session = requests.Session()
+
+
+def wallet_api_headers() -> dict:
+    """Authorization headers for a Google Wallet REST call."""
+    return {
+        "Authorization": f"Bearer {wallet_token_provider.get_token()}",
+        "Content-Type": "application/json",
+    }
@@ -1,8 +1,9 @@
 import os
 import uuid
 import json
+import threading
+from typing import List, Tuple
 from google.auth import jwt, crypt
-from google.oauth2 import service_account
 from dotenv import load_dotenv
 
 load_dotenv(dotenv_path="app/.env")
@@ -89,73 +90,101 @@ print(ISSUER_ID)
 #         print(f"Error creating JWT (Unexpected error): {e}")
 #         return None
 
-def create_receipt_pass_jwt(receipt_data: dict) -> str | None:
+_signer_lock = threading.Lock()
+_signer_cache = {"path": None, "mtime": None, "signer": None, "email": None}
+
+def get_signing_credentials() -> Tuple[crypt.RSASigner, str]:
     """
-    Creates the final "Save to Google Wallet" JWT containing the pass object.
+    Returns the RSA signer and issuer email for the wallet service account.
+
+    The key file is parsed once and cached; it is reloaded only when its
+    modification time changes (e.g. after a key rotation).
     """
-    try:
-        pass_id = f"{ISSUER_ID}.{uuid.uuid4()}"
-        pass_class_id = f"{ISSUER_ID}.{PASS_CLASS_SUFFIX}"
-
-        # --- Define the Pass Object ---
-        pass_payload = {
-            'id': pass_id,
-            'classId': pass_class_id,
-            'genericType': 'GENERIC_TYPE_UNSPECIFIED',
-            'hexBackgroundColor': '#ffffff',
-            'logo': {
-                'sourceUri': { 'uri': 'https://storage.googleapis.com/wallet-lab-tools-codelab-artifacts-public/pass_google_logo.jpg' }
+    mtime = os.stat(SERVICE_ACCOUNT_FILE).st_mtime_ns
+    cache = _signer_cache
+    if cache["path"] == SERVICE_ACCOUNT_FILE and cache["mtime"] == mtime:
+        return cache["signer"], cache["email"]
+
+    with _signer_lock:
+        if cache["path"] != SERVICE_ACCOUNT_FILE or cache["mtime"] != mtime:
+            with open(SERVICE_ACCOUNT_FILE, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            cache["signer"] = crypt.RSASigner.from_service_account_info(info)
+            cache["email"] = info["client_email"]
+            cache["path"] = SERVICE_ACCOUNT_FILE
+            cache["mtime"] = mtime
+        return cache["signer"], cache["email"]
+
+def build_receipt_pass_object(receipt_data: dict) -> dict:
+    """
+    Builds the Google Wallet generic pass object for a receipt.
+
+    Missing or null fields (normalized receipts carry explicit None) fall back
+    to placeholders.
+    """
+    pass_id = f"{ISSUER_ID}.{uuid.uuid4()}"
+    pass_class_id = f"{ISSUER_ID}.{PASS_CLASS_SUFFIX}"
+
+    return {
+        'id': pass_id,
+        'classId': pass_class_id,
+        'genericType': 'GENERIC_TYPE_UNSPECIFIED',
+        'hexBackgroundColor': '#ffffff',
+        'logo': {
+            'sourceUri': { 'uri': 'https://storage.googleapis.com/wallet-lab-tools-codelab-artifacts-public/pass_google_logo.jpg' }
+        },
+        'cardTitle': { 'defaultValue': { 'language': 'en', 'value': 'Purchase Receipt' }},
+        'header': { 'defaultValue': { 'language': 'en', 'value': receipt_data.get("merchant_name") or "Unknown Store" }},
+        'textModulesData': [
+            {
+                'header': 'Total Amount',
+                'body': f"${float(receipt_data.get('total_amount') or 0.0):.2f}",  # CORRECTED
+                'id': 'total'
             },
-            'cardTitle': { 'defaultValue': { 'language': 'en', 'value': 'Purchase Receipt' }},
-            'header': { 'defaultValue': { 'language': 'en', 'value': receipt_data.get("merchant_name", "Unknown Store") }},
-            'textModulesData': [
-                {
-                    'header': 'Total Amount',
-                    'body': f"${float(receipt_data.get('total_amount', 0.0)):.2f}",  # CORRECTED
-                    'id': 'total'
-                },
-                {
-                    'header': 'Purchase Date',
-                    'body': receipt_data.get("purchase_date", "N/A"),
-                    'id': 'purchase_date'
-                },
+            {
+                'header': 'Purchase Date',
+                'body': receipt_data.get("purchase_date") or "N/A",
+                'id': 'purchase_date'
+            },
+            {
+                'header': 'Purchased Items',
+                'body': "\n".join([
+                    f"{int(item.get('quantity') or 1)}x {item.get('description') or 'Item'} - ${float(item.get('price') or 0.0):.2f}"  # CORRECTED
+                    for item in receipt_data.get("items") or []
+                ]),
+                'id': 'items_list'
+            }
+        ],
+        "linksModuleData": {
+            "uris": [
                 {
-                    'header': 'Purchased Items',
-                    'body': "\n".join([
-                        f"{int(item.get('quantity', 1))}x {item.get('description', 'Item')} - ${float(item.get('price', 0.0)):.2f}"  # CORRECTED
-                        for item in receipt_data.get("items", [])
-                    ]),
-                    'id': 'items_list'
+                    "uri": f"https://your-agent-url.com/receipt/{pass_id}",
+                    "description": "Chat with Raseed Assistant",
                 }
-            ],
-            "linksModuleData": {
-                "uris": [
-                    {
-                        "uri": f"https://your-agent-url.com/receipt/{pass_id}",
-                        "description": "Chat with Raseed Assistant",
-                    }
-                ]
-            }
+            ]
         }
+    }
 
-        # --- Create the JWT Payload ---
-        creds = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE,
-            scopes=['https://www.googleapis.com/auth/wallet_object.issuer']
-        )
-
-        claims = {
-            'iss': creds.service_account_email,
-            'aud': 'google',
-            'origins': ['http://localhost:3000', 'https://your-deployed-frontend-url.com'],
-            'typ': 'savetowallet',
-            'payload': { 'genericObjects': [ pass_payload ] }
-        }
-
-        signer = crypt.RSASigner.from_service_account_file(SERVICE_ACCOUNT_FILE)
-        signed_jwt = jwt.encode(signer, claims)
+def sign_pass_objects(pass_objects: List[dict]) -> str:
+    """
+    Signs a "Save to Google Wallet" JWT carrying one or more generic pass objects.
+    """
+    signer, issuer_email = get_signing_credentials()
+    claims = {
+        'iss': issuer_email,
+        'aud': 'google',
+        'origins': ['http://localhost:3000', 'https://your-deployed-frontend-url.com'],
+        'typ': 'savetowallet',
+        'payload': { 'genericObjects': pass_objects }
+    }
+    return jwt.encode(signer, claims).decode('utf-8')
 
-        return signed_jwt.decode('utf-8')
+def create_receipt_pass_jwt(receipt_data: dict) -> str | None:
+    """
+    Creates the final "Save to Google Wallet" JWT containing the pass object.
+    """
+    try:
+        return sign_pass_objects([build_receipt_pass_object(receipt_data)])
     except ValueError as e:
         print(f"Error creating JWT (ValueError): {e}")
         return None
@@ -166,6 +195,30 @@ def create_receipt_pass_jwt(receipt_data: dict) -> str | None:
         print(f"Error creating JWT (Unexpected error): {e}")
         return None
 
+def create_receipt_pass_jwts(receipts: List[dict], combine: bool = True) -> List[str] | None:
+    """
+    Creates "Save to Google Wallet" JWTs for many receipts in one call.
+
+    Args:
+        receipts: Parsed receipt dictionaries.
+        combine: If True, sign a single JWT holding every pass object (one
+            save link adds all passes); otherwise sign one JWT per receipt.
+
+    Returns:
+        The signed JWTs, or None if signing fails.
+    """
+    try:
+        pass_objects = [build_receipt_pass_object(receipt) for receipt in receipts]
+        if combine:
+            return [sign_pass_objects(pass_objects)]
+        return [sign_pass_objects([pass_object]) for pass_object in pass_objects]
+    except FileNotFoundError as e:
+        print(f"Error creating JWTs (FileNotFoundError): Service account file not found: {e}")
+        return None
+    except Exception as e:
+        print(f"Error creating JWTs: {e}")
+        return None
+
 def get_save_to_wallet_url(signed_jwt: str) -> str:
     """Creates the final URL for the 'Add to Google Wallet' button."""
     return f"https://pay.google.com/gp/v/save/{signed_jwt}"
@@ -197,4 +250,23 @@ def generate_wallet_pass_link(receipt_data: dict) -> str :
     else:
         print("❌ Failed to create the pass object JWT.")
         #return None
-        return "Failed to create the pass object JWT."
\ No newline at end of file
+        return "Failed to create the pass object JWT."
+
+def generate_wallet_pass_links(receipts: List[dict], combine: bool = True) -> List[str]:
+    """
+    Generates 'Save to Google Wallet' links for many receipts at once.
+
+    Args:
+        receipts: A list of dictionaries containing parsed receipt information.
+        combine: If True, return a single link that saves every pass;
+            otherwise return one link per receipt.
+
+    Returns:
+        The list of save URLs (empty if signing fails).
+    """
+    print(f"Attempting to generate {len(receipts)} passes")
+    signed_jwts = create_receipt_pass_jwts(receipts, combine=combine)
+    if not signed_jwts:
+        print("❌ Failed to create the pass object JWTs.")
+        return []
+    return [get_save_to_wallet_url(signed_jwt) for signed_jwt in signed_jwts]
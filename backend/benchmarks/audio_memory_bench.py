@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of buffered vs streaming audio transcription.
+
+Writes synthetic 44.1 kHz WAV recordings of increasing length to disk, then
+transcribes each one in a fresh process, either the buffered way (read the
+whole upload, convert in memory, recognize) or through the streaming path
+(chunked reads -> piped ffmpeg -> streaming recognition). Reports the
+tracemalloc peak and the process's max RSS. Speech-to-Text is faked; ffmpeg
+and pydub must be installed.
+
+    python -m benchmarks.audio_memory_bench --minutes 1 5 15
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import tracemalloc
+import wave
+import numpy as np
+
+SAMPLE_RATE = 44100
+
+
+def write_recording(path: str, minutes: float) -> None:
+    # Written a second at a time so the benchmark itself stays small
+    rng = np.random.default_rng(0)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for _ in range(int(minutes * 60)):
+            wav.writeframes(rng.normal(0, 2000, SAMPLE_RATE).astype("<i2").tobytes())
+
+
+def measure(mode: str, path: str, queue) -> None:
+    from app.functions.speech_client import set_speech_client_factory
+    from benchmarks.fakes import FakeSpeechClient
+
+    set_speech_client_factory(FakeSpeechClient)
+    tracemalloc.start()
+    if mode == "buffered":
+        from app.functions.audio_processor import transcribe_audio
+
+        with open(path, "rb") as f:
+            transcribe_audio(f.read(), filename=os.path.basename(path))
+    else:
+        from app.functions.streaming_audio import transcribe_file_streaming
+
+        with open(path, "rb") as f:
+            transcribe_file_streaming(f)
+    _, peak = tracemalloc.get_traced_memory()
+    # ru_maxrss is KiB on Linux
+    queue.put((peak, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024))
+
+
+def run(mode: str, path: str):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(mode, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 15])
+    args = parser.parse_args()
+
+    mib = 1024 * 1024
+    print("=" * 72)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for minutes in args.minutes:
+            path = os.path.join(temp_dir, f"memo_{minutes:g}min.wav")
+            write_recording(path, minutes)
+            size = os.path.getsize(path)
+            buffered = run("buffered", path)
+            streamed = run("streaming", path)
+            print(f"{minutes:5.1f} min ({size / mib:6.1f} MiB)  "
+                  f"buffered: traced={buffered[0] / mib:7.1f} MiB rss={buffered[1] / mib:7.1f} MiB  "
+                  f"streaming: traced={streamed[0] / mib:6.1f} MiB rss={streamed[1] / mib:6.1f} MiB")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark audio conversion inline on the event loop vs in the worker pool.
+
+Synthesises sine-wave clips of several lengths and formats, converts them
+concurrently, and reports conversions/sec plus event-loop lag (how late a
+10 ms ticker wakes up while conversions run). Needs pydub and FFmpeg.
+
+    python -m benchmarks.audio_pool_bench --jobs 16 --lengths 5 30 120 --formats wav mp3
+"""
+
+import argparse
+import asyncio
+import io
+import time
+from pydub.generators import Sine
+from app.functions.audio_processor import convert_audio_format
+from app.functions.audio_workers import AudioConversionPool
+
+
+def synthetic_audio(seconds: int, fmt: str) -> bytes:
+    audio = Sine(440).to_audio_segment(duration=seconds * 1000).set_frame_rate(44100).set_channels(2)
+    output = io.BytesIO()
+    audio.export(output, format=fmt)
+    return output.getvalue()
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(mode: str, clips, pool: AudioConversionPool):
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0)
+
+    async def convert(audio_bytes, fmt):
+        if mode == "inline":
+            return convert_audio_format(audio_bytes, fmt)
+        return await pool.run(convert_audio_format, audio_bytes, fmt)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(convert(audio_bytes, fmt) for audio_bytes, fmt in clips))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return len(clips) / elapsed, await lag_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=16, help="conversions per (length, format)")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[5, 30, 120], help="clip lengths in seconds")
+    parser.add_argument("--formats", nargs="+", default=["wav", "mp3"])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    pool = AudioConversionPool(max_workers=args.workers)
+    print("=" * 72)
+    for fmt in args.formats:
+        for seconds in args.lengths:
+            clips = [(synthetic_audio(seconds, fmt), fmt)] * args.jobs
+            for mode in ("inline", "pool"):
+                rate, lag = asyncio.run(run(mode, clips, pool))
+                print(f"{fmt:<5} {seconds:>4}s  {mode:<7} {rate:8.2f} conversions/s  "
+                      f"max loop lag={lag * 1000:8.1f} ms")
+    print("=" * 72)
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
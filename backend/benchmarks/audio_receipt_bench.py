@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end latency of the two_stage vs fused audio receipt engines.
+
+Speech-to-Text and Gemini are replaced by stand-ins with configurable round
+trips: two_stage pays a recognition call plus a text Gemini call, fused pays a
+single (slower, audio-input) Gemini call. Every request uses distinct audio so
+the transcript and extraction caches never hit.
+
+    python -m benchmarks.audio_receipt_bench --requests 40 --concurrency 8 \
+        --speech-ms 700 --text-ms 600 --audio-ms 900
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+import wave
+import numpy as np
+from app.functions import genai_client
+from app.functions.audio_processor import receipt_from_transcript_async, transcribe_audio_async
+from app.functions.audio_receipt import extract_receipt_from_audio_async
+from app.functions.speech_client import set_speech_client_factory
+from benchmarks.fakes import FakeGenaiClient, FakeSpeechClient
+
+
+def voice_memo(seed: int, seconds: float = 8) -> bytes:
+    # Short 16 kHz LINEAR16 clip: goes to the recognizer without conversion
+    samples = np.random.default_rng(seed).normal(0, 2000, int(seconds * 16000)).astype("<i2")
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    return output.getvalue()
+
+
+async def two_stage(audio_bytes: bytes) -> str:
+    transcript = await transcribe_audio_async(audio_bytes, filename="memo.wav")
+    return await receipt_from_transcript_async(transcript)
+
+
+async def fused(audio_bytes: bytes) -> str:
+    return await extract_receipt_from_audio_async(audio_bytes, "audio/wav")
+
+
+async def run(engine, clips, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(audio_bytes: bytes):
+        async with semaphore:
+            start = time.perf_counter()
+            await engine(audio_bytes)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(clip) for clip in clips))
+    return latencies, time.perf_counter() - start
+
+
+def report(label: str, latencies, elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<10} p50={statistics.median(ordered) * 1000:7.1f} ms  p95={p95 * 1000:7.1f} ms  "
+          f"throughput={len(latencies) / elapsed:5.2f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--speech-ms", type=float, default=700, help="Speech-to-Text round trip")
+    parser.add_argument("--text-ms", type=float, default=600, help="Gemini call on a transcript")
+    parser.add_argument("--audio-ms", type=float, default=900, help="Gemini call with audio input")
+    args = parser.parse_args()
+
+    set_speech_client_factory(lambda: FakeSpeechClient(latency=args.speech_ms / 1000))
+    print("=" * 72)
+
+    genai_client.set_client_factory(lambda: FakeGenaiClient(latency=args.text_ms / 1000, setup_cost=0))
+    clips = [voice_memo(seed) for seed in range(args.requests)]
+    report("two_stage", *asyncio.run(run(two_stage, clips, args.concurrency)))
+
+    genai_client.set_client_factory(lambda: FakeGenaiClient(latency=args.audio_ms / 1000, setup_cost=0))
+    clips = [voice_memo(seed) for seed in range(args.requests, 2 * args.requests)]
+    report("fused", *asyncio.run(run(fused, clips, args.concurrency)))
+
+    genai_client.set_client_factory(None)
+    set_speech_client_factory(None)
+
+
+if __name__ == "__main__":
+    main()
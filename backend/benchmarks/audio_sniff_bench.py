@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark header sniffing vs extension-based detection on mislabeled uploads.
+
+Encodes a short tone into several containers with ffmpeg, gives every file
+the wrong extension, and counts the decode attempts needed to transcode each
+one with the legacy extension-first detection and fallback loop vs with
+magic-byte detection. Also reports the cost of a single sniff.
+
+    python -m benchmarks.audio_sniff_bench --seconds 5
+"""
+
+import argparse
+import io
+import math
+import struct
+import subprocess
+import time
+import wave
+from app.functions import audio_processor
+from app.functions.audio_sniffer import sniff_audio_format
+
+# container -> ffmpeg output args
+FORMATS = {
+    "wav": ["-f", "wav"],
+    "mp3": ["-f", "mp3"],
+    "flac": ["-f", "flac"],
+    "ogg": ["-f", "ogg", "-c:a", "libopus"],
+    "webm": ["-f", "webm", "-c:a", "libopus"],
+}
+# What a phone or browser might wrongly call each file
+MISLABELS = {"wav": "memo.m4a", "mp3": "memo.wav", "flac": "memo.mp3", "ogg": "memo.webm", "webm": "memo.ogg"}
+
+
+def tone_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    frames = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)))
+        for i in range(int(seconds * sample_rate))
+    )
+    output = io.BytesIO()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(frames)
+    return output.getvalue()
+
+
+def encode(wav_bytes: bytes, args: list) -> bytes:
+    return subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *args, "pipe:1"],
+        input=wav_bytes, capture_output=True, check=True,
+    ).stdout
+
+
+def legacy_detect(filename: str) -> str:
+    # Extension-only detection, as before header sniffing
+    return filename.rsplit(".", 1)[-1].lower()
+
+
+def legacy_convert(audio_bytes: bytes, detected_format: str) -> bytes:
+    # The unconditional fallback loop, as before header sniffing
+    try:
+        return audio_processor.convert_audio_format(audio_bytes, detected_format)
+    except Exception as e:
+        for fallback_format in ["wav", "mp3", "webm"]:
+            if fallback_format != detected_format:
+                try:
+                    return audio_processor.convert_audio_format(audio_bytes, fallback_format)
+                except Exception:
+                    continue
+        raise e
+
+
+def count_attempts(convert, audio_bytes: bytes, detected_format: str):
+    attempts = 0
+    original = audio_processor.convert_audio_format
+
+    def counting(data, input_format="mp3"):
+        nonlocal attempts
+        attempts += 1
+        return original(data, input_format)
+
+    audio_processor.convert_audio_format = counting
+    start = time.perf_counter()
+    try:
+        convert(audio_bytes, detected_format)
+        ok = True
+    except Exception:
+        ok = False
+    finally:
+        audio_processor.convert_audio_format = original
+    return attempts, ok, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    source = tone_wav(args.seconds)
+    print("=" * 72)
+    totals = {"legacy": 0, "sniffed": 0}
+    for container, ffmpeg_args in FORMATS.items():
+        data = source if container == "wav" else encode(source, ffmpeg_args)
+        filename = MISLABELS[container]
+
+        legacy = count_attempts(legacy_convert, data, legacy_detect(filename))
+        detected = audio_processor.detect_audio_format(data, filename)
+        sniffed = count_attempts(audio_processor.convert_with_fallbacks, data, detected)
+        totals["legacy"] += legacy[0]
+        totals["sniffed"] += sniffed[0]
+
+        print(f"{container:5s} as {filename:10s} legacy: {legacy[0]} attempts ok={legacy[1]!s:5s} "
+              f"{legacy[2] * 1000:7.1f} ms | sniffed({detected}): {sniffed[0]} attempts "
+              f"ok={sniffed[1]!s:5s} {sniffed[2] * 1000:7.1f} ms")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        sniff_audio_format(source)
+    sniff_us = (time.perf_counter() - start) / 10000 * 1e6
+    print("-" * 72)
+    print(f"decode attempts: legacy={totals['legacy']} sniffed={totals['sniffed']} "
+          f"avoided={totals['legacy'] - totals['sniffed']}; one sniff = {sniff_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
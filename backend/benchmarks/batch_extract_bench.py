@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for batch receipt extraction against a fake model.
+
+Compares one giant prompt (the old /extract behaviour) with micro-batched,
+concurrent extraction, and prints receipts/sec and per-item p50/p95.
+
+    python -m benchmarks.batch_extract_bench --receipts 200 --batch-size 4 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from app.functions import genai_client
+from app.functions.batch_extractor import batch_item_latency, extract_batch
+from app.functions.extraction_cache import extraction_cache
+from app.functions.extractor import extract_async
+from benchmarks.fakes import FakeGenaiClient
+
+RECEIPT = {"merchant_name": "Fake Mart", "purchase_date": "2024-03-01", "total_amount": 12.5,
+           "tax_amount": 1.0, "items": []}
+
+
+class BatchAwareFakeClient(FakeGenaiClient):
+    """Fake whose latency grows with the number of images and returns one receipt per image."""
+
+    def __init__(self, base_latency: float, per_image: float):
+        super().__init__(latency=0, setup_cost=0)
+        models = self.aio.models
+        original = models.generate_content_stream
+
+        async def generate_content_stream(model=None, contents=None, config=None):
+            images = len(contents[0].parts) - 1
+            models.latency = base_latency + per_image * images
+            models.chunks = [json.dumps([RECEIPT] * images if images > 1 else RECEIPT)]
+            return await original(model=model, contents=contents, config=config)
+
+        models.generate_content_stream = generate_content_stream
+
+
+async def run(args):
+    images = [f"receipt-{i}".encode() for i in range(args.receipts)]
+
+    extraction_cache.clear()
+    start = time.perf_counter()
+    await extract_async(images)
+    single = time.perf_counter() - start
+    print(f"single prompt     {args.receipts / single:8.1f} receipts/s  ({single:.2f} s total)")
+
+    extraction_cache.clear()
+    start = time.perf_counter()
+    count = 0
+    async for result in extract_batch(images, batch_size=args.batch_size, concurrency=args.concurrency):
+        count += result["status"] == "ok"
+    elapsed = time.perf_counter() - start
+    stats = batch_item_latency.snapshot()
+    print(f"micro-batched     {count / elapsed:8.1f} receipts/s  ({elapsed:.2f} s total)  "
+          f"p50={stats['p50_ms']} ms  p95={stats['p95_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--receipts", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-latency-ms", type=float, default=400.0)
+    parser.add_argument("--per-image-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    genai_client.set_client_factory(
+        lambda: BatchAwareFakeClient(args.base_latency_ms / 1000, args.per_image_ms / 1000)
+    )
+    print("=" * 70)
+    asyncio.run(run(args))
+    print("=" * 70)
+    genai_client.set_client_factory(None)
+
+
+if __name__ == "__main__":
+    main()
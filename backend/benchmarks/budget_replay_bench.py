@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark a year of receipts through the incremental budget tracker.
+
+Replays synthetic receipts for several users with monthly category goals, in
+date order. "recompute" is what the goal tracker prompt needs without
+precomputed aggregates: every receipt re-sums the user's history for the
+month and asks the model for an insight. "incremental" folds each receipt
+into running totals and only asks the model when a 50%/90% milestone fires.
+Model calls are counted and costed at --llm-ms each, not actually made.
+
+    python -m benchmarks.budget_replay_bench --users 20 --receipts-per-day 3 --llm-ms 800
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from app.functions.budget_tracker import BudgetTracker, categorize
+
+ITEMS = {
+    "Fresh Grocer": ["Milk", "Bread", "Eggs", "Apples", "Chicken", "Cheese", "Rice"],
+    "Starbucks": ["Latte", "Espresso", "Muffin"],
+    "City Fuel": ["Fuel"],
+    "Home Store": ["Soap", "Detergent", "Batteries"],
+}
+GOALS = {"groceries": 400, "dining": 120, "transport": 150, "household": 60}
+
+
+def year_of_receipts(users: int, per_day: float, seed: int = 0):
+    rng = random.Random(seed)
+    receipts = []
+    for day in range(365):
+        purchase_date = (date(2025, 1, 1) + timedelta(days=day)).isoformat()
+        for user in range(users):
+            for _ in range(int(per_day) + (rng.random() < per_day % 1)):
+                merchant = rng.choice(list(ITEMS))
+                items = [
+                    {"description": description, "quantity": 1, "price": round(rng.uniform(1, 12), 2)}
+                    for description in rng.sample(ITEMS[merchant], rng.randint(1, len(ITEMS[merchant])))
+                ]
+                receipts.append((f"user-{user}", {
+                    "merchant_name": merchant,
+                    "purchase_date": purchase_date,
+                    "total_amount": round(sum(item["price"] for item in items), 2),
+                    "items": items,
+                }))
+    return receipts
+
+
+def recompute(receipts):
+    """Per receipt: re-sum the month's history by category and call the model."""
+    history = defaultdict(list)
+    latencies = []
+    for user_id, receipt in receipts:
+        start = time.perf_counter()
+        history[user_id].append(receipt)
+        month = receipt["purchase_date"][:7]
+        totals = defaultdict(float)
+        for past in history[user_id]:
+            if past["purchase_date"][:7] == month:
+                for item in past["items"]:
+                    totals[categorize(item["description"], past["merchant_name"])] += item["price"]
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(receipts)
+
+
+def incremental(receipts, db_path: str):
+    calls = []
+    tracker = BudgetTracker(db_path, ledger=None, insight=lambda event: calls.append(event) and None,
+                            background=False)
+    for user_id in {user_id for user_id, _ in receipts}:
+        for category, amount in GOALS.items():
+            tracker.set_goal(user_id, category, amount)
+    latencies = []
+    for index, (user_id, receipt) in enumerate(receipts):
+        start = time.perf_counter()
+        tracker.on_receipt(user_id, f"r{index}", receipt)
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(calls)
+
+
+def report(label: str, latencies, calls: int, llm_ms: float) -> None:
+    ordered = sorted(latencies)
+    print(f"{label:<12} ingest p50={statistics.median(ordered) * 1e6:8.1f} us  "
+          f"p95={ordered[int(len(ordered) * 0.95)] * 1e6:8.1f} us  total={sum(ordered):6.2f} s  "
+          f"llm calls={calls:6d} (~{calls * llm_ms / 1000 / 3600:6.2f} h of model time)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--receipts-per-day", type=float, default=3)
+    parser.add_argument("--llm-ms", type=float, default=800, help="Cost of one goal tracker model call")
+    args = parser.parse_args()
+
+    receipts = year_of_receipts(args.users, args.receipts_per_day)
+    print("=" * 72)
+    print(f"{len(receipts)} receipts, {args.users} users, {len(GOALS)} monthly goals each")
+    report("recompute", *recompute(receipts), args.llm_ms)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        report("incremental", *incremental(receipts, os.path.join(temp_dir, "budget.db")), args.llm_ms)
+
+
+if __name__ == "__main__":
+    main()
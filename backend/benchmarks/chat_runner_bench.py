@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request chat setup: a new ADK Runner per request vs the shared one.
+
+Replays only the setup portion of `/api/chat` (get-or-create the session,
+then obtain a runner) for many concurrent requests over the real agent tree.
+No model is called, so the numbers isolate what building the runner on every
+request costs at a given request rate.
+
+    python -m benchmarks.chat_runner_bench --requests 500 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from google.adk.runners import Runner
+from app.agent import root_agent
+from app.api.chat import APP_NAME, get_runner
+from app.functions.session_store import session_service
+
+
+def per_request_runner() -> Runner:
+    return Runner(app_name=APP_NAME, agent=root_agent, session_service=session_service)
+
+
+async def setup(runner_factory) -> float:
+    start = time.perf_counter()
+    user_id, session_id = "bench", uuid.uuid4().hex
+    session = await session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    if not session:
+        await session_service.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    runner_factory()
+    return time.perf_counter() - start
+
+
+async def run(runner_factory, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await setup(runner_factory)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    for label, factory in (("per-request", per_request_runner), ("shared", get_runner)):
+        latencies, elapsed = asyncio.run(run(factory, args.requests, args.concurrency))
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{label:<12} setup p50={statistics.median(latencies) * 1000:7.3f} ms  "
+              f"p95={p95 * 1000:7.3f} ms  total={elapsed:6.3f} s")
+
+
+if __name__ == "__main__":
+    main()
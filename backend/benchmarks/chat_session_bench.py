@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-turn context size and session latency over a long conversation.
+
+Replays the session traffic the ADK runner generates per chat turn (load the
+session, append the user message, append the agent reply) for a single
+conversation, and reports how many events and characters of history each
+turn would send to the model and how long the session operations take.
+Compares the old unbounded in-memory service with the bounded memory and
+SQLite backends. No model is called.
+
+    python -m benchmarks.chat_session_bench --turns 200 --history-events 40
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+from google.genai import types
+from app.functions.session_store import BoundedSessionService
+
+APP_NAME = "bench"
+USER_ID = "user-1"
+
+
+def message(author: str, turn: int, size: int) -> Event:
+    role = "user" if author == "user" else "model"
+    text = f"turn {turn}: " + "lorem ipsum " * (size // 12)
+    return Event(
+        invocation_id=f"inv-{turn}",
+        author=author,
+        content=types.Content(role=role, parts=[types.Part(text=text)]),
+    )
+
+
+async def replay(service, turns: int, checkpoints):
+    session_id = uuid.uuid4().hex
+    await service.create_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+    rows = []
+    for turn in range(1, turns + 1):
+        start = time.perf_counter()
+        session = await service.get_session(app_name=APP_NAME, user_id=USER_ID, session_id=session_id)
+        load_ms = (time.perf_counter() - start) * 1000
+        # What the runner would put in the model request: the loaded history
+        context_chars = sum(
+            len(part.text or "") for event in session.events if event.content for part in event.content.parts
+        )
+        start = time.perf_counter()
+        await service.append_event(session=session, event=message("user", turn, 200))
+        await service.append_event(session=session, event=message("root_agent", turn, 600))
+        append_ms = (time.perf_counter() - start) * 1000
+        if turn in checkpoints:
+            rows.append((turn, len(session.events), context_chars, load_ms, append_ms))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--history-events", type=int, default=40)
+    args = parser.parse_args()
+
+    checkpoints = {1, args.turns // 4, args.turns // 2, 3 * args.turns // 4, args.turns}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        services = {
+            "unbounded memory": InMemorySessionService(),
+            "bounded memory": BoundedSessionService(InMemorySessionService(), args.history_events),
+            "bounded sqlite": BoundedSessionService(
+                DatabaseSessionService(db_url=f"sqlite:///{os.path.join(temp_dir, 'sessions.db')}"),
+                args.history_events,
+            ),
+        }
+        for label, service in services.items():
+            print("=" * 72)
+            print(label)
+            for turn, events, chars, load_ms, append_ms in asyncio.run(replay(service, args.turns, checkpoints)):
+                print(f"  turn {turn:4d}  events={events:4d}  context={chars:7d} chars  "
+                      f"load={load_ms:6.2f} ms  append={append_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
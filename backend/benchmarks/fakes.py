@@ -0,0 +1,187 @@
+"""
+Local stand-ins for the remote services used by the backend.
+
+They mimic just enough of the client surfaces the app touches so that
+benchmarks can run without network access or credentials.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+
+class FakeGenaiModels:
+    """Mimics `client.models` with a fixed per-call latency."""
+
+    def __init__(self, latency: float = 0.2, chunks: Optional[List[str]] = None):
+        self.latency = latency
+        self.chunks = chunks or ['{"merchant_name": "Fake Mart", ', '"total_amount": 12.5}']
+        self.calls = 0
+
+    def generate_content_stream(self, model=None, contents=None, config=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        for text in self.chunks:
+            yield SimpleNamespace(text=text)
+
+    def generate_content(self, model=None, contents=None, config=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return SimpleNamespace(text="".join(self.chunks))
+
+
+class FakeAsyncGenaiModels:
+    """Mimics `client.aio.models` with a fixed per-call latency."""
+
+    def __init__(self, latency: float = 0.2, chunks: Optional[List[str]] = None):
+        self.latency = latency
+        self.chunks = chunks or ['{"merchant_name": "Fake Mart", ', '"total_amount": 12.5}']
+        self.calls = 0
+
+    async def generate_content_stream(self, model=None, contents=None, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        async def _stream():
+            for text in self.chunks:
+                yield SimpleNamespace(text=text)
+
+        return _stream()
+
+    async def generate_content(self, model=None, contents=None, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text="".join(self.chunks))
+
+
+class FakeGenaiClient:
+    """
+    Stand-in for `genai.Client`.
+
+    Args:
+        latency: Simulated model round trip in seconds.
+        setup_cost: Simulated client construction cost (credential discovery,
+            connection pool setup) in seconds.
+        chunks: Text chunks returned by streaming calls.
+    """
+
+    def __init__(self, latency: float = 0.2, setup_cost: float = 0.03, chunks: Optional[List[str]] = None):
+        time.sleep(setup_cost)
+        self.models = FakeGenaiModels(latency, chunks)
+        self.aio = SimpleNamespace(models=FakeAsyncGenaiModels(latency, chunks))
+
+
+class FakeRecognizer:
+    """
+    Stand-in for Speech-to-Text recognition of 16 kHz mono PCM segments.
+
+    Latency is `base_latency` plus `realtime_factor` times the segment duration,
+    roughly how the real recognizer scales.
+    """
+
+    def __init__(self, base_latency: float = 0.3, realtime_factor: float = 0.05):
+        self.base_latency = base_latency
+        self.realtime_factor = realtime_factor
+        self.calls = 0
+
+    def __call__(self, pcm: bytes, language_code: str = "en-US") -> str:
+        self.calls += 1
+        seconds = len(pcm) / 32000
+        time.sleep(self.base_latency + self.realtime_factor * seconds)
+        return f"[{seconds:.1f}s of speech]"
+
+
+class FakeSpeechClient:
+    """
+    Stand-in for `speech.SpeechClient` covering `recognize()` and
+    `streaming_recognize()`; the audio is consumed but not inspected.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    @staticmethod
+    def _response(seconds: float):
+        alternative = SimpleNamespace(transcript=f"[{seconds:.1f}s of speech]")
+        return SimpleNamespace(results=[SimpleNamespace(is_final=True, alternatives=[alternative])])
+
+    def recognize(self, config=None, audio=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._response(len(audio.content) / 32000)
+
+    def streaming_recognize(self, config=None, requests=None):
+        self.calls += 1
+        received = sum(len(request.audio_content) for request in requests)
+        time.sleep(self.latency)
+        yield self._response(received / 32000)
+
+
+class FakeRag:
+    """
+    Stand-in for the `vertexai.preview.rag` module used by the corpus helpers.
+
+    Args:
+        list_latency: Round trip per page of `list_corpora()`.
+        upload_latency: Round trip of `upload_file()`.
+        other_corpora: Corpora listed before ours, to make the lookup page.
+        page_size: Corpora returned per listing page.
+    """
+
+    def __init__(self, list_latency: float = 0.15, upload_latency: float = 0.2,
+                 other_corpora: int = 0, page_size: int = 100):
+        self.list_latency = list_latency
+        self.upload_latency = upload_latency
+        self.page_size = page_size
+        self.corpora = [
+            SimpleNamespace(name=f"projects/p/locations/l/ragCorpora/{i}", display_name=f"corpus-{i}")
+            for i in range(other_corpora)
+        ]
+        self.created = other_corpora
+        self.list_calls = 0
+        self.uploads = 0
+
+    @staticmethod
+    def EmbeddingModelConfig(publisher_model=None):
+        return SimpleNamespace(publisher_model=publisher_model)
+
+    def list_corpora(self):
+        self.list_calls += 1
+        for start in range(0, max(len(self.corpora), 1), self.page_size):
+            time.sleep(self.list_latency)
+            yield from self.corpora[start:start + self.page_size]
+
+    def create_corpus(self, display_name=None, description=None, embedding_model_config=None):
+        time.sleep(self.list_latency)
+        corpus = SimpleNamespace(name=f"projects/p/locations/l/ragCorpora/{self.created}",
+                                 display_name=display_name)
+        self.created += 1
+        self.corpora.append(corpus)
+        return corpus
+
+    def delete_corpus(self, name=None):
+        self.corpora = [corpus for corpus in self.corpora if corpus.name != name]
+
+    def upload_file(self, corpus_name=None, path=None, display_name=None, description=None):
+        time.sleep(self.upload_latency)
+        if not any(corpus.name == corpus_name for corpus in self.corpora):
+            raise ValueError(f"RagCorpus '{corpus_name}' is not found")
+        self.uploads += 1
+        return SimpleNamespace(name=f"{corpus_name}/ragFiles/{self.uploads}", display_name=display_name)
+
+    def list_files(self, corpus_name=None):
+        return []
+
+
+class FakeVertexAI:
+    """Stand-in for the `vertexai` module; `init()` costs `init_latency` seconds."""
+
+    def __init__(self, init_latency: float = 0.05):
+        self.init_latency = init_latency
+        self.init_calls = 0
+
+    def init(self, project=None, location=None, credentials=None):
+        self.init_calls += 1
+        time.sleep(self.init_latency)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold vs warm Gemini client latency for `generate()` and `extract()`.
+
+Uses a fake client so it runs offline. "Cold" rebuilds the client before every
+call (the old per-request behaviour); "warm" reuses the pooled client.
+
+    python -m benchmarks.genai_client_bench --calls 50 --setup-ms 40 --latency-ms 5
+"""
+
+import argparse
+import statistics
+import time
+from app.functions import genai_client
+from app.functions.gemini import generate
+from app.functions.extractor import extract
+from benchmarks.fakes import FakeGenaiClient
+
+
+def run(label: str, fn, calls: int, cold: bool) -> None:
+    timings = []
+    for _ in range(calls):
+        if cold:
+            genai_client.reset_client()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<18} mean={statistics.mean(timings):7.2f} ms  "
+          f"p50={statistics.median(timings):7.2f} ms  max={max(timings):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--setup-ms", type=float, default=40.0, help="simulated client construction cost")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated model latency")
+    args = parser.parse_args()
+
+    genai_client.set_client_factory(
+        lambda: FakeGenaiClient(latency=args.latency_ms / 1000, setup_cost=args.setup_ms / 1000)
+    )
+    image = b"\xff\xd8\xff" + b"\x00" * 1024
+
+    print("=" * 60)
+    for cold in (True, False):
+        mode = "cold" if cold else "warm"
+        run(f"generate ({mode})", lambda: generate("hello"), args.calls, cold)
+        run(f"extract ({mode})", lambda: extract([image]), args.calls, cold)
+    print("=" * 60)
+    genai_client.set_client_factory(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark receipt image preprocessing: bytes saved and latency per size class.
+
+Generates synthetic receipt-like photos (text on a noisy background, with EXIF)
+as JPEG and PNG at several resolutions and runs them through
+`preprocess_image()`.
+
+    python -m benchmarks.image_preprocess_bench --repeat 5
+"""
+
+import argparse
+import io
+import random
+import statistics
+import time
+from PIL import Image, ImageDraw
+from app.functions.image_preprocessor import preprocess_image
+
+SIZE_CLASSES = {
+    "small (640x480)": (640, 480),
+    "hd (1920x1080)": (1920, 1080),
+    "12MP (4032x3024)": (4032, 3024),
+}
+
+
+def synthetic_receipt(size, fmt: str) -> bytes:
+    width, height = size
+    img = Image.effect_noise(size, 24).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    rng = random.Random(0)
+    for y in range(0, height, max(12, height // 60)):
+        draw.text((width // 10, y), f"ITEM {rng.randint(1, 999):03d} ....... {rng.uniform(1, 99):6.2f}", fill=(20, 20, 20))
+    exif = Image.Exif()
+    exif[0x010F] = "SyntheticPhone"  # Make
+    exif[0x0112] = 1  # Orientation
+    output = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(output, format="JPEG", quality=95, exif=exif)
+    else:
+        img.save(output, format=fmt)
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 86)
+    print(f"{'size class':<18} {'fmt':<5} {'in KiB':>9} {'out KiB':>9} {'saved':>7} {'p50 ms':>9} {'max ms':>9}")
+    for label, size in SIZE_CLASSES.items():
+        for fmt in ("JPEG", "PNG"):
+            original = synthetic_receipt(size, fmt)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                processed, _ = preprocess_image(original)
+                timings.append((time.perf_counter() - start) * 1000)
+            saved = 1 - len(processed) / len(original)
+            print(f"{label:<18} {fmt:<5} {len(original) / 1024:9.1f} {len(processed) / 1024:9.1f} "
+                  f"{saved:7.1%} {statistics.median(timings):9.1f} {max(timings):9.1f}")
+    print("=" * 86)
+
+
+if __name__ == "__main__":
+    main()
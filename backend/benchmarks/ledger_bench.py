@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark receipt ledger ingestion and spending-query latency.
+
+Fills a fresh ledger with synthetic receipts spread over many users, a year
+of dates and a few hundred merchants, then times the aggregate queries the
+spending agent issues (period totals, merchant and item filters, monthly
+and per-merchant breakdowns) for one user.
+
+    python -m benchmarks.ledger_bench --receipts 200000 --users 50 --queries 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from app.functions.receipt_ledger import ReceiptLedger
+
+ITEMS = ["milk", "bread", "eggs", "coffee", "latte", "apples", "rice", "chicken", "soap", "batteries"]
+
+
+def synthetic_receipt(rng: random.Random, merchants: int) -> dict:
+    items = [
+        {"description": rng.choice(ITEMS).title(), "quantity": rng.randint(1, 3), "price": round(rng.uniform(1, 20), 2)}
+        for _ in range(rng.randint(1, 8))
+    ]
+    return {
+        "merchant_name": f"Merchant {rng.randrange(merchants)}",
+        "purchase_date": (date(2025, 1, 1) + timedelta(days=rng.randrange(365))).isoformat(),
+        "total_amount": round(sum(item["price"] for item in items), 2),
+        "tax_amount": None,
+        "items": items,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--receipts", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--merchants", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger = ReceiptLedger(os.path.join(temp_dir, "ledger.db"))
+        start = time.perf_counter()
+        for user in range(args.users):
+            batch = [synthetic_receipt(rng, args.merchants) for _ in range(args.receipts // args.users)]
+            ledger.record(batch, source="bench", user_id=f"user-{user}")
+        elapsed = time.perf_counter() - start
+        print("=" * 72)
+        print(f"recorded {args.receipts} receipts in {elapsed:.1f} s ({args.receipts / elapsed:.0f}/s)")
+
+        queries = {
+            "month total": dict(start_date="2025-03-01", end_date="2025-03-31"),
+            "merchant": dict(merchant="Merchant 42"),
+            "item": dict(item="milk", start_date="2025-01-01", end_date="2025-06-30"),
+            "by month": dict(group_by="month"),
+            "by merchant": dict(group_by="merchant", start_date="2025-07-01", end_date="2025-09-30"),
+        }
+        for label, filters in queries.items():
+            latencies = []
+            for index in range(args.queries):
+                start = time.perf_counter()
+                result = ledger.spending(f"user-{index % args.users}", **filters)
+                latencies.append(time.perf_counter() - start)
+            ordered = sorted(latencies)
+            print(f"{label:<12} p50={statistics.median(ordered) * 1000:7.2f} ms  "
+                  f"p95={ordered[int(len(ordered) * 0.95)] * 1000:7.2f} ms  "
+                  f"(last: total={result['total']} receipts={result['receipts']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load test for /gemini and /extract against a fake model (no network needed).
+
+Compares the old sync handlers (which hold a Starlette threadpool worker for
+the whole model round trip) with the async handlers in app.main. Requests are
+driven in-process through httpx's ASGI transport (`pip install httpx`).
+
+    python -m benchmarks.load_test --clients 200 --requests 1000 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+import httpx
+from fastapi import FastAPI, File, Form, UploadFile
+from app.functions import genai_client
+from app.functions.concurrency import gemini_limiter
+from app.functions.gemini import generate
+from app.functions.extractor import extract
+from app.functions.extraction_cache import extraction_cache
+from app.main import app as async_app
+from benchmarks.fakes import FakeGenaiClient
+
+sync_app = FastAPI()
+
+
+@sync_app.post("/gemini")
+def sync_gemini(user_prompt: str = Form(...), images: List[UploadFile] = File(None)):
+    image_bytes_list = [image.file.read() for image in images] if images else []
+    return {"response": generate(user_prompt, image_bytes_list)}
+
+
+@sync_app.post("/extract")
+def sync_extract(images: List[UploadFile] = File(None)):
+    image_bytes_list = [image.file.read() for image in images] if images else []
+    return {"response": extract(image_bytes_list)}
+
+
+async def drive(app, path: str, clients: int, total: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    statuses = {}
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def worker():
+            for i in counter:
+                if path == "/gemini":
+                    kwargs = {"data": {"user_prompt": f"hello {i}"}}
+                else:
+                    # Unique image per request so the extraction cache never hits
+                    kwargs = {"files": {"images": (f"r{i}.jpg", f"receipt-{i}".encode(), "image/jpeg")}}
+                start = time.perf_counter()
+                response = await client.post(path, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=1000, help="total requests per run")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="simulated model latency")
+    parser.add_argument("--limit", type=int, default=256, help="GEMINI_MAX_CONCURRENCY for the async run")
+    args = parser.parse_args()
+
+    genai_client.set_client_factory(lambda: FakeGenaiClient(latency=args.latency_ms / 1000, setup_cost=0))
+    gemini_limiter.max_concurrency = args.limit
+
+    print("=" * 70)
+    for path in ("/gemini", "/extract"):
+        for label, app in (("sync (before)", sync_app), ("async (after)", async_app)):
+            extraction_cache.clear()
+            result = asyncio.run(drive(app, path, args.clients, args.requests))
+            print(f"{path:<9} {label:<14} {result['rps']:8.1f} req/s  "
+                  f"p50={result['p50_ms']:7.1f} ms  p95={result['p95_ms']:7.1f} ms  {result['statuses']}")
+    print("=" * 70)
+    genai_client.set_client_factory(None)
+
+
+if __name__ == "__main__":
+    main()
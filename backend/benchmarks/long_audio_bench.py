@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark long-audio transcription: segment-level parallelism vs one serial pass.
+
+Synthesises "dictation" (noise bursts separated by pauses) at several lengths,
+splits it at silences and recognizes the segments with a fake recognizer,
+serially and on the bounded pool.
+
+    python -m benchmarks.long_audio_bench --minutes 2 5 10 --workers 4
+"""
+
+import argparse
+import time
+import numpy as np
+from app.functions import long_audio
+from app.functions.long_audio import find_segments, transcribe_long_audio
+from benchmarks.fakes import FakeRecognizer
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_dictation(minutes: float, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = int(minutes * 60 * SAMPLE_RATE)
+    length = 0
+    while length < total:
+        word = rng.normal(0, 3000, int(rng.uniform(0.2, 0.6) * SAMPLE_RATE))
+        gap = rng.normal(0, 30, int(rng.choice([0.08, 0.15, 0.6]) * SAMPLE_RATE))
+        pieces.extend([word, gap])
+        length += len(word) + len(gap)
+    return np.clip(np.concatenate(pieces)[:total], -32768, 32767).astype("<i2").tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--base-latency-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    print("=" * 72)
+    for minutes in args.minutes:
+        pcm = synthetic_dictation(minutes)
+        start = time.perf_counter()
+        segments = find_segments(pcm)
+        vad_ms = (time.perf_counter() - start) * 1000
+        recognizer = FakeRecognizer(base_latency=args.base_latency_ms / 1000)
+
+        results = {}
+        for workers in (1, args.workers):
+            long_audio._executor = None
+            long_audio.LONG_AUDIO_CONCURRENCY = workers
+            start = time.perf_counter()
+            transcribe_long_audio(pcm, recognizer=recognizer)
+            results[workers] = time.perf_counter() - start
+
+        print(f"{minutes:5.1f} min  segments={len(segments):3d}  VAD={vad_ms:7.1f} ms  "
+              f"serial={results[1]:6.2f} s  parallel({args.workers})={results[args.workers]:6.2f} s  "
+              f"speedup={results[1] / results[args.workers]:4.1f}x")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
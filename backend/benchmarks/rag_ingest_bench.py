@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark receipt archiving: synchronous per-receipt upload vs the write-behind queue.
+
+The RAG service is a local fake with a configurable upload round trip.
+"sync" writes each receipt to a temp file and uploads it before returning
+(what the agent tool used to do); "queued" enqueues receipts into an
+IngestionQueue and measures both what the agent waits for and how long the
+queue takes to drain. `--fail-first` makes the first N shard uploads fail to
+exercise the retry path.
+
+    python -m benchmarks.rag_ingest_bench --receipts 200 --threads 8 --batch-size 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+from app.rag_test import ingestion_queue as queue_module
+from app.rag_test import prepare_corpus_and_data as corpus_module
+from app.rag_test.ingestion_queue import IngestionQueue
+from benchmarks.fakes import FakeRag, FakeVertexAI
+
+
+def receipt(index: int) -> str:
+    return json.dumps({
+        "merchant_name": f"Store {index % 37}",
+        "purchase_date": f"2025-{index % 12 + 1:02d}-{index % 28 + 1:02d}",
+        "total_amount": round(3.5 + index * 1.25, 2),
+        "items": [{"description": "item", "quantity": 1, "price": 3.5}],
+    })
+
+
+def sync_archive(text: str) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "extracted_data.txt")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        corpus_module.upload_user_documents_to_corpus([file_path])
+
+
+def timed(fn, texts, threads: int):
+    latencies = []
+
+    def one(text: str):
+        start = time.perf_counter()
+        fn(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, texts))
+    return sorted(latencies), time.perf_counter() - start
+
+
+def report(label: str, latencies, elapsed: float) -> None:
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<8} agent wait p50={statistics.median(latencies) * 1000:8.2f} ms  "
+          f"p95={p95 * 1000:8.2f} ms  enqueue phase={elapsed:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--receipts", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--flush-seconds", type=float, default=1.0)
+    parser.add_argument("--upload-ms", type=float, default=300, help="Round trip of one upload")
+    parser.add_argument("--fail-first", type=int, default=0, help="Shard uploads that fail before succeeding")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus_module.ENV_FILE_PATH = os.path.join(temp_dir, ".env")
+        corpus_module.default = lambda: (None, None)
+        corpus_module.vertexai = FakeVertexAI(0)
+        texts = [receipt(index) for index in range(args.receipts)]
+        print("=" * 72)
+
+        fake_rag = corpus_module.rag = FakeRag(list_latency=0, upload_latency=args.upload_ms / 1000)
+        corpus_module.reset_corpus_cache()
+        report("sync", *timed(sync_archive, texts, args.threads))
+        print(f"         uploads={fake_rag.uploads}")
+
+        fake_rag = corpus_module.rag = FakeRag(list_latency=0, upload_latency=args.upload_ms / 1000)
+        corpus_module.reset_corpus_cache()
+        failures = {"left": args.fail_first}
+
+        def flaky_uploader(shard_path: str):
+            if failures["left"] > 0:
+                failures["left"] -= 1
+                raise RuntimeError("simulated ingestion failure")
+            return queue_module._default_uploader(shard_path)
+
+        queue_module.RETRY_BACKOFF_SECONDS = 0.05
+        queue = IngestionQueue(flaky_uploader, batch_size=args.batch_size, flush_interval=args.flush_seconds,
+                               spool_dir=os.path.join(temp_dir, "spool"))
+        report("queued", *timed(queue.enqueue, texts, args.threads))
+        start = time.perf_counter()
+        drained = queue.flush(timeout=120)
+        print(f"         drain={time.perf_counter() - start:6.2f} s  drained={drained}  uploads={fake_rag.uploads}")
+        queue.shutdown()
+        print(queue.stats())
+
+
+if __name__ == "__main__":
+    main()
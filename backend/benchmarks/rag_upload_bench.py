@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-upload overhead of archiving receipts into the RAG corpus.
+
+Vertex AI init, credential discovery and the RAG service are replaced by
+local fakes with configurable round trips. "per-call" replays the old upload
+path (init, page through list_corpora(), rewrite .env, upload) for every
+receipt; "memoized" goes through upload_user_documents_to_corpus(), which
+resolves the corpus once. Halfway through the memoized run the corpus is
+deleted to exercise the refresh path.
+
+    python -m benchmarks.rag_upload_bench --uploads 50 --threads 4 --other-corpora 250
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import set_key
+
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+from app.rag_test import prepare_corpus_and_data as corpus_module
+from benchmarks.fakes import FakeRag, FakeVertexAI
+
+
+def per_call_upload(file_path: str):
+    credentials, _ = corpus_module.default()
+    corpus_module.vertexai.init(project=corpus_module.PROJECT_ID, location=corpus_module.LOCATION,
+                                credentials=credentials)
+    corpus = corpus_module.create_or_get_corpus()
+    set_key(corpus_module.ENV_FILE_PATH, "RAG_CORPUS", corpus.name)
+    display_name = os.path.basename(file_path)
+    corpus_module.rag.upload_file(corpus_name=corpus.name, path=file_path, display_name=display_name)
+    return [display_name]
+
+
+def run(label: str, fake_rag: FakeRag, file_path: str, uploads: int, threads: int,
+        per_call: bool, delete_at: int = -1):
+    latencies = []
+
+    def one(index: int):
+        if index == delete_at:
+            fake_rag.delete_corpus(corpus_module.get_corpus().name)
+        start = time.perf_counter()
+        if per_call:
+            uploaded = per_call_upload(file_path)
+        else:
+            uploaded = corpus_module.upload_user_documents_to_corpus([file_path])
+        latencies.append(time.perf_counter() - start)
+        return uploaded
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        failed = sum(1 for uploaded in pool.map(one, range(uploads)) if not uploaded)
+    elapsed = time.perf_counter() - start
+    overhead = statistics.median(latencies) - fake_rag.upload_latency
+    print(f"{label:<9} p50={statistics.median(latencies) * 1000:7.1f} ms  "
+          f"overhead={overhead * 1000:7.1f} ms/upload  total={elapsed:6.2f} s  "
+          f"list_corpora={fake_rag.list_calls:3d}  failed={failed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--other-corpora", type=int, default=250)
+    parser.add_argument("--list-ms", type=float, default=150, help="Round trip per list_corpora page")
+    parser.add_argument("--upload-ms", type=float, default=200, help="Round trip of upload_file")
+    parser.add_argument("--init-ms", type=float, default=50, help="vertexai.init plus credential discovery")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "receipt.txt")
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("Fake Mart, total 12.50")
+        corpus_module.ENV_FILE_PATH = os.path.join(temp_dir, ".env")
+        corpus_module.default = lambda: (None, None)
+        print("=" * 72)
+        for label, per_call in (("per-call", True), ("memoized", False)):
+            fake_rag = FakeRag(args.list_ms / 1000, args.upload_ms / 1000, args.other_corpora)
+            corpus_module.rag = fake_rag
+            corpus_module.vertexai = FakeVertexAI(args.init_ms / 1000)
+            corpus_module.reset_corpus_cache()
+            os.environ.pop("RAG_CORPUS", None)
+            run(label, fake_rag, file_path, args.uploads, args.threads, per_call,
+                delete_at=-1 if per_call else args.uploads // 2)
+        print(corpus_module.corpus_counters.snapshot())
+
+
+if __name__ == "__main__":
+    main()
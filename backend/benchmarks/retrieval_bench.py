@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark recall@10 and query latency of the local vector index vs the remote path.
+
+Builds a local index from synthetic clustered embeddings (text-embedding-004
+sized by default), inserting them incrementally in ingestion-sized batches,
+then runs held-out queries. Ground truth is an exact scan of the same
+vectors. The remote path is modelled as exact retrieval plus the Vertex AI
+RAG round trip given by --remote-ms (measure it against your corpus and pass
+it in); the local rows add --embed-ms for the query embedding call the local
+backend still makes.
+
+    python -m benchmarks.retrieval_bench --docs 50000 --queries 200 --nprobe 1 4 8 16 32
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.rag_test.vector_index import VectorIndex
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, noise: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(0).normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=n)] + noise * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=1.0, help="Spread of documents around their topic")
+    parser.add_argument("--batch", type=int, default=50, help="Documents per incremental insert")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--remote-ms", type=float, default=350, help="Vertex AI RAG retrieval round trip")
+    parser.add_argument("--embed-ms", type=float, default=60, help="Query embedding round trip")
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.docs, args.dim, args.clusters, args.noise, seed=1)
+    queries = clustered_vectors(args.queries, args.dim, args.clusters, args.noise, seed=2)
+
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(path, dim=args.dim)
+        start = time.perf_counter()
+        for offset in range(0, args.docs, args.batch):
+            ids = [str(i) for i in range(offset, min(offset + args.batch, args.docs))]
+            index.add(ids, ids, vectors[offset:offset + args.batch])
+        build = time.perf_counter() - start
+        print("=" * 72)
+        print(f"indexed {len(index)} vectors in {build:.1f} s ({len(index) / build:.0f}/s), {index.stats()}")
+
+        truth, exact_latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            hits = index.search(query, k=10, exact=True)
+            exact_latencies.append(time.perf_counter() - start)
+            truth.append({record["id"] for _, record in hits})
+
+        def row(label: str, recall: float, latencies, extra_ms: float) -> None:
+            print(f"{label:<16} recall@10={recall:5.3f}  search p50={statistics.median(latencies) * 1000:7.2f} ms  "
+                  f"p95={percentile(latencies, 0.95) * 1000:7.2f} ms  "
+                  f"end-to-end p50={statistics.median(latencies) * 1000 + extra_ms:7.1f} ms")
+
+        row("remote", 1.0, [0.0], args.remote_ms)
+        row("local exact", 1.0, exact_latencies, args.embed_ms)
+        for nprobe in args.nprobe:
+            latencies, recalls = [], []
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                hits = index.search(query, k=10, nprobe=nprobe)
+                latencies.append(time.perf_counter() - start)
+                recalls.append(len({record["id"] for _, record in hits} & expected) / 10)
+            row(f"local nprobe={nprobe}", float(np.mean(recalls)), latencies, args.embed_ms)
+
+        start = time.perf_counter()
+        reopened = VectorIndex(path)
+        print(f"reopen: {(time.perf_counter() - start) * 1000:.1f} ms for {len(reopened)} vectors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for Google Wallet pass signing.
+
+Creates a throwaway service-account key and measures passes/sec for:
+the old path (parse the key file twice per pass), cached single-pass signing,
+and bulk signing (one JWT for N passes, or N JWTs in one call).
+
+    python -m benchmarks.wallet_signing_bench --passes 200 --bulk 20
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.auth import crypt, jwt
+from google.oauth2 import service_account
+from app.wallet_service import wallet_service
+
+RECEIPT = {
+    "merchant_name": "Fake Mart",
+    "purchase_date": "2024-03-01",
+    "total_amount": 42.5,
+    "tax_amount": 3.1,
+    "items": [{"description": "Milk", "quantity": 2, "price": 1.99}],
+}
+
+
+def write_service_account(path: str) -> None:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "type": "service_account",
+            "project_id": "bench",
+            "private_key_id": "bench",
+            "private_key": pem,
+            "client_email": "bench@bench.iam.gserviceaccount.com",
+            "client_id": "1",
+            "token_uri": "https://oauth2.googleapis.com/token",
+        }, f)
+
+
+def legacy_sign(receipt: dict) -> str:
+    """The pre-cache implementation: two key-file parses per pass."""
+    pass_object = wallet_service.build_receipt_pass_object(receipt)
+    creds = service_account.Credentials.from_service_account_file(
+        wallet_service.SERVICE_ACCOUNT_FILE,
+        scopes=['https://www.googleapis.com/auth/wallet_object.issuer'],
+    )
+    claims = {
+        'iss': creds.service_account_email,
+        'aud': 'google',
+        'typ': 'savetowallet',
+        'payload': {'genericObjects': [pass_object]},
+    }
+    signer = crypt.RSASigner.from_service_account_file(wallet_service.SERVICE_ACCOUNT_FILE)
+    return jwt.encode(signer, claims).decode('utf-8')
+
+
+def report(label: str, passes: int, elapsed: float) -> None:
+    print(f"{label:<28} {passes / elapsed:9.1f} passes/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--passes", type=int, default=200)
+    parser.add_argument("--bulk", type=int, default=20, help="passes per bulk call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        wallet_service.SERVICE_ACCOUNT_FILE = os.path.join(temp_dir, "sa.json")
+        write_service_account(wallet_service.SERVICE_ACCOUNT_FILE)
+        print("=" * 50)
+
+        start = time.perf_counter()
+        for _ in range(args.passes):
+            legacy_sign(RECEIPT)
+        report("single (uncached, before)", args.passes, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(args.passes):
+            assert wallet_service.create_receipt_pass_jwt(RECEIPT)
+        report("single (cached)", args.passes, time.perf_counter() - start)
+
+        batches = max(1, args.passes // args.bulk)
+        for combine, label in ((True, "bulk, one JWT per call"), (False, "bulk, one JWT per pass")):
+            start = time.perf_counter()
+            for _ in range(batches):
+                assert wallet_service.create_receipt_pass_jwts([RECEIPT] * args.bulk, combine=combine)
+            report(label, batches * args.bulk, time.perf_counter() - start)
+        print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
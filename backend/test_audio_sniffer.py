@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for magic-byte audio format detection.
+"""
+
+import struct
+from app.functions.audio_sniffer import sniff_audio_format
+from app.functions.ffmpeg_pipe import wav_header
+
+
+def test_wav_header_reports_linear16_and_rate():
+    info = sniff_audio_format(wav_header(3200, sample_rate=8000, channels=2) + b"\0" * 3200)
+    assert info == ("wav", "LINEAR16", 8000, 2, 0.1)
+
+
+def test_flac_streaminfo_is_parsed():
+    # STREAMINFO: 44.1 kHz, stereo, 16 bits per sample, 88200 samples
+    streaminfo = (b"\x10\x00\x10\x00" + b"\0" * 6 + bytes([0x0A, 0xC4, 0x42, 0xF0])
+                  + struct.pack(">I", 88200) + b"\0" * 16)
+    info = sniff_audio_format(b"fLaC" + b"\x80\x00\x00\x22" + streaminfo)
+    assert info == ("flac", "FLAC", 44100, 2, 2.0)
+
+
+def test_ogg_opus_and_webm_opus():
+    opus_head = b"OpusHead" + bytes([1, 1]) + b"\0\0" + struct.pack("<I", 16000) + b"\0\0\0"
+    page = b"OggS" + b"\0" * 22 + bytes([1, len(opus_head)]) + opus_head
+    assert sniff_audio_format(page) == ("ogg", "OGG_OPUS", 16000, 1, None)
+    webm = b"\x1a\x45\xdf\xa3" + b"\0" * 40 + b"\x86\x86A_OPUS" + b"\0" * 20
+    assert sniff_audio_format(webm).encoding == "WEBM_OPUS"
+
+
+def test_mp3_m4a_and_unknown():
+    assert sniff_audio_format(b"ID3\x04" + b"\0" * 20).format == "mp3"
+    assert sniff_audio_format(b"\xff\xfb\x90\x64" + b"\0" * 20).format == "mp3"
+    assert sniff_audio_format(b"\xff\xf1\x50\x80" + b"\0" * 20).format == "aac"
+    assert sniff_audio_format(b"\0\0\0\x20ftypM4A " + b"\0" * 20).format == "m4a"
+    assert sniff_audio_format(b"fake_audio_data") is None
+
+
+if __name__ == "__main__":
+    test_wav_header_reports_linear16_and_rate()
+    test_flac_streaminfo_is_parsed()
+    test_ogg_opus_and_webm_opus()
+    test_mp3_m4a_and_unknown()
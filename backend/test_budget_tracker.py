@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental budget aggregation and milestone detection.
+"""
+
+import os
+import tempfile
+from app.functions.budget_tracker import BudgetTracker, categorize
+from app.functions.receipt_ledger import ReceiptLedger
+
+
+def grocery_receipt(day: int, amount: float, item: str = "Milk") -> dict:
+    return {"merchant_name": "Fresh Grocer", "purchase_date": f"2025-03-{day:02d}", "total_amount": amount,
+            "items": [{"description": item, "quantity": 1, "price": amount}]}
+
+
+def test_categorizes_items_before_merchants():
+    assert categorize("Whole Milk", "Shell Station") == "groceries"
+    assert categorize("Unknown thing", "Starbucks #12") == "dining"
+    assert categorize(None, None) == "other"
+
+
+def test_milestones_fire_once_and_only_they_call_the_model():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        calls = []
+        tracker = BudgetTracker(os.path.join(temp_dir, "budget.db"), ledger=None,
+                                insight=lambda event: calls.append(event) or "Half the budget is gone.",
+                                background=False)
+        tracker.set_goal("alice", "groceries", 100)
+
+        tracker.on_receipt("alice", "r1", grocery_receipt(1, 30))
+        assert calls == []
+        tracker.on_receipt("alice", "r2", grocery_receipt(2, 25))
+        assert [event["goal"]["milestoneCrossed"] for event in calls] == [0.5]
+        assert calls[0]["goal"]["currentSpending"] == 55
+        tracker.on_receipt("alice", "r3", grocery_receipt(3, 5))
+        # Jumping past 90% in one receipt reports the highest milestone crossed
+        tracker.on_receipt("alice", "r4", grocery_receipt(4, 40, "Cheese"))
+        assert [event["goal"]["milestoneCrossed"] for event in calls] == [0.5, 0.9]
+        assert len(calls) == 2
+        assert tracker.insights("alice")[0]["headline"] == "Half the budget is gone."
+
+        # Fired milestones survive a restart and are not repeated
+        reopened = BudgetTracker(os.path.join(temp_dir, "budget.db"), ledger=None,
+                                 insight=lambda event: calls.append(event), background=False)
+        assert reopened.goal_status("alice", "groceries", "2025-03")["milestonesReached"] == [0.5, 0.9]
+
+
+def test_rebuilds_aggregates_from_the_ledger_and_flags_price_jumps():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger = ReceiptLedger(os.path.join(temp_dir, "ledger.db"))
+        for day in range(1, 5):
+            ledger.record(grocery_receipt(day, 4), user_id="bob")
+        events = []
+        tracker = BudgetTracker(os.path.join(temp_dir, "budget.db"), ledger=ledger,
+                                insight=lambda event: events.append(event), background=False)
+        ledger.add_listener(tracker.on_receipt)
+        tracker.set_goal("bob", "groceries", 40)
+        assert tracker.goal_status("bob", "groceries", "2025-03")["currentSpending"] == 16
+
+        ledger.record(grocery_receipt(5, 6), user_id="bob")
+        assert tracker.goal_status("bob", "groceries", "2025-03")["currentSpending"] == 22
+        (event,) = events
+        assert event["priceHistory"][0]["aboveUsualPrice"]
+        assert event["priceHistory"][0]["previousPurchases"] == 4
+
+
+def test_receipt_counted_once_when_a_rebuild_runs_before_the_listener():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger = ReceiptLedger(os.path.join(temp_dir, "ledger.db"))
+        tracker = BudgetTracker(os.path.join(temp_dir, "budget.db"), ledger=ledger,
+                                insight=lambda event: None, background=False)
+        # The ledger has committed but not yet notified the tracker
+        ledger.record(grocery_receipt(1, 10), user_id="dave")
+        tracker.set_goal("dave", "groceries", 15)
+        ((receipt_id, receipt),) = ledger.iter_receipts("dave")
+        assert tracker.ingest("dave", receipt, receipt_id) == []
+        assert tracker.goal_status("dave", "groceries", "2025-03")["currentSpending"] == 10
+
+
+def test_rejects_unknown_categories_and_buckets_malformed_dates_in_the_current_month():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracker = BudgetTracker(os.path.join(temp_dir, "budget.db"), ledger=None,
+                                insight=lambda event: None, background=False)
+        try:
+            tracker.set_goal("carol", "coffee", 50)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a goal on an unknown category was accepted")
+        tracker.set_goal("carol", "Dining", 50)
+
+        receipt = {"merchant_name": "Starbucks", "purchase_date": "03/15/2025", "total_amount": 5.0,
+                   "items": [{"description": "Latte", "quantity": 1, "price": 5.0}]}
+        tracker.on_receipt("carol", "r1", receipt)
+        assert tracker.goal_status("carol", "dining")["currentSpending"] == 5
+
+
+if __name__ == "__main__":
+    test_categorizes_items_before_merchants()
+    test_milestones_fire_once_and_only_they_call_the_model()
+    test_rebuilds_aggregates_from_the_ledger_and_flags_price_jumps()
+    test_receipt_counted_once_when_a_rebuild_runs_before_the_listener()
+    test_rejects_unknown_categories_and_buckets_malformed_dates_in_the_current_month()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the LRU/SQLite cache tiers used by the extraction and transcript caches.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from app.functions.cache import LRUCache, SingleFlight, SQLiteCacheStore, TieredCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+
+def test_lru_respects_byte_budget_and_ttl():
+    cache = LRUCache(max_entries=10, max_bytes=5, ttl=0.05)
+    cache.set("a", "xxx")
+    cache.set("b", "yyy")
+    assert cache.get("a") is None
+    assert cache.size_bytes == 3
+    time.sleep(0.06)
+    assert cache.get("b") is None
+    assert cache.expirations == 1
+
+
+def test_tiered_cache_promotes_disk_hits():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        disk = SQLiteCacheStore(os.path.join(temp_dir, "cache.db"), table="t")
+        cache = TieredCache(LRUCache(max_entries=4), disk)
+        cache.set("k", "value")
+        cache.memory.clear()
+        assert cache.get("k") == "value"
+        assert cache.get("k") == "value"
+        assert cache.get("missing") is None
+        stats = cache.stats()
+        assert stats["hits"] == 2 and stats["disk_hits"] == 1 and stats["misses"] == 1
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "transcript"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["transcript"] * 4 and len(calls) == 1 and flight.shared == 3
+
+    async def slow_async():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "transcript"
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async("k", slow_async) for _ in range(4)))
+
+    assert asyncio.run(run()) == ["transcript"] * 4
+    assert len(calls) == 2 and len(flight) == 0
+
+
+if __name__ == "__main__":
+    test_lru_evicts_least_recently_used()
+    test_lru_respects_byte_budget_and_ttl()
+    test_tiered_cache_promotes_disk_hits()
+    test_single_flight_shares_concurrent_calls()
+    print("✅ Cache tests passed")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the tolerant streaming JSON parser used on model output.
+"""
+
+from app.functions.json_stream import JSONStreamParser, parse_model_json, parse_receipts
+
+
+def test_ignores_code_fences_and_braces_in_strings():
+    text = '```json\n{"merchant_name": "Curly {Cafe}", "items": []}\n```'
+    assert parse_model_json(text) == {"merchant_name": "Curly {Cafe}", "items": []}
+
+
+def test_detects_completion_across_chunks():
+    parser = JSONStreamParser()
+    assert parser.feed('Here you go: [{"total_amount": 1') is None
+    assert parser.feed('2.5}]') == [{"total_amount": 12.5}]
+    assert parser.done
+
+
+def test_repairs_truncated_output():
+    assert parse_model_json('{"merchant_name": "Fake Mart", "items": [{"description": "mi') == {
+        "merchant_name": "Fake Mart",
+        "items": [{"description": "mi"}],
+    }
+    assert parse_model_json('[{"a": 1}, {"b":') == [{"a": 1}]
+
+
+def test_receipts_are_coerced_through_the_shared_model():
+    receipt = parse_receipts('{"merchant_name": "S", "total_amount": "12.50", "items": [{"quantity": "2"}]}')
+    assert receipt["total_amount"] == 12.5
+    assert receipt["items"][0]["quantity"] == 2
+    assert receipt["tax_amount"] is None
+
+
+def test_rejects_output_without_json():
+    try:
+        parse_model_json("Sorry, I could not read the receipt.")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    test_ignores_code_fences_and_braces_in_strings()
+    test_detects_completion_across_chunks()
+    test_repairs_truncated_output()
+    test_receipts_are_coerced_through_the_shared_model()
+    test_rejects_output_without_json()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for silence-based segmentation of long audio.
+"""
+
+import numpy as np
+from app.functions.long_audio import SAMPLE_RATE, find_segments
+
+
+def tone(seconds: float, amplitude: int = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+
+
+def test_cuts_at_pauses_and_covers_input():
+    speech = [tone(20), np.zeros(SAMPLE_RATE // 2, dtype="<i2")] * 4
+    pcm = np.concatenate(speech).tobytes()
+    segments = find_segments(pcm, max_segment_seconds=30)
+    assert segments[0][0] == 0 and segments[-1][1] == len(pcm)
+    assert all(prev[1] == cur[0] for prev, cur in zip(segments, segments[1:]))
+    assert all((end - start) / 2 / SAMPLE_RATE <= 30 for start, end in segments)
+
+
+def test_short_max_segment_without_pauses():
+    pcm = tone(30).tobytes()
+    for max_segment_seconds in (10, 5, 0.01):
+        segments = find_segments(pcm, max_segment_seconds=max_segment_seconds)
+        assert segments[0][0] == 0 and segments[-1][1] == len(pcm)
+        assert all(end > start for start, end in segments)
+        assert len(segments) >= 30 / max(max_segment_seconds, 0.06)
+
+
+if __name__ == "__main__":
+    test_cuts_at_pauses_and_covers_input()
+    test_short_max_segment_without_pauses()
+    print("✅ Long audio tests passed")
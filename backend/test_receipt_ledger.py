@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the structured receipt ledger.
+"""
+
+import os
+import tempfile
+from app.functions.receipt_ledger import ReceiptLedger, ledger_user
+
+
+def receipts():
+    return [
+        {"merchant_name": "Starbucks", "purchase_date": "2025-03-02", "total_amount": 5.5,
+         "items": [{"description": "Latte", "quantity": 1, "price": 5.5}]},
+        {"merchant_name": "Fresh Grocer", "purchase_date": "2025-03-10", "total_amount": 20.0,
+         "items": [{"description": "Whole Milk", "quantity": 2, "price": 6.0},
+                   {"description": "Bread", "quantity": 1, "price": 14.0}]},
+        {"merchant_name": "starbucks ", "purchase_date": "2025-04-01", "total_amount": 4.0, "items": []},
+    ]
+
+
+def test_records_once_per_user():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger = ReceiptLedger(os.path.join(temp_dir, "ledger.db"))
+        assert ledger.record(receipts(), user_id="alice") == 3
+        assert ledger.record(receipts()[0], user_id="alice") == 0
+        assert ledger.record('```json\n{"merchant_name": "Starbucks", "total_amount": "5.5"}\n```', user_id="bob") == 1
+        assert ledger.record("no receipt here", user_id="bob") == 0
+
+        token = ledger_user.set("carol")
+        try:
+            assert ledger.record(receipts()[1]) == 1
+        finally:
+            ledger_user.reset(token)
+        assert ledger.spending("carol")["receipts"] == 1
+
+
+def test_spending_filters_and_groups():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ledger = ReceiptLedger(os.path.join(temp_dir, "ledger.db"))
+        ledger.record(receipts(), user_id="alice")
+
+        assert ledger.spending("alice") == {"total": 29.5, "receipts": 3}
+        assert ledger.spending("alice", start_date="2025-03-01", end_date="2025-03-31")["total"] == 25.5
+        assert ledger.spending("alice", merchant="STARBUCKS")["total"] == 9.5
+        assert ledger.spending("alice", item="milk") == {"total": 6.0, "receipts": 1}
+        by_month = ledger.spending("alice", group_by="month")["groups"]
+        assert by_month == [
+            {"key": "2025-03", "total": 25.5, "receipts": 2},
+            {"key": "2025-04", "total": 4.0, "receipts": 1},
+        ]
+        by_merchant = ledger.spending("alice", group_by="merchant")["groups"]
+        assert [(group["total"], group["receipts"]) for group in by_merchant] == [(20.0, 1), (9.5, 2)]
+        assert ledger.spending("bob")["receipts"] == 0
+
+
+if __name__ == "__main__":
+    test_records_once_per_user()
+    test_spending_filters_and_groups()
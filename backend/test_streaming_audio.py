@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for choosing between streamed and buffered transcription of uploads.
+"""
+
+import asyncio
+import io
+from app.functions import streaming_audio
+
+
+class FakeUpload:
+    def __init__(self, data: bytes, filename: str = "receipt.wav"):
+        self.file = io.BytesIO(data)
+        self.filename = filename
+
+    async def read(self) -> bytes:
+        return self.file.read()
+
+    async def seek(self, offset: int) -> None:
+        self.file.seek(offset)
+
+
+def large_upload() -> FakeUpload:
+    return FakeUpload(b"\0" * (streaming_audio.STREAM_THRESHOLD_BYTES + 1))
+
+
+def test_buffers_large_uploads_without_ffmpeg():
+    check_ffmpeg = streaming_audio.check_ffmpeg_available
+    streaming_audio.check_ffmpeg_available = lambda: False
+    try:
+        upload = large_upload()
+        assert not streaming_audio.should_stream(upload.file)
+        assert upload.file.tell() == 0
+    finally:
+        streaming_audio.check_ffmpeg_available = check_ffmpeg
+
+
+def test_falls_back_to_buffered_when_ffmpeg_cannot_start():
+    originals = (streaming_audio.check_ffmpeg_available, streaming_audio.transcribe_file_streaming,
+                 streaming_audio.transcribe_audio_async)
+
+    def missing_ffmpeg(fileobj, language_code):
+        fileobj.read(1024)
+        raise FileNotFoundError("ffmpeg")
+
+    async def buffered(audio_bytes, language_code, filename):
+        return f"buffered {len(audio_bytes)} bytes"
+
+    streaming_audio.check_ffmpeg_available = lambda: True
+    streaming_audio.transcribe_file_streaming = missing_ffmpeg
+    streaming_audio.transcribe_audio_async = buffered
+    try:
+        upload = large_upload()
+        transcript = asyncio.run(streaming_audio.transcribe_upload(upload))
+        assert transcript == f"buffered {streaming_audio.STREAM_THRESHOLD_BYTES + 1} bytes"
+    finally:
+        (streaming_audio.check_ffmpeg_available, streaming_audio.transcribe_file_streaming,
+         streaming_audio.transcribe_audio_async) = originals
+
+
+if __name__ == "__main__":
+    test_buffers_large_uploads_without_ffmpeg()
+    test_falls_back_to_buffered_when_ffmpeg_cannot_start()
+    print("✅ Streaming audio tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the embedded vector index behind the local retrieval backend.
+"""
+
+import os
+import tempfile
+import numpy as np
+from app.rag_test import vector_index
+from app.rag_test.vector_index import VectorIndex
+
+
+def clustered_vectors(n: int, dim: int = 32, clusters: int = 20, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def test_persists_and_skips_known_ids():
+    with tempfile.TemporaryDirectory() as path:
+        vectors = clustered_vectors(10)
+        index = VectorIndex(path, dim=32)
+        assert index.add([f"doc-{i}" for i in range(10)], [f"text {i}" for i in range(10)], vectors) == 10
+        assert index.add(["doc-3"], ["text 3"], vectors[3:4]) == 0
+
+        reopened = VectorIndex(path)
+        assert len(reopened) == 10
+        score, record = reopened.search(vectors[3], k=1)[0]
+        assert record["id"] == "doc-3" and score > 0.99
+
+
+def test_ignores_torn_record_line():
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(path, dim=32)
+        index.add(["a", "b"], ["a", "b"], clustered_vectors(2))
+        with open(os.path.join(path, "records.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"id": "c", "te')
+        reopened = VectorIndex(path)
+        assert len(reopened) == 2
+        reopened.add(["c"], ["c"], clustered_vectors(1, seed=1))
+        assert len(VectorIndex(path)) == 3
+
+
+def test_ivf_search_matches_exact_search():
+    train_min = vector_index.TRAIN_MIN_VECTORS
+    vector_index.TRAIN_MIN_VECTORS = 500
+    try:
+        with tempfile.TemporaryDirectory() as path:
+            vectors = clustered_vectors(2000)
+            index = VectorIndex(path, dim=32, nprobe=8)
+            for start in range(0, 2000, 250):
+                ids = [str(i) for i in range(start, start + 250)]
+                index.add(ids, ids, vectors[start:start + 250])
+            assert index.trained
+
+            def top_ids(query, exact):
+                return {record["id"] for _, record in index.search(query, k=10, exact=exact)}
+
+            queries = clustered_vectors(50, seed=7)
+            recall = np.mean([len(top_ids(q, False) & top_ids(q, True)) / 10 for q in queries])
+            assert recall >= 0.9
+            assert VectorIndex(path).trained
+    finally:
+        vector_index.TRAIN_MIN_VECTORS = train_min
+
+
+if __name__ == "__main__":
+    test_persists_and_skips_known_ids()
+    test_ignores_torn_record_line()
+    test_ivf_search_matches_exact_search()
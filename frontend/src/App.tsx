@@ -35,6 +35,8 @@ function App() {
   const [selectedAudioFile, setSelectedAudioFile] = useState<File | null>(null);
   const [isRecording, setIsRecording] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
+  // Conversation id issued by the backend; sent back so follow-ups share history
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
   const audioInputRef = useRef<HTMLInputElement>(null);
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
@@ -138,6 +140,9 @@ function App() {
     if (selectedAudioFile) {
       formData.append('audio_files', selectedAudioFile); // Add audio files
     }
+    if (sessionId) {
+      formData.append('session_id', sessionId);
+    }
     // --- END OF FIX ---
 
     console.log('📤 Sending query:', trimmedText);
@@ -166,6 +171,9 @@ function App() {
       if (!data || typeof data.response_text !== 'string') {
         throw new Error('Invalid API response format');
       }
+      if (data.session_id) {
+        setSessionId(data.session_id);
+      }
 
       const agentMessage: Message = {
         id: getNextId(),